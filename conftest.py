@@ -1,107 +1,1433 @@
 import configparser
+import json
 import logging
+import os
+import socket
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Generator, Optional
+from urllib.parse import urlparse
 import pytest
 import allure
+from _pytest.runner import runtestprotocol
 from slugify import slugify
-from playwright.sync_api import Page
+from playwright.sync_api import Browser, BrowserContext, BrowserType, Page
+from playwright.sync_api import expect
+from enums.outcomes import Outcomes
+from pages.login_page import LoginPage
+from pages.register_page import RegisterPage
+from pages.secured_area_page import SecuredAreaPage
 from utils.allure_logger import AllureLogger
+from utils.allure_merge import AllureMerge
+from utils.artifact_pipeline import ArtifactPipeline, should_keep
+from utils.asset_cache import AssetCache
+from utils.async_runner import AsyncFlow, run_concurrent_flows
+from utils.browser_server import BROWSER_SERVER_ENV_VARIABLE, BrowserServer
+from utils.browser_watchdog import BrowserWatchdog, RecyclableBrowser
+from utils.checkpoints import CheckpointStore, FlowCheckpoints
+from utils.context_pool import ContextPool
+from utils.data_provider import DataSource, data_source
+from utils.duration_history import DurationHistory
+from utils.execution_profile import ExecutionProfile, selected_profile_name
+from utils.impact import (
+    DEFAULT_FULL_RUN_EVERY, ImpactMap, ImpactRecorder, changed_keys, changed_lines
+)
+from utils.page_metrics import PageMetrics, PageMetricsHistory, load_budgets
+from utils.storage_state import StorageStateCache
+from utils import timing
+from utils.stub_server import STUB_SERVER_ENV_VARIABLE, StubServer
+from utils.user_factory import UserFactory, UserPool, current_worker_id, new_run_id
 
 logger = logging.getLogger()
+artifacts_key = pytest.StashKey[list]()
+artifact_pipeline_key = pytest.StashKey[ArtifactPipeline]()
+run_id_key = pytest.StashKey[str]()
+allure_logger_key = pytest.StashKey[AllureLogger]()
+asset_cache_stats_key = pytest.StashKey[Counter]()
+timing_report_key = pytest.StashKey[Path]()
+duration_history_key = pytest.StashKey[DurationHistory]()
+attempt_key = pytest.StashKey[int]()
+page_metrics_key = pytest.StashKey[PageMetrics]()
+page_navigations_key = pytest.StashKey[list]()
+page_metrics_summary_key = pytest.StashKey[dict]()
+browser_watchdog_key = pytest.StashKey[BrowserWatchdog]()
+browser_key = pytest.StashKey[RecyclableBrowser]()
+browser_watchdog_reports_key = pytest.StashKey[list]()
+allure_merge_key = pytest.StashKey[Counter]()
+impact_key = pytest.StashKey[Optional[dict]]()
+impact_recorder_key = pytest.StashKey[ImpactRecorder]()
+impact_covered_key = pytest.StashKey[dict]()
+impact_narrowed_key = pytest.StashKey[bool]()
+
+def pytest_addoption(parser):
+    """
+    Adds the command line options of the project.
+
+    Args:
+        parser: The pytest argument parser.
+    """
+    parser.addoption(
+        "--profile",
+        default=None,
+        help="Execution profile from config.ini ([profile:<name>]). "
+             "Defaults to $PW_PROFILE, then to the Profile key of [DEFAULT]."
+    )
+    parser.addoption(
+        "--concurrent-flows",
+        type=int,
+        default=4,
+        help="Number of flows the concurrent tests run at once in one browser."
+    )
+    parser.addoption(
+        "--user-pool-size",
+        type=int,
+        default=0,
+        help="Number of users each worker registers before its first test that needs "
+             "an existing account."
+    )
+    parser.addoption(
+        "--stub-server",
+        action="store_true",
+        default=False,
+        help="Run against a local stand-in of the application instead of ApplicationURL. "
+             "Also enabled by setting $PW_STUB_SERVER to 1."
+    )
+    parser.addoption(
+        "--data-shards",
+        type=int,
+        default=4,
+        help="Number of test items each data-driven test is split into. Every item "
+             "streams its own share of the dataset."
+    )
+    parser.addoption(
+        "--data-source",
+        default=None,
+        help="Dataset for the data-driven tests, overriding their data_source marker: "
+             "csv:<path>, jsonl:<path> or generated:<generator>."
+    )
+    parser.addoption(
+        "--data-count",
+        type=int,
+        default=None,
+        help="Number of cases of generated datasets, overriding the data_source marker."
+    )
+    parser.addoption(
+        "--flow-retries",
+        type=int,
+        default=0,
+        help="Number of times a failed test is retried. Tests using the checkpoints "
+             "fixture resume from their last completed step. The flow_retries marker "
+             "overrides it per test."
+    )
+    parser.addoption(
+        "--browser-server",
+        action="store_true",
+        default=False,
+        help="Connect to a browser server shared by all workers and kept alive between "
+             "runs instead of launching a browser per worker. Also enabled by setting "
+             "$PW_BROWSER_SERVER to 1."
+    )
+    parser.addoption(
+        "--timing-report",
+        default=None,
+        help="Path of the JSON latency report of page object actions. "
+             "Defaults to timing/report.json in the pytest cache directory."
+    )
+    parser.addoption(
+        "--allure-merge-into",
+        default=None,
+        metavar="DIR",
+        help="At the end of the run, merge the --alluredir results into DIR, shared by "
+             "the shards of a split run. Only new files are merged."
+    )
+    parser.addoption(
+        "--allure-compact-logs",
+        action="store_true",
+        default=False,
+        help="With --allure-merge-into, fold the log record steps of each test into "
+             "text attachments."
+    )
+    parser.addoption(
+        "--impact",
+        default=None,
+        metavar="REF",
+        help="Run only the tests affected by the page objects, Notifications members and "
+             "test files changed since the git ref REF, e.g. origin/main. Every "
+             "--impact-full-every runs, every test runs to refresh the impact map."
+    )
+    parser.addoption(
+        "--impact-full-every",
+        type=int,
+        default=DEFAULT_FULL_RUN_EVERY,
+        metavar="N",
+        help=f"With --impact, run every test once in N runs. 0 only runs every test "
+             f"without an impact map or after changes outside the page objects. "
+             f"Default is {DEFAULT_FULL_RUN_EVERY}."
+    )
+    parser.addoption(
+        "--no-duration-scheduling",
+        action="store_true",
+        default=False,
+        help="Distribute tests over pytest-xdist workers in collection order instead of "
+             "longest first by their past durations."
+    )
 
 @pytest.fixture(scope='session')
-def config():
+def config_parser():
     config = configparser.ConfigParser()
     config.read('config.ini')
-    return config['DEFAULT']
+    return config
 
-@pytest.fixture
-def user(config):
-    return config['User']
+@pytest.fixture(scope='session')
+def config(config_parser):
+    return config_parser['DEFAULT']
+
+@pytest.fixture(scope='session')
+def execution_profile(
+    pytestconfig: pytest.Config, config_parser: configparser.ConfigParser
+) -> ExecutionProfile:
+    """
+    Fixture for the execution profile selected for this run.
+
+    Args:
+        pytestconfig (pytest.Config): The pytest configuration object.
+        config_parser (configparser.ConfigParser): The parsed config.ini.
+
+    Returns:
+        ExecutionProfile: The selected execution profile.
+    """
+    name = selected_profile_name(config_parser, pytestconfig.getoption("--profile"))
+    try:
+        profile = ExecutionProfile(name, config_parser)
+    except ValueError as e:
+        raise pytest.UsageError(str(e))
+    logger.info(f"Running with execution profile: {profile.name}")
+    return profile
+
+@pytest.fixture(scope='session')
+def user_factory(
+    pytestconfig: pytest.Config,
+    browser: RecyclableBrowser,
+    application_url: str,
+    password: str,
+    config
+) -> Generator[UserFactory, None, None]:
+    """
+    Fixture for the factory handing out unique usernames to this worker.
+
+    Usernames start with the configured User and carry the run id shared by all
+    workers, the node id of the machine, the worker id and a counter, so parallel
+    workers, the machines of a multi-node run and parallel runs never register the
+    same user. At the end of the session every user the factory handed out, to the
+    user and registered_user fixtures alike, is deleted by posting to the
+    UserCleanupPath of config.ini while logged in as that user. Cleanup is skipped
+    when UserCleanupPath is empty.
+
+    Args:
+        pytestconfig (pytest.Config): The pytest configuration object.
+        browser (RecyclableBrowser): The browser of this worker, only launched for
+            the cleanup if no test launched it.
+        application_url (str): The base URL of the application.
+        password (str): The password of the users.
+        config: The [DEFAULT] section of config.ini.
+
+    Yields:
+        UserFactory: The user factory of this worker.
+    """
+    factory = UserFactory(config['User'], pytestconfig.stash[run_id_key], current_worker_id())
+    yield factory
+
+    cleanup_path = config.get('UserCleanupPath', '')
+    if not cleanup_path or not factory.issued:
+        return
+    context = browser.new_context(base_url=application_url)
+    try:
+        login_page = LoginPage(context.new_page(), via_api=True)
+        for name in factory.issued:
+            if login_page.login(name, password)[0] is Outcomes.SUCCESS:
+                response = login_page.request.post(cleanup_path)
+                logger.info(f"Cleaned up user {name}: {response.status}")
+    finally:
+        context.close()
 
 @pytest.fixture
+def user(user_factory: UserFactory) -> str:
+    """
+    Fixture for a new username that is not registered yet.
+
+    Args:
+        user_factory (UserFactory): The user factory of this worker.
+
+    Returns:
+        str: A unique username.
+    """
+    return user_factory.next_user()
+
+@pytest.fixture(scope='session')
 def password(config):
     return config['Password']
 
-@pytest.fixture
-def application_url(config):
+@pytest.fixture(scope='session')
+def stub_server(config) -> Generator[StubServer, None, None]:
+    """
+    Fixture for a local stand-in of the application on an ephemeral port.
+
+    Latency and errors are injected as set by StubLatency (milliseconds) and
+    StubErrorRate (share of requests failing) in config.ini.
+
+    Args:
+        config: The [DEFAULT] section of config.ini.
+
+    Yields:
+        StubServer: The running stub server.
+    """
+    server = StubServer(
+        latency=config.getfloat('StubLatency', 0),
+        error_rate=config.getfloat('StubErrorRate', 0)
+    ).start()
+    yield server
+    server.stop()
+
+@pytest.fixture(scope='session')
+def application_url(pytestconfig: pytest.Config, request: pytest.FixtureRequest, config) -> str:
+    """
+    Fixture for the base URL of the application under test.
+
+    Args:
+        pytestconfig (pytest.Config): The pytest configuration object.
+        request (pytest.FixtureRequest): The request for the fixture.
+        config: The [DEFAULT] section of config.ini.
+
+    Returns:
+        str: The URL of the stub server when --stub-server or $PW_STUB_SERVER is set,
+        ApplicationURL otherwise.
+    """
+    if pytestconfig.getoption("--stub-server") or os.environ.get(STUB_SERVER_ENV_VARIABLE) == "1":
+        return request.getfixturevalue("stub_server").url
     return config['ApplicationURL']
 
+@pytest.fixture(scope='session')
+def session_user(config) -> str:
+    """
+    Fixture for the user that tests starting in the secured area are logged in as.
+
+    The name is stable across runs so its cached storage state can be reused. Every
+    worker logging in as the same account is safe, as each login gets its own session.
+
+    Args:
+        config: The [DEFAULT] section of config.ini.
+
+    Returns:
+        str: The username of the shared logged-in user.
+    """
+    return f"{config['User']}-session"
+
+@pytest.fixture(scope='session')
+def storage_state_cache(
+    pytestconfig: pytest.Config, session_user: str, application_url: str
+) -> StorageStateCache:
+    """
+    Fixture for the on-disk storage state cache of the session user.
+
+    Args:
+        pytestconfig (pytest.Config): The pytest configuration object.
+        session_user (str): The user the storage state belongs to.
+        application_url (str): The base URL of the application.
+
+    Returns:
+        StorageStateCache: The cache for the session user and application URL.
+    """
+    return StorageStateCache(
+        pytestconfig.cache.mkdir("storage-state"), session_user, application_url
+    )
+
+@pytest.fixture(autouse=True)
+def timing_spans(execution_profile: ExecutionProfile) -> Generator[None, None, None]:
+    """
+    Fixture recording timed spans of page object actions during each test case.
+
+    Spans are recorded when the Timing key of the execution profile is on. The
+    latency summary of the spans of the test is attached to the Allure report.
+
+    Args:
+        execution_profile (ExecutionProfile): The selected execution profile.
+    """
+    timing.recorder.enabled = execution_profile.timing
+    start = len(timing.recorder.spans)
+    yield
+    spans = timing.recorder.spans[start:]
+    if spans:
+        allure.attach(
+            json.dumps(timing.recorder.summary(spans), indent=2),
+            name="timing",
+            attachment_type=allure.attachment_type.JSON
+        )
+
+@pytest.fixture(scope='session')
+def page_budgets(config_parser: configparser.ConfigParser) -> list[tuple[str, dict]]:
+    """
+    Fixture for the page budgets of the [budget:<path pattern>] sections of config.ini.
+
+    Args:
+        config_parser (configparser.ConfigParser): The parsed config.ini.
+
+    Returns:
+        list[tuple[str, dict]]: The path pattern and metric limits of each budget.
+    """
+    try:
+        return load_budgets(config_parser)
+    except ValueError as e:
+        raise pytest.UsageError(str(e))
+
+@pytest.fixture(scope='session')
+def page_metrics_history(pytestconfig: pytest.Config) -> PageMetricsHistory:
+    """
+    Fixture for the per-page metrics of past runs, kept in the pytest cache.
+
+    Args:
+        pytestconfig (pytest.Config): The pytest configuration object.
+
+    Returns:
+        PageMetricsHistory: The page metrics history.
+    """
+    return PageMetricsHistory(pytestconfig.cache.mkdir("page_metrics"))
+
+@pytest.fixture(autouse=True)
+def page_metrics(
+    execution_profile: ExecutionProfile, request: pytest.FixtureRequest
+) -> Generator[Optional[PageMetrics], None, None]:
+    """
+    Fixture recording the client-side metrics of every page load of each test case
+    that uses a page.
+
+    Metrics are recorded when the PageMetrics key of the execution profile is on.
+    The loads of the test, each with the p50 of its page in the previous run, are
+    attached to the Allure report, and pytest_runtest_call fails a test whose loads
+    exceed their page budgets.
+
+    Args:
+        execution_profile (ExecutionProfile): The selected execution profile.
+        request (pytest.FixtureRequest): The request for the current test.
+
+    Yields:
+        Optional[PageMetrics]: The metrics of the test's page, None if not recorded.
+    """
+    if not execution_profile.page_metrics or "page" not in request.fixturenames:
+        yield None
+        return
+
+    history = request.getfixturevalue("page_metrics_history")
+    metrics = PageMetrics(request.getfixturevalue("page"), request.getfixturevalue("page_budgets"))
+    request.node.stash[page_metrics_key] = metrics
+    yield metrics
+    metrics.close()
+    if metrics.navigations:
+        request.config.stash[page_navigations_key].extend(metrics.navigations)
+        allure.attach(
+            json.dumps(metrics.to_dict(history.previous()), indent=2),
+            name="page metrics",
+            attachment_type=allure.attachment_type.JSON
+        )
+
+@pytest.fixture
+def via_api(request: pytest.FixtureRequest) -> bool:
+    """
+    Fixture telling page objects whether to submit forms over HTTP for this test.
+
+    Args:
+        request (pytest.FixtureRequest): The request for the current test.
+
+    Returns:
+        bool: True if the test is marked with api_forms.
+    """
+    return request.node.get_closest_marker("api_forms") is not None
+
+def authenticate(page: Page, user: str, password: str) -> None:
+    """
+    Registers the user if needed and logs it in over the API.
+
+    The session cookie lands in the page's browser context, so the page is
+    logged in without driving the registration and login forms.
+
+    Args:
+        page (Page): The Playwright Page object whose context is logged in.
+        user (str): The username to register and log in.
+        password (str): The password to register and log in.
+    """
+    RegisterPage(page, via_api=True).register(user, password)
+    outcome, message = LoginPage(page, via_api=True).login(user, password)
+    if outcome is not Outcomes.SUCCESS:
+        pytest.fail(f"Could not log in as {user}: {outcome.name} {message}")
+
+def pytest_generate_tests(metafunc):
+    """
+    Splits every test using the data_cases fixture into --data-shards items.
+
+    Only the shard index is parametrized; the cases are read when the test runs.
+
+    Args:
+        metafunc: The pytest Metafunc object of the test function.
+    """
+    if "data_cases" not in metafunc.fixturenames:
+        return
+    shards = metafunc.config.getoption("--data-shards")
+    metafunc.parametrize(
+        "data_shard", range(shards), ids=[f"shard{index + 1}of{shards}" for index in range(shards)]
+    )
+
+def pytest_collection_modifyitems(config, items):
+    """
+    With --impact, deselects the tests not affected by the changes since the base ref.
+
+    Tests without an entry in the impact map are always kept.
+
+    Args:
+        config: The pytest configuration object.
+        items: The collected test items, modified in place.
+    """
+    impact = config.stash.get(impact_key, None)
+    if not impact or impact["full_run_reason"]:
+        return
+    selected = ImpactMap.load(config.cache).affected(
+        [item.nodeid for item in items], impact["changes"]
+    )
+    deselected = [item for item in items if item.nodeid not in selected]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = [item for item in items if item.nodeid in selected]
+
+def pytest_deselected(items):
+    """
+    Notes that tests were deselected, by -k, -m, --deselect or another plugin, so a
+    run where --impact runs every test is not counted as a full run.
+
+    Args:
+        items: The deselected test items.
+    """
+    if items:
+        items[0].config.stash[impact_narrowed_key] = True
+
+@pytest.fixture
+def data_source_of_test(request: pytest.FixtureRequest) -> DataSource:
+    """
+    Fixture for the dataset of a data-driven test.
+
+    The dataset comes from the test's data_source(spec, count=None, seed=0) marker;
+    --data-source and --data-count override the spec and the count.
+
+    Args:
+        request (pytest.FixtureRequest): The request for the current test.
+
+    Returns:
+        DataSource: The dataset of the test.
+    """
+    marker = request.node.get_closest_marker("data_source")
+    spec = request.config.getoption("--data-source") or (marker.args[0] if marker else None)
+    if spec is None:
+        raise pytest.UsageError(f"{request.node.nodeid} has no data_source marker")
+    kwargs = marker.kwargs if marker else {}
+    return data_source(
+        spec,
+        request.config.getoption("--data-count") or kwargs.get("count"),
+        kwargs.get("seed", 0)
+    )
+
+@pytest.fixture
+def data_cases(data_source_of_test: DataSource, data_shard: int, pytestconfig: pytest.Config):
+    """
+    Fixture streaming the cases of this test item's shard of the dataset.
+
+    Args:
+        data_source_of_test (DataSource): The dataset of the test.
+        data_shard (int): Index of the shard of this test item.
+        pytestconfig (pytest.Config): The pytest configuration object.
+
+    Returns:
+        Iterator[dict]: The cases of the shard, read one at a time.
+    """
+    return data_source_of_test.shard(data_shard, pytestconfig.getoption("--data-shards"))
+
+@pytest.fixture
+def checkpoints(page: Page, request: pytest.FixtureRequest) -> FlowCheckpoints:
+    """
+    Fixture for running the steps of a flow as checkpointed Allure steps.
+
+    A retried test resumes after the last step its failed attempt completed, with
+    the storage state, URL and remembered values of that step. An attempt that will
+    not be retried, such as every run of a test without retries, saves no checkpoints.
+
+    Args:
+        page (Page): The Playwright Page object.
+        request (pytest.FixtureRequest): The request for the current test.
+
+    Returns:
+        FlowCheckpoints: The checkpoints of this attempt of the test.
+    """
+    attempt = request.node.stash.get(attempt_key, 0)
+    return FlowCheckpoints(
+        page,
+        CheckpointStore(request.config.cache.mkdir("checkpoints")),
+        request.node.nodeid,
+        attempt,
+        save=attempt < flow_retries(request.node)
+    )
+
+@pytest.fixture(scope='session')
+def user_pool(
+    pytestconfig: pytest.Config,
+    browser: RecyclableBrowser,
+    browser_watchdog: BrowserWatchdog,
+    user_factory: UserFactory,
+    application_url: str,
+    password: str
+) -> Generator[UserPool, None, None]:
+    """
+    Fixture for the pool of users this worker registered ahead of its tests.
+
+    The pool is filled with --user-pool-size users over the API when first requested.
+    Users are registered from a page of a context of the pool's own, which is closed
+    when the browser is recycled and opened again on the relaunched browser. The
+    users are deleted at the end of the session with the others of user_factory.
+
+    Args:
+        pytestconfig (pytest.Config): The pytest configuration object.
+        browser (RecyclableBrowser): The browser of this worker.
+        browser_watchdog (BrowserWatchdog): Told that the pool's context stays open.
+        user_factory (UserFactory): The user factory of this worker.
+        application_url (str): The base URL of the application.
+        password (str): The password of the pooled users.
+
+    Yields:
+        UserPool: The user pool of this worker.
+    """
+    pages = []
+
+    def api_page() -> Page:
+        if not pages:
+            context = browser.new_context(base_url=application_url)
+            browser_watchdog.expect(context)
+            pages.append(context.new_page())
+        return pages[0]
+
+    def close_api_page() -> None:
+        while pages:
+            pages.pop().context.close()
+
+    browser.on_recycle(close_api_page)
+    pool = UserPool(
+        user_factory,
+        lambda name: RegisterPage(api_page(), via_api=True).register(name, password)[0]
+        is Outcomes.SUCCESS
+    )
+    pool.provision(pytestconfig.getoption("--user-pool-size"))
+
+    yield pool
+    close_api_page()
+
+@pytest.fixture
+def registered_user(user_pool: UserPool) -> str:
+    """
+    Fixture for a username that is already registered and used by no other test.
+
+    Args:
+        user_pool (UserPool): The user pool of this worker.
+
+    Returns:
+        str: A registered username.
+    """
+    return user_pool.acquire()
+
+@pytest.fixture(scope='session')
+def authenticated_storage_state(
+    browser: RecyclableBrowser,
+    storage_state_cache: StorageStateCache,
+    application_url: str,
+    session_user: str,
+    password: str
+) -> str:
+    """
+    Fixture that logs the session user in once per worker and caches the storage state.
+
+    A cached state from an earlier run is reused as long as none of its cookies
+    has expired.
+
+    Args:
+        browser (RecyclableBrowser): The browser of this worker.
+        storage_state_cache (StorageStateCache): The storage state cache.
+        application_url (str): The base URL of the application.
+        session_user (str): The user to log in.
+        password (str): The password of the user.
+
+    Returns:
+        str: Path to the cached storage state file.
+    """
+    if not storage_state_cache.is_valid():
+        context = browser.new_context(base_url=application_url)
+        try:
+            authenticate(context.new_page(), session_user, password)
+            storage_state_cache.save(context)
+        finally:
+            context.close()
+    return str(storage_state_cache.path)
+
+@pytest.fixture
+def authenticated_page(
+    page: Page,
+    storage_state_cache: StorageStateCache,
+    application_url: str,
+    session_user: str,
+    password: str
+) -> Page:
+    """
+    Fixture for a page that starts in the secured area as the session user.
+
+    The context is created with the cached storage state (see browser_context_args).
+    If the server rejects the cached session, the cache is invalidated and the user
+    logs in again over the API in this page's context, refreshing the cache for the
+    following tests.
+
+    Args:
+        page (Page): The Playwright Page object.
+        storage_state_cache (StorageStateCache): The storage state cache.
+        application_url (str): The base URL of the application.
+        session_user (str): The user the page is logged in as.
+        password (str): The password of the user.
+
+    Returns:
+        Page: A page opened on the secured area.
+    """
+    secured_area_page = SecuredAreaPage(page)
+    secured_area_page.goto(f"{application_url}/secure")
+    if urlparse(page.url).path != "/secure":
+        logger.info("Cached session was rejected, logging in again")
+        storage_state_cache.invalidate()
+        authenticate(page, session_user, password)
+        storage_state_cache.save(page.context)
+        secured_area_page.goto(f"{application_url}/secure")
+    return page
+
 @pytest.fixture(scope="session")
-def browser_type_launch_args(browser_type_launch_args: dict) -> dict:
+def browser_type_launch_args(
+    browser_type_launch_args: dict, execution_profile: ExecutionProfile
+) -> dict:
     """
     Fixture to configure browser type launch arguments for the entire session.
 
+    The execution profile sets headless mode, slow_mo and the window size. Explicit
+    --headed or --slowmo command line options still win over the profile.
+
     Args:
         browser_type_launch_args (dict): Existing browser type launch arguments.
+        execution_profile (ExecutionProfile): The selected execution profile.
 
     Returns:
         dict: Updated browser type launch arguments.
     """
     return {
-        **browser_type_launch_args,
-        "headless": False,
-        "slow_mo": 600,
-        "args": ["--start-maximized"]
+        **execution_profile.launch_args,
+        **browser_type_launch_args
     }
 
+@pytest.fixture(scope="session")
+def browser(
+    pytestconfig: pytest.Config,
+    launch_browser: Callable[..., Browser],
+    browser_type: BrowserType,
+    browser_type_launch_args: dict,
+    execution_profile: ExecutionProfile,
+    browser_watchdog: BrowserWatchdog
+) -> Generator[RecyclableBrowser, None, None]:
+    """
+    Fixture for the browser of this worker, launched or taken from the shared browser server.
+
+    With --browser-server the worker connects to a browser server started on first
+    use and kept alive between runs, so no browser is launched. Videos can only be
+    read from a browser launched by this process, so a profile recording videos
+    launches one anyway. The browser is held by a RecyclableBrowser, which launches
+    it on first use and stands in for it; pytest_runtest_teardown recycles it when
+    the browser watchdog asks for it, and the next use launches or connects a new one.
+
+    Args:
+        pytestconfig (pytest.Config): The pytest configuration object.
+        launch_browser (Callable[..., Browser]): Launches a browser with the launch arguments.
+        browser_type (BrowserType): The Playwright BrowserType of the selected browser.
+        browser_type_launch_args (dict): The browser type launch arguments.
+        execution_profile (ExecutionProfile): The selected execution profile.
+        browser_watchdog (BrowserWatchdog): Samples the browser after every test.
+
+    Yields:
+        RecyclableBrowser: The holder of the launched or connected browser.
+    """
+    shared = (
+        pytestconfig.getoption("--browser-server")
+        or os.environ.get(BROWSER_SERVER_ENV_VARIABLE) == "1"
+    )
+    if shared and execution_profile.video != "off":
+        logger.info("Launching a browser: videos are not available from the browser server")
+        shared = False
+    if shared:
+        server = BrowserServer(
+            pytestconfig.cache.mkdir("browser_server"), browser_type.name, browser_type_launch_args
+        )
+        browser = RecyclableBrowser(lambda: server.connect(browser_type))
+    else:
+        browser = RecyclableBrowser(launch_browser)
+    pytestconfig.stash[browser_key] = browser
+    yield browser
+    browser.close()
+
+@pytest.fixture(scope='session')
+def browser_watchdog(
+    pytestconfig: pytest.Config, execution_profile: ExecutionProfile
+) -> BrowserWatchdog:
+    """
+    Fixture for the watchdog sampling the resources of this worker's browser.
+
+    pytest_runtest_teardown hands it the browser after every test and recycles the
+    browser when a threshold of the execution profile is reached.
+
+    Args:
+        pytestconfig (pytest.Config): The pytest configuration object.
+        execution_profile (ExecutionProfile): The selected execution profile.
+
+    Returns:
+        BrowserWatchdog: The browser watchdog.
+    """
+    watchdog = BrowserWatchdog(
+        execution_profile.browser_recycle_tests,
+        execution_profile.browser_max_rss_mb,
+        execution_profile.browser_max_leaks
+    )
+    pytestconfig.stash[browser_watchdog_key] = watchdog
+    return watchdog
+
+@pytest.fixture(scope='session')
+def videos_dir(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """
+    Fixture for the directory videos of this worker are recorded to.
+
+    It is shared by all tests, so that the context arguments of tests stay equal
+    and pooled contexts can be reused while recording videos.
+
+    Args:
+        tmp_path_factory (pytest.TempPathFactory): Factory for creating temporary directories.
+
+    Returns:
+        Path: The videos directory.
+    """
+    return tmp_path_factory.mktemp('videos')
+
 @pytest.fixture
 def browser_context_args(
     browser_context_args: dict,
-    tmpdir_factory: pytest.TempdirFactory
+    videos_dir: Path,
+    application_url: str,
+    execution_profile: ExecutionProfile,
+    request: pytest.FixtureRequest
 ) -> dict:
     """
     Fixture to configure browser context arguments for each test case.
 
+    Tests that use the authenticated_page fixture get the cached storage state of
+    the session user, so they skip registration and login in the UI.
+
     Args:
         browser_context_args (dict): Existing browser context arguments.
-        tmpdir_factory (pytest.TempdirFactory): Factory for creating temporary directories.
+        videos_dir (Path): Directory videos are recorded to.
+        application_url (str): The base URL of the application, used to resolve
+            relative URLs of page.goto and of HTTP form submissions.
+        execution_profile (ExecutionProfile): The selected execution profile.
+        request (pytest.FixtureRequest): The request for the current test.
 
     Returns:
         dict: Updated browser context arguments.
     """
     context_args = {
         **browser_context_args,
-        "no_viewport": True,
-        "record_video_dir": tmpdir_factory.mktemp('videos'),
+        **execution_profile.context_args,
+        "base_url": application_url,
         "accept_downloads": True
     }
+    if execution_profile.video != "off":
+        context_args["record_video_dir"] = videos_dir
+    if "authenticated_page" in request.fixturenames:
+        context_args["storage_state"] = request.getfixturevalue("authenticated_storage_state")
     
     return context_args
 
+@pytest.fixture
+def concurrent_flows(
+    browser_name: str,
+    browser_type_launch_args: dict,
+    execution_profile: ExecutionProfile,
+    application_url: str
+) -> Callable[..., list]:
+    """
+    Fixture for running async flows as concurrent tasks in one browser.
 
-def pytest_runtest_makereport(item, call) -> None:
+    Each flow gets its own isolated context, created with the viewport and base URL
+    of the sync tests. The browser is launched with the session launch arguments.
+
+    Args:
+        browser_name (str): The browser engine to launch.
+        browser_type_launch_args (dict): The browser type launch arguments.
+        execution_profile (ExecutionProfile): The selected execution profile.
+        application_url (str): The base URL of the application.
+
+    Returns:
+        Callable[..., list]: Function taking an async flow, the number of flows and an
+        optional concurrency limit, and returning each flow's result or exception.
+    """
+    def run(flow: AsyncFlow, count: int, concurrency: Optional[int] = None) -> list:
+        return run_concurrent_flows(
+            flow,
+            count,
+            browser_name,
+            browser_type_launch_args,
+            {**execution_profile.context_args, "base_url": application_url},
+            concurrency
+        )
+
+    return run
+
+@pytest.fixture(scope='session')
+def asset_cache(
+    pytestconfig: pytest.Config, execution_profile: ExecutionProfile
+) -> Generator[AssetCache, None, None]:
+    """
+    Fixture for the static asset cache and domain blocklist routed into every context.
+
+    The cache lives in the pytest cache directory, so it is shared by workers and
+    kept between runs. Its counters are added to the session totals reported by
+    pytest_terminal_summary.
+
+    Args:
+        pytestconfig (pytest.Config): The pytest configuration object.
+        execution_profile (ExecutionProfile): The selected execution profile.
+
+    Yields:
+        AssetCache: The asset cache.
+    """
+    cache = AssetCache(
+        pytestconfig.cache.mkdir("assets"),
+        execution_profile.asset_cache,
+        execution_profile.blocked_domains
+    )
+    yield cache
+    pytestconfig.stash[asset_cache_stats_key].update(cache.stats())
+
+@pytest.fixture(scope='session')
+def context_pool(
+    browser: RecyclableBrowser,
+    execution_profile: ExecutionProfile,
+    asset_cache: AssetCache,
+    browser_watchdog: BrowserWatchdog
+) -> Generator[ContextPool, None, None]:
+    """
+    Fixture for the pool of warm browser contexts of this worker.
+
+    The pool is emptied before the browser is recycled and fills up again on the
+    relaunched browser.
+
+    Args:
+        browser (RecyclableBrowser): The browser of this worker.
+        execution_profile (ExecutionProfile): The selected execution profile.
+        asset_cache (AssetCache): The asset cache installed on every context.
+        browser_watchdog (BrowserWatchdog): Told that idle pooled contexts stay open.
+
+    Yields:
+        ContextPool: The context pool.
+    """
+    pool = ContextPool(
+        browser,
+        execution_profile.context_pool_size,
+        execution_profile.context_max_uses,
+        asset_cache.install
+    )
+    browser_watchdog.context_pool = pool
+    browser.on_recycle(pool.close)
+    yield pool
+    browser_watchdog.context_pool = None
+    pool.close()
+
+@pytest.fixture
+def context(
+    browser: RecyclableBrowser,
+    browser_context_args: dict,
+    execution_profile: ExecutionProfile,
+    tmp_path: Path,
+    request: pytest.FixtureRequest
+) -> Generator[BrowserContext, None, None]:
     """
-    Custom hook to attach screenshots and videos to Allure report.
+    Fixture for the browser context of each test case, taken from the context pool.
+
+    The context is a reset context of the pool, or a fresh one when the profile
+    disables the pool or the test is marked with isolated_context. Either way its
+    requests are routed through the asset cache. When the worker already has
+    MaxContextsPerWorker contexts open, idle pooled contexts are closed first. Sets the default
+    action, assertion and navigation timeouts and starts tracing when the profile
+    records traces. After the test, screenshots and the trace are written only if
+    the artifact policies keep them, and every artifact is handed to
+    pytest_runtest_makereport, which attaches or deletes it once the pages of the
+    context are closed and their videos are saved.
+
+    Args:
+        browser (RecyclableBrowser): The browser of this worker.
+        browser_context_args (dict): The browser context arguments.
+        execution_profile (ExecutionProfile): The selected execution profile.
+        tmp_path (Path): Temporary directory of the test case.
+        request (pytest.FixtureRequest): The request for the current test.
+
+    Yields:
+        BrowserContext: The configured browser context.
+    """
+    limit = execution_profile.max_contexts_per_worker
+    if limit and len(browser.contexts) >= limit:
+        request.getfixturevalue("context_pool").shrink(len(browser.contexts) - limit + 1)
+        if len(browser.contexts) >= limit:
+            raise RuntimeError(
+                f"{len(browser.contexts)} browser contexts are open, "
+                f"MaxContextsPerWorker is {limit}"
+            )
+
+    pooled = (
+        execution_profile.context_pool_size > 0
+        and request.node.get_closest_marker("isolated_context") is None
+    )
+    if pooled:
+        context_args_marker = request.node.get_closest_marker("browser_context_args")
+        pool = request.getfixturevalue("context_pool")
+        context = pool.acquire(
+            {**browser_context_args, **(context_args_marker.kwargs if context_args_marker else {})}
+        )
+    else:
+        context = request.getfixturevalue("new_context")()
+        request.getfixturevalue("asset_cache").install(context)
+
+    context.set_default_timeout(execution_profile.timeout)
+    context.set_default_navigation_timeout(execution_profile.navigation_timeout)
+    expect.set_options(timeout=execution_profile.timeout)
+    if execution_profile.tracing != "off":
+        context.tracing.start(screenshots=True, snapshots=True, sources=True)
+    pages = []
+    context.on("page", pages.append)
+
+    yield context
+
+    context.remove_listener("page", pages.append)
+    failed = request.node.rep_call.failed if hasattr(request.node, "rep_call") else True
+    name = slugify(request.node.nodeid)
+    artifacts = request.node.stash.setdefault(artifacts_key, [])
+
+    if should_keep(execution_profile.screenshot, failed):
+        for index, page in enumerate(context.pages):
+            screenshot_path = str(tmp_path / f"screenshot-{index}.png")
+            try:
+                page.screenshot(path=screenshot_path, type='png')
+                artifacts.append(
+                    (screenshot_path, f"{name}.png", allure.attachment_type.PNG, None, True)
+                )
+            except Exception as e:
+                logger.error(f"Error taking screenshot: {e}")
+
+    if execution_profile.tracing != "off":
+        keep_trace = should_keep(execution_profile.tracing, failed)
+        trace_path = str(tmp_path / "trace.zip")
+        try:
+            context.tracing.stop(path=trace_path if keep_trace else None)
+            if keep_trace:
+                artifacts.append((trace_path, f"{name}-trace.zip", "application/zip", "zip", True))
+        except Exception as e:
+            logger.error(f"Error saving trace: {e}")
+
+    keep_video = should_keep(execution_profile.video, failed)
+    for page in pages:
+        if page.video is not None:
+            artifacts.append(
+                (page.video.path(), f"{name}.webm", allure.attachment_type.WEBM, None, keep_video)
+            )
+
+    if pooled:
+        pool.release(context)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """
+    Custom hook to attach screenshots, traces and videos to Allure report.
+
+    Runs after the teardown of a test, when its browser context is closed and its
+    videos are saved. The log records buffered by the AllureLogger handler are
+    written to the report first. Kept artifacts are attached by path and published by the
+    artifact pipeline on a background thread; the others are deleted right away.
 
     Args:
         item: The test item.
         call: The call information.
+    """
+    yield
+    if call.when != "teardown":
+        return
+
+    item.config.stash[allure_logger_key].flush_test()
+    pipeline = item.config.stash[artifact_pipeline_key]
+    for path, name, attachment_type, extension, keep in item.stash.get(artifacts_key, []):
+        if keep:
+            try:
+                pipeline.attach(path, name, attachment_type, extension)
+            except Exception as e:
+                logger.error(f"Error attaching {name}: {e}")
+        else:
+            pipeline.discard([path])
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    """
+    Fails a test that passed but whose page loads exceeded their page budgets.
+
+    Args:
+        item: The test item.
+    """
+    outcome = yield
+    metrics = item.stash.get(page_metrics_key, None)
+    if metrics is None or outcome.excinfo is not None:
+        return
+    metrics.flush()
+    violations = metrics.violations()
+    if violations:
+        outcome.force_exception(
+            pytest.fail.Exception("Page budgets exceeded:\n" + "\n".join(violations), pytrace=False)
+        )
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_teardown(item, nextitem):
+    """
+    Hands the browser to the browser watchdog once a test is torn down, and
+    recycles the browser when the watchdog asks for it.
+
+    The session fixtures holding the browser stay set up: the RecyclableBrowser
+    closes the contexts they registered and relaunches the browser on its next use.
+
+    Args:
+        item: The test item.
+        nextitem: The test that runs after this one.
+    """
+    yield
+    watchdog = item.config.stash.get(browser_watchdog_key, None)
+    browser = item.config.stash.get(browser_key, None)
+    if watchdog is None or browser is None or browser.current is None:
+        return
+    reason = watchdog.check(browser.current, item.nodeid)
+    if reason is None or nextitem is None:
+        return
+    logger.info(f"Recycling the browser after {item.nodeid}: {reason}")
+    browser.recycle()
+    watchdog.recycled(item.nodeid, reason)
+
+def flow_retries(item: pytest.Item) -> int:
+    """
+    Returns the number of times a failed test is retried.
+
+    Args:
+        item (pytest.Item): The test item.
 
     Returns:
-        None
+        int: The count of its flow_retries marker, else --flow-retries.
+    """
+    marker = item.get_closest_marker("flow_retries")
+    return marker.args[0] if marker else item.config.getoption("--flow-retries")
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_protocol(item, nextitem):
+    """
+    Retries a failed test up to --flow-retries times, or as set by its flow_retries marker.
+
+    Each attempt runs pytest's own runtestprotocol without logging, as
+    pytest-rerunfailures does, and its teardown keeps the fixtures the next test
+    shares. The reports of a failed attempt that is retried are logged with the
+    outcome "rerun"; only the last attempt decides the outcome of the test.
+
+    Args:
+        item: The test item.
+        nextitem: The test that runs after this one.
+
+    Returns:
+        True if the test was run here, None to leave it to pytest without retries.
+    """
+    retries = flow_retries(item)
+    if not retries:
+        return None
+
+    item.ihook.pytest_runtest_logstart(nodeid=item.nodeid, location=item.location)
+    for attempt in range(retries + 1):
+        item.stash[attempt_key] = attempt
+        retry = attempt < retries
+        reports = runtestprotocol(item, nextitem=nextitem, log=False)
+        failed = any(report.failed for report in reports)
+        for report in reports:
+            if retry and failed and report.failed:
+                report.outcome = "rerun"
+            item.ihook.pytest_runtest_logreport(report=report)
+        if not failed:
+            break
+        logger.info(f"Attempt {attempt + 1} of {item.nodeid} failed")
+    item.ihook.pytest_runtest_logfinish(nodeid=item.nodeid, location=item.location)
+    return True
+
+def pytest_report_teststatus(report, config):
+    """
+    Reports the failed attempts of a retried test as reruns.
+
+    Args:
+        report: The test report.
+        config: The pytest configuration object.
+
+    Returns:
+        The category, short letter and verbose word of a rerun, None for other reports.
+    """
+    if report.outcome == "rerun":
+        return "rerun", "R", ("RERUN", {"yellow": True})
+    return None
+
+def pytest_sessionstart(session):
+    """
+    Starts the artifact pipeline and connects the AllureLogger handler once Allure
+    has registered its reporter. Outside pytest-xdist workers it also loads the test
+    durations of past runs and starts recording those of this run, and with --impact
+    maps the changes since the base ref to page objects and decides whether every
+    test must run. Both are kept in the pytest cache, so they are skipped when the
+    cacheprovider plugin is disabled.
+
+    Args:
+        session: The pytest session object.
     """
-    if call.when == "call":
-        if call.excinfo is not None and "page" in item.funcargs:
-            page: Page = item.funcargs["page"]
+    listener = session.config.pluginmanager.getplugin("allure_listener")
+    session.config.stash[artifact_pipeline_key] = ArtifactPipeline(
+        session.config.getoption("allure_report_dir", None),
+        listener.allure_logger if listener else None
+    )
+    session.config.stash[allure_logger_key].reporter = listener.allure_logger if listener else None
+
+    cache = getattr(session.config, "cache", None)
+    if not hasattr(session.config, "workerinput") and cache is not None:
+        history = DurationHistory.load(cache)
+        session.config.pluginmanager.register(history, "duration_history")
+        session.config.stash[duration_history_key] = history
+
+    base = session.config.getoption("--impact")
+    if base and not hasattr(session.config, "workerinput"):
+        if cache is None:
+            logger.warning("Running every test: --impact needs the pytest cache")
+        else:
+            rootpath = session.config.rootpath
             try:
-                allure.attach(
-                    page.screenshot(type='png'),
-                    name=f"{slugify(item.nodeid)}.png",
-                    attachment_type=allure.attachment_type.PNG
+                changes = changed_keys(changed_lines(base, rootpath), rootpath)
+            except RuntimeError as e:
+                raise pytest.UsageError(f"--impact {base}: {e}")
+            reason = ImpactMap.load(cache).full_run_reason(
+                changes, session.config.getoption("--impact-full-every")
+            )
+            session.config.stash[impact_key] = {
+                "base": base, "changes": changes, "full_run_reason": reason
+            }
+            logger.info(
+                f"Change impact since {base}: running every test, {reason}" if reason
+                else f"Change impact since {base}: changed {changes['keys']}, "
+                     f"modules {changes['prefixes']}, test files {changes['test_files']}"
+            )
+
+def pytest_sessionfinish(session):
+    """
+    Waits for the artifact pipeline to publish every queued artifact, then saves the
+    test durations of the run, the action latency report, the page metrics and the
+    browser watchdog report. With --impact, the page objects each test exercised
+    are saved to the impact map, and the run counts as a full run only when every
+    test of the suite ran. With --allure-merge-into, the Allure results of the
+    run are then merged into the shared results directory.
+
+    Args:
+        session: The pytest session object.
+    """
+    pipeline = session.config.stash.get(artifact_pipeline_key, None)
+    if pipeline:
+        pipeline.close()
+
+    workeroutput = getattr(session.config, "workeroutput", None)
+    if workeroutput is not None:
+        workeroutput["asset_cache"] = dict(session.config.stash[asset_cache_stats_key])
+        workeroutput["timing_spans"] = timing.recorder.spans
+        workeroutput["page_navigations"] = session.config.stash[page_navigations_key]
+        watchdog = session.config.stash.get(browser_watchdog_key, None)
+        if watchdog is not None:
+            workeroutput["browser_watchdog"] = watchdog.to_dict()
+        recorder = session.config.stash.get(impact_recorder_key, None)
+        if recorder is not None:
+            workeroutput["impact_covered"] = recorder.covered
+        workeroutput["impact_narrowed"] = session.config.stash[impact_narrowed_key]
+        return
+
+    watchdog = session.config.stash.get(browser_watchdog_key, None)
+    if watchdog is not None:
+        session.config.stash[browser_watchdog_reports_key].append(watchdog.to_dict())
+
+    cache = getattr(session.config, "cache", None)
+    history = session.config.stash.get(duration_history_key, None)
+    if history is not None:
+        history.update()
+        history.save(cache)
+
+    report_path = session.config.getoption("--timing-report")
+    if report_path is None and cache is not None:
+        report_path = Path(cache.mkdir("timing")) / "report.json"
+    if timing.recorder.spans and report_path is not None:
+        report_path = Path(report_path)
+        timing.recorder.write(report_path)
+        session.config.stash[timing_report_key] = report_path
+
+    navigations = session.config.stash[page_navigations_key]
+    if navigations and cache is not None:
+        history = PageMetricsHistory(cache.mkdir("page_metrics"))
+        session.config.stash[page_metrics_summary_key] = history.record(
+            session.config.stash[run_id_key], navigations
+        )
+
+    impact = session.config.stash.get(impact_key, None)
+    if impact and not session.config.option.collectonly:
+        covered = session.config.stash[impact_covered_key]
+        covered.update(session.config.stash[impact_recorder_key].covered)
+        # Only a run of the whole suite resets the count towards the next full run;
+        # path arguments, deselection and stopping early (-x) leave tests out.
+        impact["full_run"] = impact["full_run_reason"] is not None and not (
+            session.config.stash[impact_narrowed_key]
+            or session.config.args_source == pytest.Config.ArgsSource.ARGS
+            or session.shouldstop
+            or session.shouldfail
+        )
+        impact_map = ImpactMap.load(cache)
+        impact_map.update(covered)
+        impact_map.finish_run(impact["full_run"])
+        impact_map.save(cache)
+
+    merge_dir = session.config.getoption("--allure-merge-into")
+    report_dir = session.config.getoption("allure_report_dir", None)
+    if merge_dir and report_dir and os.path.isdir(report_dir):
+        merge = AllureMerge(merge_dir, session.config.getoption("--allure-compact-logs"))
+        session.config.stash[allure_merge_key] = merge.merge(
+            report_dir, f"{socket.gethostname()}:{Path(report_dir).resolve()}"
+        )
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """
+    Adds the asset cache counters, timed spans, page loads, browser watchdog report
+    and page objects exercised per test of a finished pytest-xdist worker to the totals.
+
+    Args:
+        node: The worker node that finished.
+        error: The error of the worker, if any.
+    """
+    workeroutput = getattr(node, "workeroutput", {})
+    node.config.stash[asset_cache_stats_key].update(workeroutput.get("asset_cache", {}))
+    timing.recorder.spans.extend(workeroutput.get("timing_spans", []))
+    node.config.stash[page_navigations_key].extend(workeroutput.get("page_navigations", []))
+    if "browser_watchdog" in workeroutput:
+        node.config.stash[browser_watchdog_reports_key].append(workeroutput["browser_watchdog"])
+    node.config.stash[impact_covered_key].update(workeroutput.get("impact_covered", {}))
+    if workeroutput.get("impact_narrowed"):
+        node.config.stash[impact_narrowed_key] = True
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    """
+    Reports the asset cache counters, the action latencies, the page load metrics,
+    the browser recycles and leak suspects, the Allure results merge and the change
+    impact selection of the session.
+
+    Args:
+        terminalreporter: The terminal reporter.
+        exitstatus: The exit status of the session.
+        config: The pytest configuration object.
+    """
+    stats = config.stash[asset_cache_stats_key]
+    if stats:
+        terminalreporter.write_sep("-", "asset cache")
+        terminalreporter.write_line(
+            f"hits: {stats['hits']}, misses: {stats['misses']}, blocked: {stats['blocked']}, "
+            f"served from cache: {stats['bytes_served'] / 1024:.1f} KiB"
+        )
+
+    report_path = config.stash.get(timing_report_key, None)
+    if report_path:
+        terminalreporter.write_sep("-", "action latency (ms)")
+        for action, latency in timing.recorder.summary()["actions"].items():
+            terminalreporter.write_line(
+                f"{action}: p50 {latency['p50']:.1f}, p95 {latency['p95']:.1f}, "
+                f"p99 {latency['p99']:.1f} ({latency['count']} calls)"
+            )
+        terminalreporter.write_line(f"report: {report_path}")
+
+    summary = config.stash.get(page_metrics_summary_key, None)
+    if summary:
+        terminalreporter.write_sep("-", "page metrics (p50)")
+        for path, page in summary.items():
+            fields = ", ".join(
+                f"{metric} {page[metric]['p50']:g}"
+                for metric in ("load_ms", "first_contentful_paint_ms", "transfer_bytes")
+                if metric in page
+            )
+            terminalreporter.write_line(f"{path}: {fields} ({page['count']} loads)")
+
+    reports = config.stash[browser_watchdog_reports_key]
+    if any(report["peak"] for report in reports):
+        terminalreporter.write_sep("-", "browser watchdog")
+        peaks = Counter()
+        for report in reports:
+            for key, value in report["peak"].items():
+                peaks[key] = max(peaks[key], value)
+        terminalreporter.write_line(
+            "peak per worker: " + ", ".join(f"{key} {value:g}" for key, value in peaks.items())
+        )
+        for report in reports:
+            for recycle in report["recycles"]:
+                terminalreporter.write_line(
+                    f"recycled browser after {recycle['test']}: {recycle['reason']}"
+                )
+        for report in reports:
+            for suspect in report["leak_suspects"]:
+                url = f" at {suspect['url']}" if suspect["url"] else ""
+                terminalreporter.write_line(
+                    f"leak suspect: {suspect['kind']}{url} left open by {suspect['test']}"
                 )
-            except Exception as e:
-                logger.error(f"Error attaching screenshot: {e}")
 
-            try:
-                video_path = page.video.path()
-                page.context.close()  # Ensure video is saved
-                allure.attach(
-                    open(video_path, 'rb').read(),
-                    name=f"{slugify(item.nodeid)}.webm",
-                    attachment_type=allure.attachment_type.WEBM
+    counts = config.stash.get(allure_merge_key, None)
+    if counts is not None:
+        terminalreporter.write_sep("-", "allure merge")
+        terminalreporter.write_line(
+            f"{counts['merged']} files merged into {config.getoption('--allure-merge-into')}, "
+            f"{counts['deduplicated']} duplicate attachments "
+            f"({counts['bytes_saved'] / 1024:.1f} KiB saved), "
+            f"{counts['log_steps_compacted']} log steps compacted"
+        )
+
+    impact = config.stash.get(impact_key, None)
+    if impact:
+        terminalreporter.write_sep("-", "change impact")
+        changes = impact["changes"]
+        if impact["full_run_reason"]:
+            terminalreporter.write_line(f"ran every test: {impact['full_run_reason']}")
+            if not impact.get("full_run", True):
+                terminalreporter.write_line(
+                    "not counted as a full run: tests were left out by path arguments, "
+                    "deselection or stopping early"
                 )
-            except Exception as e:
-                logger.error(f"Error attaching video: {e}")
+        else:
+            terminalreporter.write_line(
+                f"since {impact['base']}: {len(changes['keys'])} changed page object members, "
+                f"{len(changes['prefixes'])} changed modules, "
+                f"{len(changes['test_files'])} changed test files"
+            )
+        terminalreporter.write_line(
+            f"impact map updated for {len(config.stash[impact_covered_key])} tests"
+        )
 
 @pytest.hookimpl(tryfirst=True)
 def pytest_configure(config):
@@ -109,20 +1435,88 @@ def pytest_configure(config):
     Configures the logging settings for pytest.
 
     This function sets up the logging configuration for pytest, ensuring that log messages
-    are captured and sent to the Allure report. It sets the logging level to INFO and adds
-    the custom AllureLogger handler if it is not already present.
+    are captured and sent to the Allure report. The AllureLogger handler is added with the
+    LogMode, LogLevel and LogMaxRecords settings of config.ini if it is not already present.
+    It also picks the run id that the usernames of this run are derived from; xdist workers
+    receive the run id of the controller, and with --impact its selection of the tests to
+    run. With --impact the page objects each test exercises are recorded.
 
     Args:
         config: The pytest configuration object.
     """
+    log_settings = configparser.ConfigParser()
+    log_settings.read('config.ini')
+    log_settings = log_settings['DEFAULT']
+    level_name = log_settings.get('LogLevel', 'INFO').upper()
+    level = logging.getLevelName(level_name)
+    if not isinstance(level, int):
+        raise pytest.UsageError(
+            f"LogLevel must be one of DEBUG, INFO, WARNING, ERROR, CRITICAL, got '{level_name}'"
+        )
     logger = logging.getLogger()
-    logger.setLevel(logging.INFO)
-    allure_logger = AllureLogger()
-    if allure_logger not in logger.handlers:
+    logger.setLevel(min(logging.INFO, level))
+    allure_logger = next(
+        (handler for handler in logger.handlers if isinstance(handler, AllureLogger)), None
+    )
+    if allure_logger is None:
+        try:
+            allure_logger = AllureLogger(
+                log_settings.get('LogMode', 'step').lower(),
+                level,
+                log_settings.getint('LogMaxRecords', 1000)
+            )
+        except ValueError as e:
+            raise pytest.UsageError(str(e))
         logger.addHandler(allure_logger)
+    config.stash[allure_logger_key] = allure_logger
 
+    workerinput = getattr(config, "workerinput", None)
+    config.stash[run_id_key] = workerinput["run_id"] if workerinput else new_run_id()
+    config.stash[asset_cache_stats_key] = Counter()
+    config.stash[page_navigations_key] = []
+    config.stash[browser_watchdog_reports_key] = []
+    config.stash[impact_key] = workerinput.get("impact") if workerinput else None
+    config.stash[impact_covered_key] = {}
+    config.stash[impact_narrowed_key] = False
+    if config.getoption("--impact"):
+        recorder = ImpactRecorder(config.rootpath)
+        config.pluginmanager.register(recorder, "impact_recorder")
+        config.stash[impact_recorder_key] = recorder
 
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    """
+    Hands the run id and the change impact selection of the controller to a
+    pytest-xdist worker.
 
+    Args:
+        node: The worker node being configured.
+    """
+    node.workerinput["run_id"] = node.config.stash[run_id_key]
+    node.workerinput["impact"] = node.config.stash[impact_key]
 
+@pytest.hookimpl(optionalhook=True, tryfirst=True)
+def pytest_xdist_make_scheduler(config, log):
+    """
+    Schedules the tests of a --dist load run longest first by their past durations.
 
+    Tests that failed in their last run go first with --failed-first. Tests without
+    history are estimated at the median duration of the others.
 
+    Args:
+        config: The pytest configuration object.
+        log: The pytest-xdist log producer.
+
+    Returns:
+        The DurationScheduling, or None to leave other distribution modes, and runs
+        without the pytest cache, to pytest-xdist.
+    """
+    history = config.stash.get(duration_history_key, None)
+    if (
+        config.getvalue("dist") != "load"
+        or config.getoption("--no-duration-scheduling")
+        or history is None
+    ):
+        return None
+    from utils.duration_scheduling import DurationScheduling
+    return DurationScheduling(config, log, history, config.getoption("failedfirst"))
@@ -0,0 +1,10 @@
+from enum import Enum
+
+class Outcomes(Enum):
+    """
+    Represents the ways a submitted form can settle.
+    """
+    SUCCESS = "success"
+    ERROR = "error"
+    NAVIGATED = "navigated"
+    TIMEOUT = "timeout"
@@ -0,0 +1,45 @@
+from playwright.async_api import Page
+from enums.outcomes import Outcomes
+from pages.async_pages.contact_page import ContactPage
+from pages.async_pages.login_page import LoginPage
+from pages.async_pages.register_page import RegisterPage
+from pages.async_pages.secured_area_page import SecuredAreaPage
+
+async def register_login_and_send_contact_message(
+    page: Page, user: str, password: str, application_url: str
+) -> None:
+    """
+    Async version of the register, login and send contact message flow.
+
+    Runs the same steps as test_register_login_and_send_contact_message on the async
+    page objects, so many flows can run as concurrent tasks in one process.
+
+    Args:
+        page (Page): The async Playwright Page object.
+        user (str): The username for registration and login.
+        password (str): The password for registration and login.
+        application_url (str): The base URL of the application.
+
+    Raises:
+        AssertionError: If a step does not settle on its success notification.
+    """
+    register_page = RegisterPage(page)
+    login_page = LoginPage(page)
+    secured_area_page = SecuredAreaPage(page)
+    contact_page = ContactPage(page)
+
+    await register_page.goto(f"{application_url}/register")
+
+    outcome, message = await register_page.register(user, password)
+    assert outcome is Outcomes.SUCCESS, f"Registration of {user} failed: {outcome.name} {message}"
+
+    outcome, message = await login_page.login(user, password)
+    assert outcome is Outcomes.SUCCESS, f"Login of {user} failed: {outcome.name} {message}"
+
+    await secured_area_page.click_contact()
+    outcome, message = await contact_page.send_contact_message(
+        user,
+        "test@gmail.com",
+        "This is a test message."
+    )
+    assert outcome is Outcomes.SUCCESS, f"Contact message of {user} failed: {outcome.name} {message}"
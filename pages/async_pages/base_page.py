@@ -0,0 +1,293 @@
+import logging
+import os
+from typing import Optional
+from playwright.async_api import APIRequestContext, APIResponse, Locator, Page
+from playwright.async_api import expect
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+from enums.outcomes import Outcomes
+from pages.base_page import (
+    BATCH_FILL_ENV_VARIABLE,
+    FILL_FORM_SCRIPT,
+    FILL_SCRIPT,
+    OUTCOME_SCRIPT,
+    outcome_from_body,
+)
+from utils.timing import timed
+
+class BasePage:
+    """
+    Async counterpart of pages.base_page.BasePage built on playwright.async_api.
+
+    Method names and return values match the sync page objects, so a flow can be
+    ported by awaiting each call.
+
+    Attributes:
+        page (Page): The async Playwright Page object.
+        logger (Logger): Logger for logging notifications.
+        timeout (int): Timeout value for waiting for elements.
+        success_notification_selector (str): CSS selector for success notifications.
+        error_notification_selector (str): CSS selector for error notifications.
+        via_api (bool): Whether forms are submitted over HTTP instead of through the DOM.
+        request (APIRequestContext): Request context used for HTTP form submissions.
+        batch_fill (bool): Whether fill_form fills fields in batched browser calls.
+    """
+
+    def __init__(
+        self,
+        page: Page,
+        timeout: int = 5000,
+        via_api: bool = False,
+        request: Optional[APIRequestContext] = None
+    ):
+        """
+        Initializes the BasePage with the given async Playwright Page object and timeout.
+
+        Args:
+            page (Page): The async Playwright Page object.
+            timeout (int): Timeout value for waiting for elements. Default is 5000 milliseconds.
+            via_api (bool): Whether forms are submitted over HTTP by default. Default is False.
+            request (Optional[APIRequestContext]): Request context for HTTP form submissions.
+                Defaults to the request context of the page's browser context.
+        """
+        self.page = page
+        self.logger = logging.getLogger()
+        self.timeout = timeout
+        self.success_notification_selector = "#flash"
+        self.error_notification_selector = ".alert-danger"
+        self.via_api = via_api
+        self.request = request or page.request
+        self.batch_fill = os.environ.get(BATCH_FILL_ENV_VARIABLE, "1") != "0"
+
+    def use_api(self, via_api: Optional[bool] = None) -> bool:
+        """
+        Resolves whether a call should go over HTTP.
+
+        Args:
+            via_api (Optional[bool]): Per-call override, None to use the page default.
+
+        Returns:
+            bool: True if the form should be submitted over HTTP.
+        """
+        return self.via_api if via_api is None else via_api
+
+    @timed()
+    async def goto(self, url: str) -> None:
+        """
+        Navigates the page to a URL.
+
+        Args:
+            url (str): The URL, or a path relative to the base URL of the context.
+        """
+        self.logger.info(f"Navigating to {url}")
+        await self.page.goto(url)
+
+    @timed()
+    async def submit_form(
+        self,
+        path: str,
+        form: dict,
+        expected_path: Optional[str] = None,
+        expected_text: Optional[str] = None
+    ) -> tuple[Outcomes, str]:
+        """
+        Posts a form over HTTP and reads its outcome from the final response.
+
+        Args:
+            path (str): URL path the form is posted to.
+            form (dict): The form fields to post.
+            expected_path (Optional[str]): URL path the form redirects to on success.
+            expected_text (Optional[str]): Text of the expected success notification.
+
+        Returns:
+            tuple[Outcomes, str]: The outcome and the notification text, or the reached
+            URL for Outcomes.NAVIGATED.
+        """
+        response = await self.request.post(path, form=form, timeout=self.timeout)
+        outcome, message = await self.outcome_from_response(response, expected_path, expected_text)
+        self.logger.info(f"Outcome of POST {path}: {outcome.value} {message}")
+        return outcome, message
+
+    async def outcome_from_response(
+        self,
+        response: APIResponse,
+        expected_path: Optional[str] = None,
+        expected_text: Optional[str] = None
+    ) -> tuple[Outcomes, str]:
+        """
+        Maps an HTTP response to the outcome the UI would have settled on.
+
+        Args:
+            response (APIResponse): The final response of a form submission.
+            expected_path (Optional[str]): URL path the form redirects to on success.
+            expected_text (Optional[str]): Text of the expected success notification.
+
+        Returns:
+            tuple[Outcomes, str]: The outcome and the notification text, or the reached
+            URL for Outcomes.NAVIGATED.
+        """
+        return outcome_from_body(
+            await response.text(),
+            response,
+            self.error_notification_selector,
+            self.success_notification_selector,
+            expected_path,
+            expected_text
+        )
+
+    @timed()
+    async def wait_for_outcome(
+        self, expected_path: Optional[str] = None, expected_text: Optional[str] = None
+    ) -> tuple[Outcomes, str]:
+        """
+        Waits for whichever outcome of a submitted form settles first.
+
+        See pages.base_page.BasePage.wait_for_outcome for how the race is decided.
+
+        Args:
+            expected_path (Optional[str]): URL path the form redirects to on success.
+            expected_text (Optional[str]): Text of the expected success notification.
+
+        Returns:
+            tuple[Outcomes, str]: The settled outcome and the notification text,
+            or the reached URL for Outcomes.NAVIGATED.
+        """
+        try:
+            handle = await self.page.wait_for_function(
+                OUTCOME_SCRIPT,
+                arg=[
+                    self.error_notification_selector,
+                    self.success_notification_selector,
+                    expected_path,
+                    expected_text,
+                ],
+                timeout=self.timeout,
+            )
+            outcome, message = await handle.json_value()
+        except PlaywrightTimeoutError:
+            self.logger.error("No outcome settled within the expected time.")
+            return Outcomes.TIMEOUT, ""
+        except Exception as e:
+            self.logger.error(f"An error occurred while waiting for outcome: {e}")
+            return Outcomes.ERROR, str(e)
+
+        self.logger.info(f"Outcome settled: {outcome} {message}")
+        return Outcomes(outcome), message
+
+    @timed("success_notification_selector")
+    async def is_success_notification_displayed(self, text: str) -> bool:
+        try:
+            message = (
+                await self.page.locator(self.success_notification_selector).inner_text(
+                    timeout=self.timeout
+                )
+            ).strip()
+            if message == text:
+                self.logger.info(f"Success message displayed: {message}")
+                return True
+            else:
+                self.logger.warning(f"Success message text mismatch: expected '{text}', got '{message}'")
+                return False
+        except PlaywrightTimeoutError:
+            self.logger.error("Success message not displayed within the expected time.")
+            return False
+        except Exception as e:
+            self.logger.error(f"An error occurred while checking success message: {e}")
+            return False
+
+    @timed("error_notification_selector")
+    async def is_error_notification_displayed(self) -> bool:
+        try:
+            await self.page.wait_for_selector(self.error_notification_selector, timeout=self.timeout)
+            return True
+        except PlaywrightTimeoutError:
+            self.logger.debug("Error message not displayed within the expected time.")
+            return False
+        except Exception as e:
+            self.logger.error(f"An error occurred while checking error message: {e}")
+            return False
+
+    @timed()
+    async def click_element(self, element) -> bool:
+        """
+        Clicks on the given element if it is visible.
+
+        Args:
+            element: The element to be clicked.
+
+        Returns:
+            bool: True if the element was clicked successfully, False otherwise.
+        """
+        try:
+            await expect(element).to_be_visible()
+            await element.click()
+        except TimeoutError:
+            self.logger.error(f"Element {element} not found or not visible.")
+            return False
+        return True
+
+    @timed()
+    async def fill_form(
+        self, fields: dict[Locator | str, str], batched: Optional[bool] = None
+    ) -> bool:
+        """
+        Fills several form fields with as few browser round-trips as possible.
+
+        See pages.base_page.BasePage.fill_form for how fields are filled.
+
+        Args:
+            fields (dict[Locator | str, str]): Values by Locator or CSS selector.
+            batched (Optional[bool]): Fill in batched calls, or field by field through
+                fill_element. Defaults to the batch_fill setting.
+
+        Returns:
+            bool: True if every field was filled successfully, False otherwise.
+        """
+        batched = self.batch_fill if batched is None else batched
+        targets = {
+            target: self.page.locator(target) if isinstance(target, str) else target
+            for target in fields
+        }
+        if not batched:
+            results = [
+                await self.fill_element(targets[target], value) for target, value in fields.items()
+            ]
+            return all(results)
+
+        selectors = [[target, value] for target, value in fields.items() if isinstance(target, str)]
+        failed = await self.page.evaluate(FILL_FORM_SCRIPT, selectors) if selectors else []
+        missing = False
+        for target, value in fields.items():
+            if isinstance(target, str):
+                continue
+            try:
+                if not await target.evaluate(FILL_SCRIPT, value, timeout=self.timeout):
+                    failed.append(target)
+            except PlaywrightTimeoutError:
+                self.logger.error(f"Element {target} not found.")
+                missing = True
+            except Exception as e:
+                self.logger.debug(f"Batched fill of {target} failed: {e}")
+                failed.append(target)
+
+        results = [await self.fill_element(targets[target], fields[target]) for target in failed]
+        return all(results) and not missing
+
+    @timed()
+    async def fill_element(self, element, text: str) -> bool:
+        """
+        Fills the given element with the specified text if it is visible.
+
+        Args:
+            element: The element to be filled.
+            text (str): The text to fill into the element.
+
+        Returns:
+            bool: True if the element was filled successfully, False otherwise.
+        """
+        try:
+            await expect(element).to_be_visible()
+            await element.fill(text)
+        except TimeoutError:
+            self.logger.error(f"Element {element} not found or not visible.")
+            return False
+        return True
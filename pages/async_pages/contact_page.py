@@ -0,0 +1,73 @@
+from typing import Optional
+from playwright.async_api import Page
+from enums.notifications import Notifications
+from enums.outcomes import Outcomes
+from pages.async_pages.base_page import BasePage
+
+class ContactPage(BasePage):
+    """
+    Async ContactPage class to handle interactions with the contact page.
+
+    Attributes:
+        name_input (Locator): Locator for the name input field.
+        email_address_input (Locator): Locator for the email input field.
+        message_textarea (Locator): Locator for the address textarea.
+        send_button (Locator): Locator for the send button.
+        form_path (str): URL path the contact form is posted to.
+    """
+    
+    def __init__(self, page: Page, via_api: bool = False):
+        """
+        Initializes the ContactPage with the given async Playwright Page object.
+
+        Args:
+            page (Page): The async Playwright Page object.
+            via_api (bool): Whether forms are submitted over HTTP by default. Default is False.
+        """
+        super().__init__(page, via_api=via_api)
+        self.name_input = page.locator('label:has-text("Name") + input')
+        self.email_address_input = page.locator('label:has-text("Email") + input')
+        self.message_textarea = page.locator('textarea[name="address"]')
+        self.send_button = page.get_by_role("link", name="Send")
+        self.form_path = "/contact"
+
+    async def click_send(self):
+        """
+        Clicks the send button to submit the form.
+        """
+        self.logger.info("Clicking the send button")
+        await self.click_element(self.send_button)
+
+    async def send_contact_message(
+        self, name: str, email: str, address: str, via_api: Optional[bool] = None
+    ) -> tuple[Outcomes, str]:
+        """
+        Fills out and sends the contact form.
+
+        Args:
+            name (str): The name to enter in the form.
+            email (str): The email to enter in the form.
+            address (str): The address to enter in the form.
+            via_api (Optional[bool]): Post the form over HTTP instead of driving the DOM.
+                Defaults to the page's via_api setting.
+
+        Returns:
+            tuple[Outcomes, str]: The settled outcome and its notification text.
+        """
+        if self.use_api(via_api):
+            self.logger.info(f"Sending contact message over the API: {name}")
+            return await self.submit_form(
+                self.form_path,
+                {"name": name, "email": email, "address": address},
+                expected_text=Notifications.MESSAGE_SENT_SUCCESS.value
+            )
+        self.logger.info(f"Filling contact form: {name}")
+        await self.fill_form({
+            self.name_input: name,
+            self.email_address_input: email,
+            self.message_textarea: address,
+        })
+        await self.click_send()
+        return await self.wait_for_outcome(
+            expected_text=Notifications.MESSAGE_SENT_SUCCESS.value
+        )
\ No newline at end of file
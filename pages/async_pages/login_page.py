@@ -0,0 +1,75 @@
+from typing import Optional
+from playwright.async_api import Page
+from enums.notifications import Notifications
+from enums.outcomes import Outcomes
+from pages.async_pages.base_page import BasePage
+
+class LoginPage(BasePage):
+    """
+    Async LoginPage class to handle interactions with the login page.
+
+    Attributes:
+        username_input (Locator): Locator for the username input field.
+        password_input (Locator): Locator for the password input field.
+        login_button (Locator): Locator for the login button.
+        success_path (str): URL path the user is redirected to after logging in.
+        form_path (str): URL path the login form is posted to.
+    """
+    
+    def __init__(self, page: Page, via_api: bool = False):
+        """
+        Initializes the LoginPage with the given async Playwright Page object.
+
+        Args:
+            page (Page): The async Playwright Page object.
+            via_api (bool): Whether forms are submitted over HTTP by default. Default is False.
+        """
+        super().__init__(page, via_api=via_api)
+        self.username_input = page.get_by_label("Username")
+        self.password_input = page.get_by_label("Password")
+        self.login_button = page.get_by_role("button", name="Login")
+        self.success_path = "/secure"
+        self.form_path = "/authenticate"
+        
+    async def click_login(self):
+        """
+        Clicks the login button to submit the form.
+        """
+        self.logger.info("Clicking the login button")
+        await self.click_element(self.login_button)
+        
+    async def login(
+        self, username: str, password: str, via_api: Optional[bool] = None
+    ) -> tuple[Outcomes, str]:
+        """
+        Logs in the user by filling out the login form and clicking the login button.
+
+        Over the API the session cookie is stored in the page's browser context, so
+        the page is logged in as well.
+
+        Args:
+            username (str): The username to enter in the form.
+            password (str): The password to enter in the form.
+            via_api (Optional[bool]): Post the form over HTTP instead of driving the DOM.
+                Defaults to the page's via_api setting.
+
+        Returns:
+            tuple[Outcomes, str]: The settled outcome and its notification text.
+        """
+        if self.use_api(via_api):
+            self.logger.info(f"Logging in over the API: {username}")
+            return await self.submit_form(
+                self.form_path,
+                {"username": username, "password": password},
+                self.success_path,
+                Notifications.LOGIN_SUCCESS.value
+            )
+        self.logger.info(f"Filling login form: {username}")
+        await self.fill_form({
+            self.username_input: username,
+            self.password_input: password,
+        })
+        await self.click_login()
+        return await self.wait_for_outcome(
+            self.success_path, Notifications.LOGIN_SUCCESS.value
+        )
\ No newline at end of file
@@ -0,0 +1,75 @@
+from typing import Optional
+from playwright.async_api import Page
+from enums.notifications import Notifications
+from enums.outcomes import Outcomes
+from pages.async_pages.base_page import BasePage
+
+class RegisterPage(BasePage):
+    """
+    Async RegisterPage class to handle interactions with the registration page.
+
+    Attributes:
+        username_input (Locator): Locator for the username input field.
+        password_input (Locator): Locator for the password input field.
+        confirm_password_input (Locator): Locator for the confirm password input field.
+        register_button (Locator): Locator for the register button.
+        success_path (str): URL path the user is redirected to after registering.
+        form_path (str): URL path the registration form is posted to.
+    """
+    
+    def __init__(self, page: Page, via_api: bool = False):
+        """
+        Initializes the RegisterPage with the given async Playwright Page object.
+
+        Args:
+            page (Page): The async Playwright Page object.
+            via_api (bool): Whether forms are submitted over HTTP by default. Default is False.
+        """
+        super().__init__(page, via_api=via_api)
+        self.username_input = page.get_by_label("Username")
+        self.password_input = page.get_by_label("Password", exact=True)
+        self.confirm_password_input = page.get_by_label("Confirm Password")
+        self.register_button = page.get_by_role("button", name="Register")
+        self.success_path = "/login"
+        self.form_path = "/register"
+
+    async def click_register(self):
+        """
+        Clicks the register button to submit the form.
+        """
+        self.logger.info("Clicking the register button")
+        await self.click_element(self.register_button)
+
+    async def register(
+        self, username: str, password: str, via_api: Optional[bool] = None
+    ) -> tuple[Outcomes, str]:
+        """
+        Registers a new user by filling out the registration form and clicking the register button.
+
+        Args:
+            username (str): The username to enter in the form.
+            password (str): The password to enter in the form.
+            via_api (Optional[bool]): Post the form over HTTP instead of driving the DOM.
+                Defaults to the page's via_api setting.
+
+        Returns:
+            tuple[Outcomes, str]: The settled outcome and its notification text.
+        """
+        if self.use_api(via_api):
+            self.logger.info(f"Registering user over the API: {username}")
+            return await self.submit_form(
+                self.form_path,
+                {"username": username, "password": password, "confirmPassword": password},
+                self.success_path,
+                Notifications.REGISTRATION_SUCCESS.value
+            )
+        self.logger.info(f"Filling registration form: {username}")
+        await self.fill_form({
+            self.username_input: username,
+            self.password_input: password,
+            self.confirm_password_input: password,
+        })
+        await self.click_register()
+        return await self.wait_for_outcome(
+            self.success_path, Notifications.REGISTRATION_SUCCESS.value
+        )
@@ -0,0 +1,27 @@
+from playwright.async_api import Page
+from pages.async_pages.base_page import BasePage
+
+class SecuredAreaPage(BasePage):
+    """
+    Async SecuredAreaPage class to handle interactions with the secured area page.
+
+    Attributes:
+        contact_button: Locator for the contact button.
+    """
+    
+    def __init__(self, page: Page):
+        """
+        Initializes the SecuredAreaPage with the given async Playwright Page object.
+
+        Args:
+            page (Page): The async Playwright Page object.
+        """
+        super().__init__(page)
+        self.contact_button = page.get_by_role("link", name="Contact")
+
+    async def click_contact(self):
+        """
+        Clicks the contact button to navigate to the contact page.
+        """
+        self.logger.info(f"Open Contact form by clicking Contact link on Bar")
+        await self.click_element(self.contact_button)
\ No newline at end of file
@@ -1,6 +1,107 @@
 import logging
-from playwright.sync_api import Page
+import os
+from typing import Optional
+from urllib.parse import urlparse
+from playwright.sync_api import APIRequestContext, APIResponse, Locator, Page
 from playwright.sync_api import expect
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+from enums.outcomes import Outcomes
+from utils.notification_parser import find_notification_text
+from utils.timing import timed
+
+OUTCOME_SCRIPT = """
+([errorSelector, successSelector, path, text]) => {
+    const visible = (element) => !!element && element.getClientRects().length > 0;
+    const error = document.querySelector(errorSelector);
+    if (visible(error)) {
+        return ["error", error.innerText.trim()];
+    }
+    const onPath = !path || window.location.pathname === path;
+    const flash = document.querySelector(successSelector);
+    if (onPath && visible(flash) && (!text || flash.innerText.trim() === text)) {
+        return ["success", flash.innerText.trim()];
+    }
+    if (path && onPath && !text) {
+        return ["navigated", window.location.href];
+    }
+    return false;
+}
+"""
+
+BATCH_FILL_ENV_VARIABLE = "PW_BATCH_FILL"
+
+FILL_FIELD_FUNCTION = """
+function fillField(element, value) {
+    if (!element || element.getClientRects().length === 0 || element.disabled || element.readOnly) {
+        return false;
+    }
+    const prototype = element instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype
+        : element instanceof HTMLSelectElement ? HTMLSelectElement.prototype
+        : HTMLInputElement.prototype;
+    element.focus();
+    Object.getOwnPropertyDescriptor(prototype, "value").set.call(element, value);
+    element.dispatchEvent(new Event("input", { bubbles: true }));
+    element.dispatchEvent(new Event("change", { bubbles: true }));
+    return true;
+}
+"""
+
+FILL_SCRIPT = f"""
+(element, value) => {{
+    {FILL_FIELD_FUNCTION}
+    return fillField(element, value);
+}}
+"""
+
+FILL_FORM_SCRIPT = f"""
+(fields) => {{
+    {FILL_FIELD_FUNCTION}
+    return fields
+        .filter(([selector, value]) => !fillField(document.querySelector(selector), value))
+        .map(([selector]) => selector);
+}}
+"""
+
+
+def outcome_from_body(
+    body: str,
+    response,
+    error_notification_selector: str,
+    success_notification_selector: str,
+    expected_path: Optional[str] = None,
+    expected_text: Optional[str] = None
+) -> tuple[Outcomes, str]:
+    """
+    Maps the body and status of a form submission response to an outcome.
+
+    Shared by the sync and async page objects, which read the body differently.
+
+    Args:
+        body (str): The response body.
+        response: The sync or async APIResponse the body was read from.
+        error_notification_selector (str): CSS selector for error notifications.
+        success_notification_selector (str): CSS selector for success notifications.
+        expected_path (Optional[str]): URL path the form redirects to on success.
+        expected_text (Optional[str]): Text of the expected success notification.
+
+    Returns:
+        tuple[Outcomes, str]: The outcome and the notification text, or the reached
+        URL for Outcomes.NAVIGATED.
+    """
+    error = find_notification_text(body, error_notification_selector)
+    if error:
+        return Outcomes.ERROR, error
+    if not response.ok:
+        return Outcomes.ERROR, f"{response.status} {response.status_text}"
+
+    on_path = not expected_path or urlparse(response.url).path == expected_path
+    message = find_notification_text(body, success_notification_selector)
+    if on_path and message and (not expected_text or message == expected_text):
+        return Outcomes.SUCCESS, message
+    if expected_path and on_path and not expected_text:
+        return Outcomes.NAVIGATED, response.url
+    return Outcomes.ERROR, message or f"Unexpected response from {response.url}"
+
 
 class BasePage:
     """
@@ -12,50 +113,194 @@ class BasePage:
         timeout (int): Timeout value for waiting for elements.
         success_notification_selector (str): CSS selector for success notifications.
         error_notification_selector (str): CSS selector for error notifications.
+        via_api (bool): Whether forms are submitted over HTTP instead of through the DOM.
+        request (APIRequestContext): Request context used for HTTP form submissions.
+        batch_fill (bool): Whether fill_form fills fields in batched browser calls. Set
+            PW_BATCH_FILL=0 to fill field by field through fill_element for debugging.
     """
     
-    def __init__(self, page: Page, timeout: int = 5000):
+    def __init__(
+        self,
+        page: Page,
+        timeout: int = 5000,
+        via_api: bool = False,
+        request: Optional[APIRequestContext] = None
+    ):
         """
         Initializes the BasePage with the given Playwright Page object and timeout.
 
         Args:
             page (Page): The Playwright Page object.
             timeout (int): Timeout value for waiting for elements. Default is 5000 milliseconds.
+            via_api (bool): Whether forms are submitted over HTTP by default. Default is False.
+            request (Optional[APIRequestContext]): Request context for HTTP form submissions.
+                Defaults to the request context of the page's browser context, which
+                shares its cookies and keeps its connections alive between calls.
         """
         self.page = page
         self.logger = logging.getLogger()
         self.timeout = timeout
         self.success_notification_selector = "#flash"
         self.error_notification_selector = ".alert-danger"
+        self.via_api = via_api
+        self.request = request or page.request
+        self.batch_fill = os.environ.get(BATCH_FILL_ENV_VARIABLE, "1") != "0"
+
+    def use_api(self, via_api: Optional[bool] = None) -> bool:
+        """
+        Resolves whether a call should go over HTTP.
+
+        Args:
+            via_api (Optional[bool]): Per-call override, None to use the page default.
+
+        Returns:
+            bool: True if the form should be submitted over HTTP.
+        """
+        return self.via_api if via_api is None else via_api
+
+    @timed()
+    def goto(self, url: str) -> None:
+        """
+        Navigates the page to a URL.
+
+        Args:
+            url (str): The URL, or a path relative to the base URL of the context.
+        """
+        self.logger.info(f"Navigating to {url}")
+        self.page.goto(url)
+
+    @timed()
+    def submit_form(
+        self,
+        path: str,
+        form: dict,
+        expected_path: Optional[str] = None,
+        expected_text: Optional[str] = None
+    ) -> tuple[Outcomes, str]:
+        """
+        Posts a form over HTTP and reads its outcome from the final response.
+
+        Redirects are followed, so the outcome is read from the page the browser
+        would have landed on, using the same notification selectors as the UI path.
+
+        Args:
+            path (str): URL path the form is posted to.
+            form (dict): The form fields to post.
+            expected_path (Optional[str]): URL path the form redirects to on success.
+            expected_text (Optional[str]): Text of the expected success notification.
+
+        Returns:
+            tuple[Outcomes, str]: The outcome and the notification text, or the reached
+            URL for Outcomes.NAVIGATED.
+        """
+        response = self.request.post(path, form=form, timeout=self.timeout)
+        outcome, message = self.outcome_from_response(response, expected_path, expected_text)
+        self.logger.info(f"Outcome of POST {path}: {outcome.value} {message}")
+        return outcome, message
+
+    def outcome_from_response(
+        self,
+        response: APIResponse,
+        expected_path: Optional[str] = None,
+        expected_text: Optional[str] = None
+    ) -> tuple[Outcomes, str]:
+        """
+        Maps an HTTP response to the outcome the UI would have settled on.
+
+        Args:
+            response (APIResponse): The final response of a form submission.
+            expected_path (Optional[str]): URL path the form redirects to on success.
+            expected_text (Optional[str]): Text of the expected success notification.
+
+        Returns:
+            tuple[Outcomes, str]: The outcome and the notification text, or the reached
+            URL for Outcomes.NAVIGATED.
+        """
+        return outcome_from_body(
+            response.text(),
+            response,
+            self.error_notification_selector,
+            self.success_notification_selector,
+            expected_path,
+            expected_text
+        )
         
+    @timed()
+    def wait_for_outcome(
+        self, expected_path: Optional[str] = None, expected_text: Optional[str] = None
+    ) -> tuple[Outcomes, str]:
+        """
+        Waits for whichever outcome of a submitted form settles first.
+
+        The success notification, the error notification and the expected URL
+        change are raced in the browser, so the call returns as soon as one of
+        them is observed instead of waiting out the timeout for the others.
+        A success notification only counts once the page is on
+        ``expected_path`` and shows ``expected_text``, which keeps a stale
+        notification from the previous page from settling the race.
+
+        Args:
+            expected_path (Optional[str]): URL path the form redirects to on success.
+            expected_text (Optional[str]): Text of the expected success notification.
+
+        Returns:
+            tuple[Outcomes, str]: The settled outcome and the notification text,
+            or the reached URL for Outcomes.NAVIGATED.
+        """
+        try:
+            handle = self.page.wait_for_function(
+                OUTCOME_SCRIPT,
+                arg=[
+                    self.error_notification_selector,
+                    self.success_notification_selector,
+                    expected_path,
+                    expected_text,
+                ],
+                timeout=self.timeout,
+            )
+            outcome, message = handle.json_value()
+        except PlaywrightTimeoutError:
+            self.logger.error("No outcome settled within the expected time.")
+            return Outcomes.TIMEOUT, ""
+        except Exception as e:
+            self.logger.error(f"An error occurred while waiting for outcome: {e}")
+            return Outcomes.ERROR, str(e)
+
+        self.logger.info(f"Outcome settled: {outcome} {message}")
+        return Outcomes(outcome), message
+
+    @timed("success_notification_selector")
     def is_success_notification_displayed(self, text: str) -> bool:
         try:
-            self.page.wait_for_selector(self.success_notification_selector, timeout=self.timeout)
-            message = self.page.inner_text(self.success_notification_selector)
+            message = self.page.locator(self.success_notification_selector).inner_text(
+                timeout=self.timeout
+            ).strip()
             if message == text:
                 self.logger.info(f"Success message displayed: {message}")
                 return True
             else:
                 self.logger.warning(f"Success message text mismatch: expected '{text}', got '{message}'")
                 return False
-        except TimeoutError:
+        except PlaywrightTimeoutError:
             self.logger.error("Success message not displayed within the expected time.")
             return False
         except Exception as e:
             self.logger.error(f"An error occurred while checking success message: {e}")
             return False
     
+    @timed("error_notification_selector")
     def is_error_notification_displayed(self) -> bool:
         try:
             self.page.wait_for_selector(self.error_notification_selector, timeout=self.timeout)
             return True
-        except TimeoutError:
+        except PlaywrightTimeoutError:
             self.logger.debug("Error message not displayed within the expected time.")
             return False
         except Exception as e:
             self.logger.error(f"An error occurred while checking error message: {e}")
             return False
     
+    @timed()
     def click_element(self, element) -> bool:
         """
         Clicks on the given element if it is visible.
@@ -74,6 +319,56 @@ class BasePage:
             return False
         return True
 
+    @timed()
+    def fill_form(self, fields: dict[Locator | str, str], batched: Optional[bool] = None) -> bool:
+        """
+        Fills several form fields with as few browser round-trips as possible.
+
+        All CSS selector keys are checked for visibility and filled in one call, and
+        each Locator key in one call instead of the two of fill_element. The page
+        objects key their forms by their Locator attributes. Values are set through
+        the native value setter followed by input and change events, as typing
+        would. Fields the batched path cannot fill, such as hidden ones or CSS
+        selectors not rendered yet, are filled again through fill_element, which
+        waits for them to become visible.
+
+        Args:
+            fields (dict[Locator | str, str]): Values by Locator or CSS selector.
+            batched (Optional[bool]): Fill in batched calls, or field by field through
+                fill_element. Defaults to the batch_fill setting.
+
+        Returns:
+            bool: True if every field was filled successfully, False otherwise.
+        """
+        batched = self.batch_fill if batched is None else batched
+        targets = {
+            target: self.page.locator(target) if isinstance(target, str) else target
+            for target in fields
+        }
+        if not batched:
+            results = [self.fill_element(targets[target], value) for target, value in fields.items()]
+            return all(results)
+
+        selectors = [[target, value] for target, value in fields.items() if isinstance(target, str)]
+        failed = self.page.evaluate(FILL_FORM_SCRIPT, selectors) if selectors else []
+        missing = False
+        for target, value in fields.items():
+            if isinstance(target, str):
+                continue
+            try:
+                if not target.evaluate(FILL_SCRIPT, value, timeout=self.timeout):
+                    failed.append(target)
+            except PlaywrightTimeoutError:
+                self.logger.error(f"Element {target} not found.")
+                missing = True
+            except Exception as e:
+                self.logger.debug(f"Batched fill of {target} failed: {e}")
+                failed.append(target)
+
+        results = [self.fill_element(targets[target], fields[target]) for target in failed]
+        return all(results) and not missing
+
+    @timed()
     def fill_element(self, element, text: str) -> bool:
         """
         Fills the given element with the specified text if it is visible.
@@ -1,4 +1,7 @@
+from typing import Optional
 from playwright.sync_api import Page
+from enums.notifications import Notifications
+from enums.outcomes import Outcomes
 from pages.base_page import BasePage
 
 class ContactPage(BasePage):
@@ -10,50 +13,23 @@ class ContactPage(BasePage):
         email_address_input (Locator): Locator for the email input field.
         message_textarea (Locator): Locator for the address textarea.
         send_button (Locator): Locator for the send button.
+        form_path (str): URL path the contact form is posted to.
     """
     
-    def __init__(self, page: Page):
+    def __init__(self, page: Page, via_api: bool = False):
         """
         Initializes the ContactPage with the given Playwright Page object.
 
         Args:
             page (Page): The Playwright Page object.
+            via_api (bool): Whether forms are submitted over HTTP by default. Default is False.
         """
-        super().__init__(page)
+        super().__init__(page, via_api=via_api)
         self.name_input = page.locator('label:has-text("Name") + input')
         self.email_address_input = page.locator('label:has-text("Email") + input')
         self.message_textarea = page.locator('textarea[name="address"]')
         self.send_button = page.get_by_role("link", name="Send")
-
-    def fill_name(self, name: str):
-        """
-        Fills the name input field.
-
-        Args:
-            name (str): The name to enter in the form.
-        """
-        self.logger.info(f"Filling name: {name}")
-        self.name_input.fill(name)
-
-    def fill_email(self, email: str):
-        """
-        Fills the email input field.
-
-        Args:
-            email (str): The email to enter in the form.
-        """
-        self.logger.info(f"Filling email: {email}")
-        self.fill_element(self.email_address_input, email)
-
-    def fill_address(self, address: str):
-        """
-        Fills the address textarea.
-
-        Args:
-            address (str): The address to enter in the form.
-        """
-        self.logger.info(f"Filling address: {address}")
-        self.fill_element(self.message_textarea, address)
+        self.form_path = "/contact"
 
     def click_send(self):
         """
@@ -62,7 +38,9 @@ class ContactPage(BasePage):
         self.logger.info("Clicking the send button")
         self.click_element(self.send_button)
 
-    def send_contact_message(self, name: str, email: str, address: str):
+    def send_contact_message(
+        self, name: str, email: str, address: str, via_api: Optional[bool] = None
+    ) -> tuple[Outcomes, str]:
         """
         Fills out and sends the contact form.
 
@@ -70,8 +48,26 @@ class ContactPage(BasePage):
             name (str): The name to enter in the form.
             email (str): The email to enter in the form.
             address (str): The address to enter in the form.
+            via_api (Optional[bool]): Post the form over HTTP instead of driving the DOM.
+                Defaults to the page's via_api setting.
+
+        Returns:
+            tuple[Outcomes, str]: The settled outcome and its notification text.
         """
-        self.fill_name(name)
-        self.fill_email(email)
-        self.fill_address(address)
-        self.click_send()
\ No newline at end of file
+        if self.use_api(via_api):
+            self.logger.info(f"Sending contact message over the API: {name}")
+            return self.submit_form(
+                self.form_path,
+                {"name": name, "email": email, "address": address},
+                expected_text=Notifications.MESSAGE_SENT_SUCCESS.value
+            )
+        self.logger.info(f"Filling contact form: {name}")
+        self.fill_form({
+            self.name_input: name,
+            self.email_address_input: email,
+            self.message_textarea: address,
+        })
+        self.click_send()
+        return self.wait_for_outcome(
+            expected_text=Notifications.MESSAGE_SENT_SUCCESS.value
+        )
\ No newline at end of file
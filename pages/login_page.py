@@ -1,4 +1,7 @@
+from typing import Optional
 from playwright.sync_api import Page
+from enums.notifications import Notifications
+from enums.outcomes import Outcomes
 from pages.base_page import BasePage
 
 class LoginPage(BasePage):
@@ -9,40 +12,25 @@ class LoginPage(BasePage):
         username_input (Locator): Locator for the username input field.
         password_input (Locator): Locator for the password input field.
         login_button (Locator): Locator for the login button.
+        success_path (str): URL path the user is redirected to after logging in.
+        form_path (str): URL path the login form is posted to.
     """
     
-    def __init__(self, page: Page):
+    def __init__(self, page: Page, via_api: bool = False):
         """
         Initializes the LoginPage with the given Playwright Page object.
 
         Args:
             page (Page): The Playwright Page object.
+            via_api (bool): Whether forms are submitted over HTTP by default. Default is False.
         """
-        super().__init__(page)
+        super().__init__(page, via_api=via_api)
         self.username_input = page.get_by_label("Username")
         self.password_input = page.get_by_label("Password")
         self.login_button = page.get_by_role("button", name="Login")
+        self.success_path = "/secure"
+        self.form_path = "/authenticate"
         
-    def fill_username(self, username: str):
-        """
-        Fills the username input field.
-
-        Args:
-            username (str): The username to enter in the form.
-        """
-        self.logger.info(f"Filling username: {username}")
-        self.username_input.fill(username)
-
-    def fill_password(self, password: str):
-        """
-        Fills the password input field.
-
-        Args:
-            password (str): The password to enter in the form.
-        """
-        self.logger.info(f"Filling password: {password}")
-        self.fill_element(self.password_input, password)
-
     def click_login(self):
         """
         Clicks the login button to submit the form.
@@ -50,14 +38,38 @@ class LoginPage(BasePage):
         self.logger.info("Clicking the login button")
         self.click_element(self.login_button)
         
-    def login(self, username: str, password: str):
+    def login(
+        self, username: str, password: str, via_api: Optional[bool] = None
+    ) -> tuple[Outcomes, str]:
         """
         Logs in the user by filling out the login form and clicking the login button.
 
+        Over the API the session cookie is stored in the page's browser context, so
+        the page is logged in as well.
+
         Args:
             username (str): The username to enter in the form.
             password (str): The password to enter in the form.
+            via_api (Optional[bool]): Post the form over HTTP instead of driving the DOM.
+                Defaults to the page's via_api setting.
+
+        Returns:
+            tuple[Outcomes, str]: The settled outcome and its notification text.
         """
-        self.fill_username(username)
-        self.fill_password(password)
-        self.click_login()
\ No newline at end of file
+        if self.use_api(via_api):
+            self.logger.info(f"Logging in over the API: {username}")
+            return self.submit_form(
+                self.form_path,
+                {"username": username, "password": password},
+                self.success_path,
+                Notifications.LOGIN_SUCCESS.value
+            )
+        self.logger.info(f"Filling login form: {username}")
+        self.fill_form({
+            self.username_input: username,
+            self.password_input: password,
+        })
+        self.click_login()
+        return self.wait_for_outcome(
+            self.success_path, Notifications.LOGIN_SUCCESS.value
+        )
\ No newline at end of file
@@ -1,4 +1,7 @@
+from typing import Optional
 from playwright.sync_api import Page
+from enums.notifications import Notifications
+from enums.outcomes import Outcomes
 from pages.base_page import BasePage
 
 class RegisterPage(BasePage):
@@ -10,50 +13,25 @@ class RegisterPage(BasePage):
         password_input (Locator): Locator for the password input field.
         confirm_password_input (Locator): Locator for the confirm password input field.
         register_button (Locator): Locator for the register button.
+        success_path (str): URL path the user is redirected to after registering.
+        form_path (str): URL path the registration form is posted to.
     """
     
-    def __init__(self, page: Page):
+    def __init__(self, page: Page, via_api: bool = False):
         """
         Initializes the RegisterPage with the given Playwright Page object.
 
         Args:
             page (Page): The Playwright Page object.
+            via_api (bool): Whether forms are submitted over HTTP by default. Default is False.
         """
-        super().__init__(page)
+        super().__init__(page, via_api=via_api)
         self.username_input = page.get_by_label("Username")
         self.password_input = page.get_by_label("Password", exact=True)
         self.confirm_password_input = page.get_by_label("Confirm Password")
         self.register_button = page.get_by_role("button", name="Register")
-
-    def fill_username(self, username: str):
-        """
-        Fills the username input field.
-
-        Args:
-            username (str): The username to enter in the form.
-        """
-        self.logger.info(f"Filling username: {username}")
-        self.fill_element(self.username_input, username)
-
-    def fill_password(self, password: str):
-        """
-        Fills the password input field.
-
-        Args:
-            password (str): The password to enter in the form.
-        """
-        self.logger.info(f"Filling password: {password}")
-        self.fill_element(self.password_input, password)
-
-    def fill_confirm_password(self, password: str):
-        """
-        Fills the confirm password input field.
-
-        Args:
-            password (str): The password to enter in the form.
-        """
-        self.logger.info(f"Filling confirm password: {password}")
-        self.fill_element(self.confirm_password_input, password)
+        self.success_path = "/login"
+        self.form_path = "/register"
 
     def click_register(self):
         """
@@ -62,15 +40,36 @@ class RegisterPage(BasePage):
         self.logger.info("Clicking the register button")
         self.click_element(self.register_button)
 
-    def register(self, username: str, password: str):
+    def register(
+        self, username: str, password: str, via_api: Optional[bool] = None
+    ) -> tuple[Outcomes, str]:
         """
         Registers a new user by filling out the registration form and clicking the register button.
 
         Args:
             username (str): The username to enter in the form.
             password (str): The password to enter in the form.
+            via_api (Optional[bool]): Post the form over HTTP instead of driving the DOM.
+                Defaults to the page's via_api setting.
+
+        Returns:
+            tuple[Outcomes, str]: The settled outcome and its notification text.
         """
-        self.fill_username(username)
-        self.fill_password(password)
-        self.fill_confirm_password(password)
+        if self.use_api(via_api):
+            self.logger.info(f"Registering user over the API: {username}")
+            return self.submit_form(
+                self.form_path,
+                {"username": username, "password": password, "confirmPassword": password},
+                self.success_path,
+                Notifications.REGISTRATION_SUCCESS.value
+            )
+        self.logger.info(f"Filling registration form: {username}")
+        self.fill_form({
+            self.username_input: username,
+            self.password_input: password,
+            self.confirm_password_input: password,
+        })
         self.click_register()
+        return self.wait_for_outcome(
+            self.success_path, Notifications.REGISTRATION_SUCCESS.value
+        )
@@ -0,0 +1,46 @@
+import allure
+import pytest
+from flows.async_flows import register_login_and_send_contact_message
+
+
+
+@pytest.mark.concurrent
+@allure.parent_suite('Concurrency')
+@allure.suite("Full Flows")
+@allure.feature("User Registration and Contact")
+@allure.story("Register, login, and send a notification for many users at once")
+@allure.severity(allure.severity_level.NORMAL)
+@allure.title("Concurrent User Registration, Login, and Contact Message Sending Flows")
+def test_concurrent_register_login_and_send_contact_message(
+    concurrent_flows,
+    pytestconfig: pytest.Config,
+    user_factory,
+    password: str,
+    application_url: str
+):
+    """
+    Test many registration, login and contact message flows running concurrently.
+
+    The flows run as asyncio tasks in one browser, each in its own context, so the
+    time spent waiting on the browser overlaps instead of adding up.
+
+    Args:
+        concurrent_flows: Runner for concurrent async flows.
+        pytestconfig (pytest.Config): The pytest configuration object.
+        user_factory: Factory handing out a unique username to each flow.
+        password (str): The password for registration and login.
+        application_url (str): The base URL of the application.
+    """
+    count = pytestconfig.getoption("--concurrent-flows")
+    users = [user_factory.next_user() for _ in range(count)]
+
+    with allure.step(f"Run {count} flows concurrently"):
+        results = concurrent_flows(
+            lambda page, index: register_login_and_send_contact_message(
+                page, users[index], password, application_url
+            ),
+            count
+        )
+
+    failures = [result for result in results if isinstance(result, BaseException)]
+    assert not failures, f"{len(failures)} of {count} flows failed: {failures}"
@@ -4,10 +4,12 @@ from playwright.sync_api import Page
 from playwright.sync_api import expect
 import pytest
 from enums.notifications import Notifications
+from enums.outcomes import Outcomes
 from pages.register_page import RegisterPage
 from pages.login_page import LoginPage
 from pages.contact_page import ContactPage
 from pages.secured_area_page import SecuredAreaPage
+from utils.checkpoints import FlowCheckpoints
 
 
 
@@ -19,7 +21,11 @@ from pages.secured_area_page import SecuredAreaPage
 @allure.severity(allure.severity_level.CRITICAL)
 @allure.title("User Registration, Login, and Contact Message Sending Flow")
 def test_register_login_and_send_contact_message(
-    page: Page, user: str, password: str, application_url: str
+    page: Page,
+    checkpoints: FlowCheckpoints,
+    user: str,
+    password: str,
+    application_url: str
 ):
     """
     Test the user registration, login, and contact message sending flow.
@@ -31,8 +37,12 @@ def test_register_login_and_send_contact_message(
     4. Navigate to the contact page.
     5. Send a contact message and verify success.
 
+    Each step is checkpointed, so a retry with --flow-retries resumes after the last
+    step that passed, with the user the failed attempt registered.
+
     Args:
         page (Page): The Playwright Page object.
+        checkpoints (FlowCheckpoints): Checkpoints of the steps of the flow.
         user (str): The username for registration and login.
         password (str): The password for registration and login.
         application_url (str): The base URL of the application.
@@ -43,17 +53,18 @@ def test_register_login_and_send_contact_message(
     secured_area_page = SecuredAreaPage(page)
     contact_page = ContactPage(page)
     logger = logging.getLogger()
+    user = checkpoints.remember("user", user)
 
-    with allure.step("Go to registration page"):
-        page.goto(f"{application_url}/register")
+    def go_to_registration_page():
+        register_page.goto(f"{application_url}/register")
         logger.info("Navigated to registration page")
 
-    with allure.step("Register a new user and verify successful registration"):
-        register_page.register(user, password)
+    def register():
+        outcome, message = register_page.register(user, password)
         
         logger.info("Verify there are no errors")
-        assert not register_page.is_error_notification_displayed(), (
-            "Unexpected error notification displayed during registration"
+        assert outcome is not Outcomes.ERROR, (
+            f"Unexpected error notification displayed during registration: {message}"
         )
         
         logger.info("Verify user was redirected to login page")
@@ -62,16 +73,16 @@ def test_register_login_and_send_contact_message(
         )
         
         logger.info("Verify correct success message appears")
-        assert login_page.is_success_notification_displayed(
-            Notifications.REGISTRATION_SUCCESS.value
+        assert outcome is Outcomes.SUCCESS and (
+            message == Notifications.REGISTRATION_SUCCESS.value
         ), "Registration success notification not displayed"
 
-    with allure.step("Login with the new user and verify successful login"):
-        login_page.login(user, password)
+    def login():
+        outcome, message = login_page.login(user, password)
         
         logger.info("Verify there are no errors")
-        assert not login_page.is_error_notification_displayed(), (
-            "Unexpected error notification displayed during login"
+        assert outcome is not Outcomes.ERROR, (
+            f"Unexpected error notification displayed during login: {message}"
         )
         
         logger.info("Verify user was redirected to secure page")
@@ -80,11 +91,11 @@ def test_register_login_and_send_contact_message(
         )
 
         logger.info("Verify correct success message")
-        assert secured_area_page.is_success_notification_displayed(
-            Notifications.LOGIN_SUCCESS.value
+        assert outcome is Outcomes.SUCCESS and (
+            message == Notifications.LOGIN_SUCCESS.value
         ), "Login success notification not displayed"
 
-    with allure.step("Navigate to contact page"):
+    def go_to_contact_page():
         secured_area_page.click_contact()
         
         logger.info("Verify user was redirected to contact page")
@@ -92,12 +103,18 @@ def test_register_login_and_send_contact_message(
             f"{application_url}/contact"
         )
 
-    with allure.step("Send a contact message and verify success"):
-        contact_page.send_contact_message(
+    def send_contact_message():
+        outcome, message = contact_page.send_contact_message(
             user, 
             "test@gmail.com", 
             "This is a test message."
         )
-        assert contact_page.is_success_notification_displayed(
-            Notifications.MESSAGE_SENT_SUCCESS.value
-        ), "Message send success notification not displayed"
\ No newline at end of file
+        assert outcome is Outcomes.SUCCESS and (
+            message == Notifications.MESSAGE_SENT_SUCCESS.value
+        ), "Message send success notification not displayed"
+
+    checkpoints.run("Go to registration page", go_to_registration_page)
+    checkpoints.run("Register a new user and verify successful registration", register)
+    checkpoints.run("Login with the new user and verify successful login", login)
+    checkpoints.run("Navigate to contact page", go_to_contact_page)
+    checkpoints.run("Send a contact message and verify success", send_contact_message)
@@ -0,0 +1,57 @@
+import logging
+import allure
+from playwright.sync_api import Page
+from playwright.sync_api import expect
+from enums.notifications import Notifications
+from enums.outcomes import Outcomes
+from pages.contact_page import ContactPage
+from pages.secured_area_page import SecuredAreaPage
+
+
+
+@allure.parent_suite('Regression')
+@allure.suite("Contact")
+@allure.feature("User Registration and Contact")
+@allure.story("Send a contact message as a logged-in user")
+@allure.severity(allure.severity_level.NORMAL)
+@allure.title("Contact Message Sending From the Secured Area")
+def test_send_contact_message(
+    authenticated_page: Page, session_user: str, application_url: str
+):
+    """
+    Test sending a contact message as an already logged-in user.
+
+    The test starts in the secured area from the cached storage state, so it does
+    not pay for registration and login in the UI.
+
+    This test covers the following steps:
+    1. Navigate to the contact page.
+    2. Send a contact message and verify success.
+
+    Args:
+        authenticated_page (Page): A Playwright Page logged in as the session user.
+        session_user (str): The username the page is logged in as.
+        application_url (str): The base URL of the application.
+    """
+
+    secured_area_page = SecuredAreaPage(authenticated_page)
+    contact_page = ContactPage(authenticated_page)
+    logger = logging.getLogger()
+
+    with allure.step("Navigate to contact page"):
+        secured_area_page.click_contact()
+
+        logger.info("Verify user was redirected to contact page")
+        expect(authenticated_page, "User was not redirected to contact page").to_have_url(
+            f"{application_url}/contact"
+        )
+
+    with allure.step("Send a contact message and verify success"):
+        outcome, message = contact_page.send_contact_message(
+            session_user,
+            "test@gmail.com",
+            "This is a test message."
+        )
+        assert outcome is Outcomes.SUCCESS and (
+            message == Notifications.MESSAGE_SENT_SUCCESS.value
+        ), "Message send success notification not displayed"
@@ -0,0 +1,53 @@
+import logging
+import allure
+import pytest
+from playwright.sync_api import Page
+from enums.notifications import Notifications
+from enums.outcomes import Outcomes
+from pages.contact_page import ContactPage
+
+
+
+@pytest.mark.data_source("generated:contact_messages", count=8, seed=1)
+@allure.parent_suite('Regression')
+@allure.suite("Contact")
+@allure.feature("User Registration and Contact")
+@allure.story("Send many different contact messages as a logged-in user")
+@allure.severity(allure.severity_level.NORMAL)
+@allure.title("Data-Driven Contact Message Sending")
+def test_send_contact_messages(
+    authenticated_page: Page, data_cases, application_url: str
+):
+    """
+    Test sending the contact messages of a dataset as an already logged-in user.
+
+    The test item sends the messages of its shard of the dataset one after the
+    other, reading each case only when it is sent. Failed cases are collected and
+    reported together at the end. The marker keeps the default run to a few
+    messages; --data-count sends more.
+
+    Args:
+        authenticated_page (Page): A Playwright Page logged in as the session user.
+        data_cases: The contact messages of this test item's shard.
+        application_url (str): The base URL of the application.
+    """
+
+    contact_page = ContactPage(authenticated_page)
+    logger = logging.getLogger()
+    sent = 0
+    failures = []
+
+    for case in data_cases:
+        with allure.step(f"Send contact message {case['id']} from {case['name']}"):
+            contact_page.goto(f"{application_url}/contact")
+            outcome, message = contact_page.send_contact_message(
+                case["name"], case["email"], case["message"]
+            )
+            sent += 1
+            if outcome is not Outcomes.SUCCESS or (
+                message != Notifications.MESSAGE_SENT_SUCCESS.value
+            ):
+                failures.append(f"{case['id']}: {outcome.name} {message}")
+
+    logger.info(f"Sent {sent} contact messages, {len(failures)} failed")
+    assert not failures, f"{len(failures)} of {sent} contact messages failed: {failures[:10]}"
@@ -0,0 +1,145 @@
+import json
+import os
+import pytest
+from utils.allure_merge import STATE_FILE, AllureMerge
+
+
+def write_shard(directory, results: dict[str, list[str]], attachments: dict[str, bytes]):
+    """
+    Writes an Allure results directory.
+
+    Args:
+        directory: The results directory, created if missing.
+        results (dict[str, list[str]]): Attachment sources referred to per result uuid.
+        attachments (dict[str, bytes]): Content per attachment file name.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, content in attachments.items():
+        (directory / name).write_bytes(content)
+    for uuid, sources in results.items():
+        (directory / f"{uuid}-result.json").write_text(json.dumps({
+            "uuid": uuid,
+            "name": uuid,
+            "attachments": [{"name": "a", "source": source} for source in sources],
+            "steps": [{
+                "name": "step",
+                "attachments": [{"name": "b", "source": source} for source in sources],
+            }],
+        }))
+
+
+def sources(path) -> list[str]:
+    result = json.loads(path.read_text())
+    return [attachment["source"] for attachment in result["attachments"]] + [
+        attachment["source"] for attachment in result["steps"][0]["attachments"]
+    ]
+
+
+@pytest.fixture
+def shards(tmp_path):
+    """
+    Two shards sharing the content of one attachment under different names.
+    """
+    write_shard(
+        tmp_path / "shard-1",
+        {"r1": ["a1-attachment.png"]},
+        {"a1-attachment.png": b"same screenshot", "u1-attachment.txt": b"only in shard 1"},
+    )
+    write_shard(
+        tmp_path / "shard-2",
+        {"r2": ["a2-attachment.png"]},
+        {"a2-attachment.png": b"same screenshot"},
+    )
+    return tmp_path / "shard-1", tmp_path / "shard-2"
+
+
+def test_identical_attachments_are_stored_once(tmp_path, shards):
+    """
+    Test that an attachment whose content was merged from another shard is not
+    stored again and the results referring to it point to the stored copy.
+    """
+    merge = AllureMerge(tmp_path / "merged")
+
+    merge.merge(shards[0])
+    counts = merge.merge(shards[1])
+
+    output = tmp_path / "merged"
+    assert counts["deduplicated"] == 1
+    assert counts["bytes_saved"] == len(b"same screenshot")
+    assert (output / "a1-attachment.png").read_bytes() == b"same screenshot"
+    assert not (output / "a2-attachment.png").exists()
+    assert sources(output / "r2-result.json") == ["a1-attachment.png", "a1-attachment.png"]
+    assert sources(output / "r1-result.json") == ["a1-attachment.png", "a1-attachment.png"]
+    assert (output / "u1-attachment.txt").read_bytes() == b"only in shard 1"
+
+
+def test_merging_a_shard_again_only_processes_changed_files(tmp_path, shards):
+    """
+    Test that the merge state skips the files already merged and picks up the new
+    and changed ones, also from a new AllureMerge on the same output.
+    """
+    AllureMerge(tmp_path / "merged").merge(shards[0])
+
+    counts = AllureMerge(tmp_path / "merged").merge(shards[0])
+    assert counts["merged"] == 0
+    assert counts["unchanged"] == 3
+
+    result = shards[0] / "r1-result.json"
+    result.write_text(result.read_text().replace('"name": "r1"', '"name": "r1 again"'))
+    write_shard(shards[0], {"r3": []}, {})
+    counts = AllureMerge(tmp_path / "merged").merge(shards[0])
+    assert counts["merged"] == 2
+    assert counts["unchanged"] == 2
+    assert json.loads((tmp_path / "merged" / "r1-result.json").read_text())["name"] == "r1 again"
+
+
+def test_aliases_are_kept_across_merges(tmp_path, shards):
+    """
+    Test that a result arriving later in a shard whose attachment was deduplicated
+    earlier is still rewritten to the stored copy.
+    """
+    AllureMerge(tmp_path / "merged").merge(shards[0])
+    AllureMerge(tmp_path / "merged").merge(shards[1])
+
+    write_shard(shards[1], {"r4": ["a2-attachment.png"]}, {})
+    AllureMerge(tmp_path / "merged").merge(shards[1])
+
+    output = tmp_path / "merged"
+    assert sources(output / "r4-result.json") == ["a1-attachment.png", "a1-attachment.png"]
+    state = json.loads((output / STATE_FILE).read_text())
+    assert state["aliases"] == {"a2-attachment.png": "a1-attachment.png"}
+
+
+def test_shards_are_keyed_by_name(tmp_path, shards):
+    """
+    Test that the same directory merged under two names is merged twice, without
+    storing its attachments twice.
+    """
+    merge = AllureMerge(tmp_path / "merged")
+
+    merge.merge(shards[0], "host-a:results")
+    counts = merge.merge(shards[0], "host-b:results")
+
+    assert counts["merged"] == 3
+    assert counts["deduplicated"] == 0
+    assert sorted(os.listdir(tmp_path / "merged")) == sorted([
+        ".allure-merge.json", ".allure-merge.lock",
+        "a1-attachment.png", "u1-attachment.txt", "r1-result.json",
+    ])
+
+
+def test_attachment_deleted_from_the_output_is_stored_again(tmp_path, shards):
+    """
+    Test that a stored attachment removed from the output is not used as the
+    target of an alias.
+    """
+    AllureMerge(tmp_path / "merged").merge(shards[0])
+    (tmp_path / "merged" / "a1-attachment.png").unlink()
+
+    counts = AllureMerge(tmp_path / "merged").merge(shards[1])
+
+    assert counts["deduplicated"] == 0
+    assert (tmp_path / "merged" / "a2-attachment.png").read_bytes() == b"same screenshot"
+    assert sources(tmp_path / "merged" / "r2-result.json") == [
+        "a2-attachment.png", "a2-attachment.png"
+    ]
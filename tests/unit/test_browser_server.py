@@ -0,0 +1,82 @@
+import contextlib
+import socket
+import threading
+import pytest
+from utils.browser_server import BrowserServer
+
+
+@pytest.fixture
+def endpoint_server():
+    """
+    Starts a local TCP server answering connections with a given behaviour.
+
+    Returns:
+        Callable: Takes the response sent after the request is read, or None to
+        accept the connection and never answer, and returns the state of a browser
+        server at that endpoint.
+    """
+    listeners = []
+    released = threading.Event()
+
+    def start(response):
+        listener = socket.create_server(("127.0.0.1", 0))
+        listeners.append(listener)
+
+        def serve():
+            with contextlib.suppress(OSError):
+                connection, _ = listener.accept()
+                with connection:
+                    connection.recv(4096)
+                    if response is None:
+                        released.wait(5)
+                    else:
+                        connection.sendall(response)
+
+        threading.Thread(target=serve, daemon=True).start()
+        port = listener.getsockname()[1]
+        return {"ws_endpoint": f"ws://127.0.0.1:{port}/abc123", "pid": 0}
+
+    yield start
+    released.set()
+    for listener in listeners:
+        listener.close()
+
+
+def test_server_completing_the_handshake_is_healthy(endpoint_server):
+    """
+    Test that an endpoint switching protocols is healthy.
+    """
+    state = endpoint_server(
+        b"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n\r\n"
+    )
+
+    assert BrowserServer.is_healthy(state, timeout=1)
+
+
+def test_hung_server_is_not_healthy(endpoint_server):
+    """
+    Test that a server accepting the connection but never answering is not healthy.
+    """
+    state = endpoint_server(None)
+
+    assert not BrowserServer.is_healthy(state, timeout=0.2)
+
+
+def test_server_refusing_the_handshake_is_not_healthy(endpoint_server):
+    """
+    Test that an endpoint answering with another status, such as a wrong path, is
+    not healthy.
+    """
+    state = endpoint_server(b"HTTP/1.1 400 Bad Request\r\n\r\n")
+
+    assert not BrowserServer.is_healthy(state, timeout=1)
+
+
+def test_closed_port_is_not_healthy():
+    """
+    Test that an endpoint nothing listens on is not healthy.
+    """
+    with socket.create_server(("127.0.0.1", 0)) as listener:
+        port = listener.getsockname()[1]
+
+    assert not BrowserServer.is_healthy({"ws_endpoint": f"ws://127.0.0.1:{port}/x"}, timeout=1)
@@ -0,0 +1,129 @@
+import json
+import random
+import pytest
+from utils.data_provider import CsvSource, JsonlSource, data_source
+
+SHARD_COUNTS = list(range(1, 12)) + [40, 1000]
+
+
+def make_rows(seed: int, count: int) -> list[dict]:
+    """
+    Generates rows of varied length, with multi-byte characters, so shard boundaries
+    fall at the start, in the middle and at the end of lines.
+
+    Args:
+        seed (int): Seed of the rows.
+        count (int): Number of rows.
+
+    Returns:
+        list[dict]: The rows.
+    """
+    rng = random.Random(seed)
+    return [
+        {"id": str(index), "name": "é" * rng.randrange(0, 5) + "x" * rng.randrange(0, 40)}
+        for index in range(count)
+    ]
+
+
+def write_csv(path, rows: list[dict], trailing_newline: bool = True) -> CsvSource:
+    lines = ["id,name"] + [f"{row['id']},{row['name']}" for row in rows]
+    path.write_text("\n".join(lines) + ("\n" if trailing_newline else ""), encoding="utf-8")
+    return CsvSource(path)
+
+
+def write_jsonl(path, rows: list[dict], trailing_newline: bool = True) -> JsonlSource:
+    lines = [json.dumps(row, ensure_ascii=False) for row in rows]
+    path.write_text("\n".join(lines) + ("\n" if trailing_newline else ""), encoding="utf-8")
+    return JsonlSource(path)
+
+
+def read_shards(source, count: int) -> list[list[dict]]:
+    return [list(source.shard(index, count)) for index in range(count)]
+
+
+@pytest.mark.parametrize("write", [write_csv, write_jsonl], ids=["csv", "jsonl"])
+@pytest.mark.parametrize("trailing_newline", [True, False], ids=["newline", "no-newline"])
+@pytest.mark.parametrize("seed", range(5))
+def test_every_row_lands_in_exactly_one_shard(tmp_path, write, trailing_newline, seed):
+    """
+    Test that the shards of a file, for any shard count, hold every row exactly
+    once and in file order.
+    """
+    rows = make_rows(seed, random.Random(seed).randrange(1, 30))
+    source = write(tmp_path / "cases", rows, trailing_newline)
+
+    for count in SHARD_COUNTS:
+        shards = read_shards(source, count)
+        assert [row for shard in shards for row in shard] == rows, f"{count} shards"
+
+
+@pytest.mark.parametrize("write", [write_csv, write_jsonl], ids=["csv", "jsonl"])
+def test_rows_starting_on_a_shard_boundary(tmp_path, write):
+    """
+    Test that a row starting exactly at the first byte of a shard belongs to that
+    shard and not to the one before.
+    """
+    # All the lines of each file, the CSV header included, have the same length, so
+    # with one shard per line every shard starts on the first byte of a line.
+    name = "abcde" if write is write_csv else ""
+    rows = [{"id": str(index), "name": name} for index in range(8)]
+    source = write(tmp_path / "cases", rows)
+    lines = source.path.read_bytes().splitlines(keepends=True)
+    assert {len(line) for line in lines} == {8 if write is write_csv else 24}
+
+    shards = read_shards(source, len(lines))
+
+    assert [row for shard in shards for row in shard] == rows
+    assert all(len(shard) == 1 for shard in shards[write is write_csv:])
+
+
+def test_blank_lines_are_skipped(tmp_path):
+    """
+    Test that blank lines of a file give no cases.
+    """
+    path = tmp_path / "cases.csv"
+    path.write_text("id,name\n\n1,a\n\n\n2,b\n\n")
+
+    for count in SHARD_COUNTS:
+        shards = read_shards(CsvSource(path), count)
+        assert [row["id"] for shard in shards for row in shard] == ["1", "2"]
+
+
+def test_header_only_file_has_no_cases(tmp_path):
+    """
+    Test that a CSV file with a header and no rows gives no cases.
+    """
+    path = tmp_path / "cases.csv"
+    path.write_text("id,name\n")
+
+    assert read_shards(CsvSource(path), 3) == [[], [], []]
+
+
+@pytest.mark.parametrize("count", [1, 3, 7, 50])
+def test_generated_shards_cover_every_index(count):
+    """
+    Test that the shards of a generated dataset cover every index once and that a
+    case only depends on the seed and its index.
+    """
+    source = data_source("generated:contact_messages", count=20, seed=3)
+
+    ids = [case["id"] for index in range(count) for case in source.shard(index, count)]
+
+    assert ids == [str(index) for index in range(20)]
+    assert list(source.shard(0, 1)) == list(
+        data_source("generated:contact_messages", count=20, seed=3).shard(0, 1)
+    )
+
+
+@pytest.mark.parametrize("spec, count", [
+    ("xml:cases.xml", None),
+    ("generated:unknown", 1),
+    ("generated:contact_messages", None),
+])
+def test_invalid_specs(spec, count):
+    """
+    Test that malformed specs, unknown generators and generated sources without a
+    count are refused.
+    """
+    with pytest.raises(ValueError):
+        data_source(spec, count)
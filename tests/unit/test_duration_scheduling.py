@@ -0,0 +1,223 @@
+from types import SimpleNamespace
+import pytest
+from utils.duration_history import DEFAULT_ESTIMATE, DurationHistory
+from utils.duration_scheduling import DurationScheduling
+
+
+class FakeNode:
+    """
+    Stand-in for a pytest-xdist WorkerController recording the tests it is sent.
+
+    Attributes:
+        name (str): Name of the worker.
+        gateway (SimpleNamespace): The execnet gateway, of which xdist only reads the id.
+        sent (list[int]): Indices of the tests sent to the worker, in order.
+        shutting_down (bool): Whether the worker was shut down.
+    """
+
+    def __init__(self, name: str):
+        """
+        Initializes the FakeNode.
+
+        Args:
+            name (str): Name of the worker.
+        """
+        self.name = name
+        self.gateway = SimpleNamespace(id=name)
+        self.sent = []
+        self.shutting_down = False
+
+    def send_runtest_some(self, indices: list[int]) -> None:
+        self.sent.extend(indices)
+
+    def shutdown(self) -> None:
+        self.shutting_down = True
+
+    def __repr__(self) -> str:
+        return self.name
+
+
+class FakeConfig:
+    """
+    Stand-in for the pytest configuration of a run with pytest-xdist workers.
+
+    Attributes:
+        workers (int): Number of workers of the run.
+    """
+
+    def __init__(self, workers: int):
+        """
+        Initializes the FakeConfig.
+
+        Args:
+            workers (int): Number of workers of the run.
+        """
+        self.workers = workers
+
+    def getvalue(self, name: str):
+        return [f"{self.workers}*popen"] if name == "tx" else None
+
+    def getoption(self, name: str):
+        return None
+
+
+def history_of(durations: dict[str, float], failed: tuple[str, ...] = ()) -> DurationHistory:
+    return DurationHistory({
+        nodeid: {"duration": duration, "failed": nodeid in failed, "seen": 0}
+        for nodeid, duration in durations.items()
+    })
+
+
+def scheduling(
+    history: DurationHistory, collection: list[str], workers: int, failed_first: bool = False
+) -> tuple[DurationScheduling, list[FakeNode]]:
+    """
+    Creates a DurationScheduling whose workers have all collected the tests.
+
+    Args:
+        history (DurationHistory): Durations of past runs.
+        collection (list[str]): Node ids collected by every worker.
+        workers (int): Number of workers.
+        failed_first (bool): Whether tests that failed in their last run go first.
+
+    Returns:
+        tuple[DurationScheduling, list[FakeNode]]: The scheduler and its workers.
+    """
+    scheduler = DurationScheduling(FakeConfig(workers), None, history, failed_first)
+    nodes = [FakeNode(f"gw{index}") for index in range(workers)]
+    for node in nodes:
+        scheduler.add_node(node)
+        scheduler.add_node_collection(node, collection)
+    return scheduler, nodes
+
+
+def run_to_completion(
+    scheduler: DurationScheduling, nodes: list[FakeNode], durations: dict[str, float]
+) -> dict:
+    """
+    Simulates the workers running their tests, the worker whose current test ends
+    first finishing it first.
+
+    Args:
+        scheduler (DurationScheduling): The scheduler, after schedule.
+        nodes (list[FakeNode]): Its workers.
+        durations (dict[str, float]): Duration of each test in this run.
+
+    Returns:
+        dict: The node ids run per worker and the time each worker finished.
+    """
+    clock = {node: 0.0 for node in nodes}
+    ran = {node: [] for node in nodes}
+    while any(scheduler.node2pending[node] for node in nodes):
+        node = min(
+            (node for node in nodes if scheduler.node2pending[node]), key=clock.__getitem__
+        )
+        index = scheduler.node2pending[node][0]
+        nodeid = scheduler.collection[index]
+        clock[node] += durations.get(nodeid, 1.0)
+        ran[node].append(nodeid)
+        scheduler.mark_test_complete(node, index)
+    return {"ran": ran, "finished": clock}
+
+
+def test_order_is_longest_first():
+    """
+    Test that tests are ordered by their past durations, the ones without history
+    at the median, and failed ones first with failed_first.
+    """
+    history = history_of({"a": 1.0, "b": 5.0, "c": 3.0}, failed=("a",))
+
+    assert history.default_estimate == 3.0
+    assert history.order(["a", "b", "c", "new"]) in ([1, 2, 3, 0], [1, 3, 2, 0])
+    assert history.order(["a", "b", "c"], failed_first=True) == [0, 1, 2]
+    assert DurationHistory().default_estimate == DEFAULT_ESTIMATE
+
+
+def test_first_batches_balance_the_estimates():
+    """
+    Test that every worker starts with two tests, the longest ones, spread so the
+    estimated loads of the workers are balanced.
+    """
+    durations = {"t1": 1.0, "t5": 5.0, "t3": 3.0, "t4": 4.0, "t2": 2.0}
+    collection = list(durations)
+    scheduler, nodes = scheduling(history_of(durations), collection, 2)
+
+    scheduler.schedule()
+
+    assert [[collection[index] for index in node.sent] for node in nodes] == [
+        ["t5", "t2"], ["t4", "t3"]
+    ]
+    assert [collection[index] for index in scheduler.pending] == ["t1"]
+
+
+def test_finished_worker_gets_the_longest_pending_test():
+    """
+    Test that a worker finishing a test is topped up to two tests with the longest
+    pending one, and shut down when no test is left.
+    """
+    durations = {f"t{index}": float(index) for index in range(1, 9)}
+    collection = list(durations)
+    scheduler, nodes = scheduling(history_of(durations), collection, 2)
+    scheduler.schedule()
+
+    scheduler.mark_test_complete(nodes[0], nodes[0].sent[0])
+
+    assert collection[nodes[0].sent[-1]] == "t4"
+    assert len(scheduler.node2pending[nodes[0]]) == 2
+
+    run_to_completion(scheduler, nodes, durations)
+    assert all(node.shutting_down for node in nodes)
+    assert scheduler.tests_finished
+
+
+def test_longest_first_shortens_the_makespan():
+    """
+    Test that scheduling a long test collected last early keeps one worker from
+    finishing it alone at the end of the run.
+    """
+    durations = {f"short{index}": 1.0 for index in range(8)}
+    durations["long"] = 8.0
+    collection = list(durations)
+
+    makespans = {}
+    for name, history in (("known", history_of(durations)), ("unknown", DurationHistory())):
+        scheduler, nodes = scheduling(history, collection, 2)
+        scheduler.schedule()
+        result = run_to_completion(scheduler, nodes, durations)
+        makespans[name] = max(result["finished"].values())
+        if name == "known":
+            assert collection[nodes[0].sent[0]] == "long"
+
+    assert makespans == {"known": 10.0, "unknown": 12.0}
+
+
+def test_failed_first_runs_failed_tests_first():
+    """
+    Test that with failed_first the tests that failed last run are sent first,
+    even when they are short.
+    """
+    durations = {"slow": 9.0, "flaky": 0.5, "medium": 4.0}
+    collection = list(durations)
+    scheduler, nodes = scheduling(
+        history_of(durations, failed=("flaky",)), collection, 1, failed_first=True
+    )
+
+    scheduler.schedule()
+
+    assert [collection[index] for index in nodes[0].sent] == ["flaky", "slow"]
+
+
+@pytest.mark.parametrize("workers", [1, 3, 10])
+def test_every_test_runs_once(workers):
+    """
+    Test that every collected test is sent to exactly one worker, whatever the
+    number of workers.
+    """
+    durations = {f"t{index}": float(index % 4 + 1) for index in range(7)}
+    collection = list(durations) + ["unknown"]
+    scheduler, nodes = scheduling(history_of(durations), collection, workers)
+    scheduler.schedule()
+
+    run_to_completion(scheduler, nodes, durations)
+
+    assert sorted(index for node in nodes for index in node.sent) == list(range(len(collection)))
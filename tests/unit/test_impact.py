@@ -0,0 +1,232 @@
+import subprocess
+import textwrap
+import pytest
+from utils.impact import ImpactMap, changed_keys, changed_lines
+
+PAGE_SOURCE = textwrap.dedent('''\
+    import re
+
+    TIMEOUT = 5
+
+
+    class SamplePage:
+        selector = "#name"
+
+        def fill(self, value):
+            return value
+
+        @property
+        def title(self):
+            def clean(text):
+                return text.strip()
+            return clean(" x ")
+
+
+    def helper():
+        pass
+    ''')
+
+NOTIFICATIONS_SOURCE = textwrap.dedent('''\
+    from enum import Enum
+
+
+    class Notifications(Enum):
+        SENT = "sent"
+        FAILED = (
+            "failed"
+        )
+    ''')
+
+
+def git(root, *args: str) -> str:
+    return subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=root, check=True, capture_output=True, text=True
+    ).stdout
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """
+    A git repository with a page object, the notifications and a test file committed.
+    """
+    (tmp_path / "pages").mkdir()
+    (tmp_path / "enums").mkdir()
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "pages" / "sample_page.py").write_text(PAGE_SOURCE)
+    (tmp_path / "enums" / "notifications.py").write_text(NOTIFICATIONS_SOURCE)
+    (tmp_path / "tests" / "test_sample.py").write_text("def test_sample():\n    pass\n")
+    (tmp_path / "removed.txt").write_text("removed\n")
+    git(tmp_path, "init", "-q")
+    git(tmp_path, "add", ".")
+    git(tmp_path, "commit", "-q", "-m", "base")
+    return tmp_path
+
+
+def replace_lines(path, changes: dict[int, list[str]]) -> None:
+    """
+    Replaces lines of a file.
+
+    Args:
+        path: The file.
+        changes (dict[int, list[str]]): The new lines per 1-based line number; an
+            empty list deletes the line.
+    """
+    lines = path.read_text().splitlines()
+    for number in sorted(changes, reverse=True):
+        lines[number - 1:number] = changes[number]
+    path.write_text("\n".join(lines) + "\n")
+
+
+def test_changed_lines_of_modified_inserted_and_deleted_lines(repo):
+    """
+    Test that a modified line, inserted lines and a deletion map to the line
+    numbers of the current version.
+    """
+    page = repo / "pages" / "sample_page.py"
+    replace_lines(page, {
+        3: ["TIMEOUT = 10"],
+        10: ["        return value", "        return None"],
+        19: [],
+    })
+    git(repo, "commit", "-q", "-am", "change")
+
+    lines = changed_lines("HEAD~1", repo)
+
+    # A deletion after line 19 of the new version marks the lines around it.
+    assert lines == {"pages/sample_page.py": {3, 11, 19, 20}}
+
+
+def test_changed_lines_of_working_tree_deleted_and_untracked_files(repo):
+    """
+    Test that uncommitted changes count, and that deleted and untracked files have
+    no line numbers.
+    """
+    (repo / "removed.txt").unlink()
+    (repo / "pages" / "new_page.py").write_text("class NewPage:\n    pass\n")
+    replace_lines(repo / "enums" / "notifications.py", {5: ['    SENT = "delivered"']})
+
+    lines = changed_lines("HEAD", repo)
+
+    assert lines == {
+        "removed.txt": None,
+        "pages/new_page.py": None,
+        "enums/notifications.py": {5},
+    }
+
+
+def test_changed_lines_of_an_unknown_ref(repo):
+    """
+    Test that an unknown ref raises a RuntimeError.
+    """
+    with pytest.raises(RuntimeError, match="git diff"):
+        changed_lines("no-such-ref", repo)
+
+
+@pytest.mark.parametrize("line, key", [
+    (9, "pages/sample_page.py::SamplePage.fill"),
+    (10, "pages/sample_page.py::SamplePage.fill"),
+    (12, "pages/sample_page.py::SamplePage.title"),
+    (13, "pages/sample_page.py::SamplePage.title"),
+    (15, "pages/sample_page.py::SamplePage.title.<locals>.clean"),
+    (16, "pages/sample_page.py::SamplePage.title"),
+    (20, "pages/sample_page.py::helper"),
+])
+def test_changed_line_in_a_function_gives_its_key(repo, line, key):
+    """
+    Test that a changed line inside a function, its decorators included, gives the
+    key of the innermost function.
+    """
+    changes = changed_keys({"pages/sample_page.py": {line}}, repo)
+
+    assert changes["keys"] == [key]
+    assert changes["prefixes"] == []
+
+
+@pytest.mark.parametrize("line", [1, 3, 6, 7])
+def test_changed_line_outside_functions_gives_the_module_prefix(repo, line):
+    """
+    Test that a changed import, constant, class line or class attribute gives the
+    prefix of the whole module.
+    """
+    changes = changed_keys({"pages/sample_page.py": {line}}, repo)
+
+    assert changes["keys"] == []
+    assert changes["prefixes"] == ["pages/sample_page.py::"]
+
+
+def test_changed_notifications(repo):
+    """
+    Test that a changed Notifications member gives its key, also on a continuation
+    line, and any other change of the module the prefix of every member.
+    """
+    path = "enums/notifications.py"
+
+    assert changed_keys({path: {5, 7}}, repo)["keys"] == [
+        f"{path}::Notifications.FAILED", f"{path}::Notifications.SENT"
+    ]
+    assert changed_keys({path: {1}}, repo)["prefixes"] == [f"{path}::"]
+
+
+def test_changed_files_outside_the_page_objects(repo):
+    """
+    Test that test files, ignored files, deleted page objects and other files are
+    classified apart.
+    """
+    changes = changed_keys({
+        "tests/test_sample.py": {1},
+        "README.md": {1},
+        "tools/benchmark.py": {1},
+        "pages/removed_page.py": None,
+        "utils/helpers.py": {1},
+    }, repo)
+
+    assert changes == {
+        "keys": [],
+        "prefixes": ["pages/removed_page.py::"],
+        "test_files": ["tests/test_sample.py"],
+        "unknown": ["utils/helpers.py"],
+    }
+
+
+def test_affected_tests():
+    """
+    Test that a test is affected by a changed key, a changed module prefix or a
+    change of its test file, and that a test without an entry always is.
+    """
+    impact_map = ImpactMap({"entries": {
+        "tests/test_a.py::test_fill": {"keys": ["pages/sample_page.py::SamplePage.fill"]},
+        "tests/test_a.py::test_title": {"keys": ["pages/sample_page.py::SamplePage.title"]},
+        "tests/test_b.py::test_other": {"keys": ["pages/other_page.py::OtherPage.open"]},
+        "tests/test_c.py::test_nothing": {"keys": []},
+    }})
+    nodeids = list(impact_map.entries) + ["tests/test_d.py::test_new"]
+
+    def affected(keys=(), prefixes=(), test_files=()) -> set[str]:
+        return impact_map.affected(
+            nodeids, {"keys": keys, "prefixes": prefixes, "test_files": test_files}
+        )
+
+    assert affected(keys=["pages/sample_page.py::SamplePage.fill"]) == {
+        "tests/test_a.py::test_fill", "tests/test_d.py::test_new"
+    }
+    assert affected(prefixes=["pages/sample_page.py::"]) == {
+        "tests/test_a.py::test_fill", "tests/test_a.py::test_title", "tests/test_d.py::test_new"
+    }
+    assert affected(test_files=["tests/test_c.py"]) == {
+        "tests/test_c.py::test_nothing", "tests/test_d.py::test_new"
+    }
+
+
+def test_full_run_reason():
+    """
+    Test that every test runs without a map, with changes of unknown impact and
+    every full_run_every runs.
+    """
+    changes = {"keys": [], "prefixes": [], "test_files": [], "unknown": []}
+    impact_map = ImpactMap({"entries": {"t": {"keys": [], "seen": 0}}, "runs_since_full": 1})
+
+    assert ImpactMap().full_run_reason(changes, 0) == "no impact map yet"
+    assert "setup.py" in impact_map.full_run_reason({**changes, "unknown": ["setup.py"]}, 0)
+    assert impact_map.full_run_reason(changes, 3) is None
+    assert impact_map.full_run_reason(changes, 2) is not None
@@ -0,0 +1,82 @@
+import re
+import pytest
+from utils.user_factory import (
+    MAX_USERNAME_LENGTH, NODE_ID_ENV_VARIABLE, UserFactory, current_node_id, username_part
+)
+
+USERNAME_PATTERN = re.compile(r"^[a-z0-9-]{3,39}$")
+DIRTY_NODE_ID = "CI_Runner.eu-west-1.compute.internal/pool#42_with_a_very_long_suffix"
+
+
+def test_dirty_long_node_id_gives_valid_usernames(monkeypatch):
+    """
+    Test that a long PW_NODE_ID with underscores, dots and other characters still
+    gives usernames the application accepts.
+    """
+    monkeypatch.setenv(NODE_ID_ENV_VARIABLE, DIRTY_NODE_ID)
+    factory = UserFactory("usertest", "Build_2024.10.18+sha.abcdef", "gw12")
+
+    users = [factory.next_user() for _ in range(3)]
+
+    assert all(USERNAME_PATTERN.match(user) for user in users), users
+    assert len(set(users)) == 3
+    assert users[0].startswith("usertest-")
+    assert current_node_id() == username_part(DIRTY_NODE_ID)
+
+
+def test_machines_with_similar_long_node_ids_stay_apart():
+    """
+    Test that node ids shortened to the same start still give different usernames.
+    """
+    first = UserFactory("usertest", "run", "gw0", f"{DIRTY_NODE_ID}-1").next_user()
+    second = UserFactory("usertest", "run", "gw0", f"{DIRTY_NODE_ID}-2").next_user()
+
+    assert first != second
+    assert USERNAME_PATTERN.match(first) and USERNAME_PATTERN.match(second)
+
+
+def test_long_prefix_is_shortened():
+    """
+    Test that a prefix too long for the username limit is shortened with a hash.
+    """
+    factory = UserFactory("Users.of_the-regression_suite_on_every_branch", "abc123", "gw0", "n1")
+
+    user = factory.next_user()
+
+    assert USERNAME_PATTERN.match(user), user
+    assert len(user) <= MAX_USERNAME_LENGTH
+    assert user.endswith("-1")
+
+
+def test_short_ids_are_kept_readable():
+    """
+    Test that ids that are already valid and short are used unchanged.
+    """
+    factory = UserFactory("usertest", "a1b2c3", "gw3", "node-7")
+
+    assert factory.next_user() == "usertest-a1b2c3-node-7-gw3-1"
+    assert factory.next_user() == "usertest-a1b2c3-node-7-gw3-2"
+    assert factory.issued == ["usertest-a1b2c3-node-7-gw3-1", "usertest-a1b2c3-node-7-gw3-2"]
+
+
+@pytest.mark.parametrize("value, max_length, expected", [
+    ("Node_1.Example", None, "node-1-example"),
+    ("--a__b--", None, "a-b"),
+    ("abcdefgh", 8, "abcdefgh"),
+])
+def test_username_part(value, max_length, expected):
+    """
+    Test that values are reduced to lowercase letters, digits and hyphens.
+    """
+    assert username_part(value, max_length) == expected
+
+
+def test_username_part_shortens_with_a_hash():
+    """
+    Test that a value over the maximum length keeps its start and ends with a hash.
+    """
+    part = username_part("abcdefghijkl", 10)
+
+    assert len(part) <= 10
+    assert part.startswith("abc-")
+    assert part != username_part("abcdefghijkm", 10)
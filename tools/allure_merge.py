@@ -0,0 +1,58 @@
+"""
+Merge of the Allure results of many shards into one results directory.
+
+Every shard directory is streamed into the output one file at a time. Attachments
+are stored once per content hash, and with --compact-logs the log record steps of
+each test are folded into one text attachment per run of records. Merging is
+incremental: files merged before are skipped, so a shard that arrives late is
+merged without rebuilding the others.
+
+Usage:
+python -m tools.allure_merge allure-merged shard-1/allure-results shard-2/allure-results
+python -m tools.allure_merge allure-merged shard-3/allure-results --compact-logs
+allure serve allure-merged
+"""
+import argparse
+import sys
+from pathlib import Path
+from typing import Optional
+from utils.allure_merge import AllureMerge
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    Merges shard results directories from the command line.
+
+    Args:
+        argv (Optional[list[str]]): Command line arguments. Defaults to sys.argv.
+
+    Returns:
+        int: 0 when every shard was merged, 1 when a shard directory is missing.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("output", type=Path, help="The merged results directory.")
+    parser.add_argument("shards", type=Path, nargs="+", help="Results directories of the shards.")
+    parser.add_argument(
+        "--compact-logs",
+        action="store_true",
+        help="Fold the log record steps of each test into text attachments."
+    )
+    args = parser.parse_args(argv)
+
+    merge = AllureMerge(args.output, args.compact_logs)
+    missing = [shard for shard in args.shards if not shard.is_dir()]
+    for shard in args.shards:
+        if shard in missing:
+            print(f"{shard}: not a directory")
+            continue
+        counts = merge.merge(shard)
+        print(
+            f"{shard}: {counts['merged']} files merged, {counts['unchanged']} unchanged, "
+            f"{counts['deduplicated']} duplicate attachments "
+            f"({counts['bytes_saved'] / 1024:.1f} KiB saved), "
+            f"{counts['log_steps_compacted']} log steps compacted"
+        )
+    return 1 if missing else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
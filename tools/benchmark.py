@@ -0,0 +1,359 @@
+"""
+Benchmark of the register, login and contact flows and of the test suite.
+
+Runs the flow N times against the live ApplicationURL or the local stub server and
+reports wall time per flow, latency per page object method, and CPU time and peak
+RSS of this process and of the Playwright driver and browser processes. With
+--suite it also times whole pytest runs. The metrics are compared against a
+baseline file, and the run fails when one regresses beyond the threshold. The
+baseline records the iterations and warmup it was measured with, and a run with
+other settings is refused instead of compared. A baseline without metrics, and a
+metric measured on one side only, fail the run too, so the gate cannot pass
+without comparing anything.
+
+Usage:
+python -m tools.benchmark --stub --iterations 10
+python -m tools.benchmark --skip-flows --suite="-m sanity --stub-server" --iterations 3
+python -m tools.benchmark --stub --update-baseline
+"""
+import argparse
+import configparser
+import json
+import os
+import resource
+import shlex
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+from playwright.sync_api import sync_playwright
+from flows.sync_flows import register_login_and_send_contact_message
+from utils import timing
+from utils.asset_cache import AssetCache
+from utils.execution_profile import ExecutionProfile
+from utils.stub_server import StubServer
+from utils.user_factory import UserFactory, new_run_id
+
+DEFAULT_BASELINE = Path(__file__).with_name("benchmark_baseline.json")
+DEFAULT_THRESHOLD = 0.2
+# Settings that change the measured metrics; a baseline is only compared with runs
+# using the same values.
+COMPARED_SETTINGS = ("iterations", "warmup")
+
+def cpu_seconds(usage: resource.struct_rusage) -> float:
+    """
+    Returns the user plus system CPU time of a resource usage.
+
+    Args:
+        usage (resource.struct_rusage): The resource usage.
+
+    Returns:
+        float: The CPU time in seconds.
+    """
+    return usage.ru_utime + usage.ru_stime
+
+
+def max_rss_mb(usage: resource.struct_rusage) -> float:
+    """
+    Returns the peak resident set size of a resource usage.
+
+    Args:
+        usage (resource.struct_rusage): The resource usage.
+
+    Returns:
+        float: The peak RSS in MiB. ru_maxrss is in KiB on Linux and bytes on macOS.
+    """
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return usage.ru_maxrss / divisor
+
+
+def run_flows(
+    application_url: str,
+    profile: ExecutionProfile,
+    user: str,
+    password: str,
+    iterations: int,
+    warmup: int,
+    browser_name: str = "chromium"
+) -> dict:
+    """
+    Runs the register, login and contact flow and measures it.
+
+    Each iteration runs in a fresh context with the profile's viewport and the asset
+    cache, like a test of the suite. Warmup iterations are not measured by the flow
+    and page action latencies. The wall time and CPU time of the processes cover
+    every iteration and the browser launch, and are divided by the number of
+    iterations run. CPU time and peak RSS of the driver and browser processes are
+    read once Playwright has exited and its processes were reaped.
+
+    Args:
+        application_url (str): The base URL of the application.
+        profile (ExecutionProfile): The execution profile to launch the browser with.
+        user (str): Prefix of the usernames registered by the flows.
+        password (str): The password for registration and login.
+        iterations (int): Number of measured iterations.
+        warmup (int): Number of iterations run before measuring.
+        browser_name (str): The browser engine to launch. Default is chromium.
+
+    Returns:
+        dict: The metrics by name.
+    """
+    factory = UserFactory(user, new_run_id(), "bench")
+    asset_cache = AssetCache(
+        Path(".pytest_cache", "d", "assets"), profile.asset_cache, profile.blocked_domains
+    )
+    timing.recorder.enabled = True
+    durations = []
+    start_self = resource.getrusage(resource.RUSAGE_SELF)
+    start_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    start = time.perf_counter()
+
+    with sync_playwright() as playwright:
+        browser = getattr(playwright, browser_name).launch(**profile.launch_args)
+        for iteration in range(warmup + iterations):
+            if iteration == warmup:
+                timing.recorder.spans.clear()
+            context = browser.new_context(**profile.context_args, base_url=application_url)
+            context.set_default_timeout(profile.timeout)
+            context.set_default_navigation_timeout(profile.navigation_timeout)
+            asset_cache.install(context)
+            iteration_start = time.perf_counter()
+            try:
+                register_login_and_send_contact_message(
+                    context.new_page(), factory.next_user(), password, application_url
+                )
+            finally:
+                context.close()
+            if iteration >= warmup:
+                durations.append((time.perf_counter() - iteration_start) * 1000)
+        browser.close()
+
+    wall = time.perf_counter() - start
+    end_self = resource.getrusage(resource.RUSAGE_SELF)
+    end_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    runs = warmup + iterations
+
+    metrics = {
+        f"flow.wall_ms.{name}": value
+        for name, value in timing.latency_stats(durations).items()
+        if name in ("mean", "p50", "p95")
+    }
+    for page_action, latency in timing.recorder.summary()["page_actions"].items():
+        metrics[f"{page_action}.p50_ms"] = latency["p50"]
+    metrics.update({
+        "process.wall_s_per_flow": wall / runs,
+        "process.cpu_self_s_per_flow": (cpu_seconds(end_self) - cpu_seconds(start_self)) / runs,
+        "process.cpu_browser_s_per_flow": (
+            cpu_seconds(end_children) - cpu_seconds(start_children)
+        ) / runs,
+        "process.max_rss_self_mb": max_rss_mb(end_self),
+        "process.max_rss_browser_mb": max_rss_mb(end_children),
+    })
+    return metrics
+
+
+def run_measured(command: list[str]) -> resource.struct_rusage:
+    """
+    Runs a command and returns the resource usage of that process alone.
+
+    The usage is read with wait4 when the process is reaped. It covers the process
+    and the descendants it reaped, such as the browsers of a pytest run, and nothing
+    else that ran in this process, so the peak RSS is not mixed up with that of
+    the browser launched by run_flows.
+
+    Args:
+        command (list[str]): The command and its arguments.
+
+    Returns:
+        resource.struct_rusage: The resource usage of the process.
+
+    Raises:
+        subprocess.CalledProcessError: If the command exits with a non-zero status.
+    """
+    process = subprocess.Popen(command)
+    _, status, usage = os.wait4(process.pid, 0)
+    process.returncode = os.waitstatus_to_exitcode(status)
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, command)
+    return usage
+
+
+def run_suite(pytest_args: str, iterations: int) -> dict:
+    """
+    Runs the test suite in pytest subprocesses and measures it.
+
+    Args:
+        pytest_args (str): Arguments passed to pytest.
+        iterations (int): Number of pytest runs.
+
+    Returns:
+        dict: The metrics by name. The peak RSS is the highest of a pytest run and
+        the processes it started.
+    """
+    walls = []
+    usages = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        usages.append(run_measured(
+            [sys.executable, "-m", "pytest", "-q", *shlex.split(pytest_args)]
+        ))
+        walls.append(time.perf_counter() - start)
+    return {
+        "suite.wall_s.mean": statistics.mean(walls),
+        "suite.wall_s.min": min(walls),
+        "suite.cpu_s.mean": statistics.mean(cpu_seconds(usage) for usage in usages),
+        "suite.max_rss_mb": max(max_rss_mb(usage) for usage in usages),
+    }
+
+
+def compare(metrics: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Compares metrics against a baseline. All metrics are lower-is-better.
+
+    A metric of the baseline that was not measured, or a measured metric missing
+    from the baseline, counts as a regression, like a baseline without metrics.
+
+    Args:
+        metrics (dict): The measured metrics by name.
+        baseline (dict): The baseline file content, with "metrics" and optional
+            per-metric "thresholds".
+        threshold (float): Allowed relative increase, such as 0.2 for 20%.
+
+    Returns:
+        list[str]: A description of every regressed or missing metric.
+    """
+    references = baseline.get("metrics", {})
+    if not references:
+        return ["the baseline has no metrics; record them with --update-baseline"]
+    regressions = [
+        f"{name}: not in the baseline; record a new one with --update-baseline"
+        for name in sorted(metrics.keys() - references.keys())
+    ]
+    thresholds = baseline.get("thresholds", {})
+    for name, reference in references.items():
+        if name not in metrics:
+            regressions.append(f"{name}: not measured in this run")
+            continue
+        if reference <= 0:
+            continue
+        allowed = thresholds.get(name, threshold)
+        change = metrics[name] / reference - 1
+        if change > allowed:
+            regressions.append(
+                f"{name}: {metrics[name]:.3f} vs baseline {reference:.3f} "
+                f"(+{change:.0%}, allowed +{allowed:.0%})"
+            )
+    return regressions
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    Runs the benchmark from the command line.
+
+    Args:
+        argv (Optional[list[str]]): Command line arguments. Defaults to sys.argv.
+
+    Returns:
+        int: 0 if no metric regressed, 1 if one did or is missing from the run or
+        the baseline.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--target", default=None, help="Base URL to run against. Defaults to ApplicationURL."
+    )
+    parser.add_argument("--stub", action="store_true", help="Run against a local stub server.")
+    parser.add_argument(
+        "--stub-latency", type=float, default=0, help="Latency of the stub server in ms."
+    )
+    parser.add_argument("--profile", default="ci-fast", help="Execution profile from config.ini.")
+    parser.add_argument("--browser", default="chromium", choices=("chromium", "firefox", "webkit"))
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument(
+        "--suite",
+        default=None,
+        metavar="PYTEST_ARGS",
+        help="Also time pytest runs with these arguments, given as --suite=\"<args>\"."
+    )
+    parser.add_argument("--skip-flows", action="store_true", help="Only time the pytest runs.")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=None,
+        help=f"Allowed relative regression. Defaults to the baseline's, then {DEFAULT_THRESHOLD}."
+    )
+    parser.add_argument(
+        "--update-baseline", action="store_true", help="Store the results as the baseline."
+    )
+    parser.add_argument("--output", type=Path, default=None, help="Write the results as JSON.")
+    args = parser.parse_args(argv)
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    settings = {"iterations": args.iterations, "warmup": args.warmup}
+    if not args.update_baseline and baseline.get("metrics"):
+        recorded = baseline.get("settings", {})
+        differing = [
+            f"--{name} {recorded.get(name)}" for name in COMPARED_SETTINGS
+            if recorded.get(name) != settings[name]
+        ]
+        if differing:
+            parser.error(
+                f"{args.baseline} was recorded with {' '.join(differing)}; run with the "
+                f"same settings, or record a new baseline with --update-baseline"
+            )
+
+    config = configparser.ConfigParser()
+    config.read("config.ini")
+    defaults = config["DEFAULT"]
+    profile = ExecutionProfile(args.profile, config)
+    stub_server = StubServer(latency=args.stub_latency).start() if args.stub else None
+    application_url = stub_server.url if stub_server else args.target or defaults["ApplicationURL"]
+
+    metrics = {}
+    try:
+        if not args.skip_flows:
+            metrics.update(run_flows(
+                application_url,
+                profile,
+                defaults["User"],
+                defaults["Password"],
+                args.iterations,
+                args.warmup,
+                args.browser
+            ))
+        if args.suite is not None:
+            metrics.update(run_suite(args.suite, args.iterations))
+    finally:
+        if stub_server:
+            stub_server.stop()
+
+    target = "stub" if args.stub else application_url
+    for name, value in sorted(metrics.items()):
+        print(f"{name:60} {value:12.3f}")
+    if args.output:
+        args.output.write_text(json.dumps({"target": target, "metrics": metrics}, indent=2))
+
+    threshold = args.threshold
+    if threshold is None:
+        threshold = baseline.get("threshold", DEFAULT_THRESHOLD)
+    if args.update_baseline:
+        baseline.update({
+            "target": target, "threshold": threshold, "settings": settings, "metrics": metrics
+        })
+        args.baseline.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if baseline.get("target") and baseline["target"] != target:
+        print(f"Warning: baseline was recorded against {baseline['target']}, not {target}")
+    regressions = compare(metrics, baseline, threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
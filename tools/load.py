@@ -0,0 +1,485 @@
+"""
+Load generator driving the async page objects as concurrent virtual users.
+
+Virtual users are spread over worker processes. Each worker runs its users as
+asyncio tasks in one browser, and every user repeats the register, login and
+contact flow with a new username in a fresh context until the run ends. Users
+start evenly over the ramp-up period. Workers stream the timed page object steps
+and flow results to this process, which prints throughput and latency for every
+interval and stops the run when the error rate or the p95 flow latency breaches
+its SLO.
+
+Usage:
+python -m tools.load --stub --users 20 --processes 4 --duration 120 --ramp-up 30
+python -m tools.load --target https://staging.example.com --users 50 --max-p95-ms 8000
+"""
+import argparse
+import asyncio
+import bisect
+import configparser
+import json
+import multiprocessing
+import queue
+import sys
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from typing import Optional
+from playwright.async_api import Browser, async_playwright
+from flows.async_flows import register_login_and_send_contact_message
+from utils import timing
+from utils.execution_profile import ExecutionProfile
+from utils.stub_server import StubServer
+from utils.user_factory import UserFactory, new_run_id
+
+FLOW_STEP = "flow"
+HISTOGRAM_BOUNDS_MS = (
+    10, 25, 50, 100, 250, 500, 750, 1000, 1500, 2000, 3000, 5000, 7500, 10000, 15000, 30000
+)
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram, cheap enough to update for every step of a long run.
+
+    Percentiles are reported as the upper bound of the bucket they fall in.
+
+    Attributes:
+        counts (list[int]): Number of durations per bucket; the last bucket is open-ended.
+        count (int): Number of durations recorded.
+        total (float): Sum of the durations in milliseconds.
+        max (float): Longest duration in milliseconds.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty LatencyHistogram.
+        """
+        self.counts = [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, duration: float) -> None:
+        """
+        Records a duration.
+
+        Args:
+            duration (float): The duration in milliseconds.
+        """
+        self.counts[bisect.bisect_left(HISTOGRAM_BOUNDS_MS, duration)] += 1
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+
+    def percentile(self, rank: float) -> float:
+        """
+        Returns the upper bound of the bucket holding the percentile.
+
+        Args:
+            rank (float): The percentile, from 0 to 100.
+
+        Returns:
+            float: The bucket bound in milliseconds, the maximum for the open-ended bucket.
+        """
+        if not self.count:
+            return 0.0
+        target = max(rank / 100 * self.count, 1)
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return HISTOGRAM_BOUNDS_MS[index] if index < len(HISTOGRAM_BOUNDS_MS) else self.max
+        return self.max
+
+    def to_dict(self) -> dict:
+        """
+        Returns the histogram as JSON-serializable statistics and bucket counts.
+
+        Returns:
+            dict: Count, mean, p50, p95, p99, max, and the count per bucket bound.
+        """
+        buckets = {f"<={bound}": count for bound, count in zip(HISTOGRAM_BOUNDS_MS, self.counts)}
+        buckets[f">{HISTOGRAM_BOUNDS_MS[-1]}"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3) if self.count else 0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": round(self.max, 3),
+            "buckets": buckets,
+        }
+
+
+async def _virtual_user(
+    browser: Browser,
+    factory: UserFactory,
+    settings: dict,
+    start_at: float,
+    results: list,
+    active: list,
+    stop
+) -> None:
+    profile = settings["profile"]
+    while time.time() < start_at and not stop.is_set():
+        await asyncio.sleep(min(start_at - time.time(), 0.5))
+    if stop.is_set():
+        return
+    active[0] += 1
+    try:
+        while not stop.is_set() and time.time() < settings["end_at"]:
+            context = await browser.new_context(**profile.context_args)
+            context.set_default_timeout(profile.timeout)
+            context.set_default_navigation_timeout(profile.navigation_timeout)
+            start = time.perf_counter()
+            error = None
+            try:
+                await register_login_and_send_contact_message(
+                    await context.new_page(),
+                    factory.next_user(),
+                    settings["password"],
+                    settings["application_url"]
+                )
+            except Exception as e:
+                error = f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}"[:200]
+            finally:
+                await context.close()
+            results.append(((time.perf_counter() - start) * 1000, error))
+    finally:
+        active[0] -= 1
+
+
+def _drain(worker: int, results: list, active: list) -> dict:
+    spans, timing.recorder.spans = timing.recorder.spans, []
+    flows, results[:] = list(results), []
+    return {
+        "worker": worker,
+        "active": active[0],
+        "steps": [(f"{page}.{action}", duration) for page, action, _, duration in spans],
+        "flows": flows,
+    }
+
+
+async def _run_worker(worker: int, start_times: list[float], settings: dict, events, stop) -> None:
+    timing.recorder.enabled = True
+    factory = UserFactory(settings["user"], settings["run_id"], f"load{worker}")
+    results = []
+    active = [0]
+    async with async_playwright() as playwright:
+        browser = await getattr(playwright, settings["browser_name"]).launch(
+            **settings["profile"].launch_args
+        )
+        users = [
+            asyncio.create_task(
+                _virtual_user(browser, factory, settings, start_at, results, active, stop)
+            )
+            for start_at in start_times
+        ]
+        try:
+            while not all(user.done() for user in users):
+                await asyncio.wait(users, timeout=settings["interval"])
+                events.put(_drain(worker, results, active))
+            for user in users:
+                user.result()
+        finally:
+            await browser.close()
+    events.put(_drain(worker, results, active))
+
+
+def worker_main(worker: int, start_times: list[float], settings: dict, events, stop) -> None:
+    """
+    Entry point of a worker process running its share of the virtual users.
+
+    Args:
+        worker (int): Index of the worker.
+        start_times (list[float]): Epoch time at which each of its users starts.
+        settings (dict): Target, credentials, profile and timing of the run.
+        events: Queue the worker streams its steps and flow results to.
+        stop: Event set by the controller to end the run early.
+    """
+    try:
+        asyncio.run(_run_worker(worker, start_times, settings, events, stop))
+    except Exception as e:
+        events.put({"worker": worker, "crashed": f"{type(e).__name__}: {e}"})
+    finally:
+        events.put({"worker": worker, "done": True})
+
+
+class LoadReport:
+    """
+    Aggregates the events of the workers and checks the SLOs over a sliding window.
+
+    Attributes:
+        steps (dict[str, LatencyHistogram]): Histogram per page object step, and for
+            the whole flow, over the run.
+        interval_steps (dict[str, list[float]]): Durations per step in the current interval.
+        window (deque): (time, duration, error) of the flows in the SLO window.
+        errors (dict[str, int]): Number of failed flows per error message.
+        active (dict[int, int]): Running virtual users per worker.
+    """
+
+    def __init__(self, slo_window: float):
+        """
+        Initializes an empty LoadReport.
+
+        Args:
+            slo_window (float): Length in seconds of the window the SLOs are checked over.
+        """
+        self.slo_window = slo_window
+        self.steps = defaultdict(LatencyHistogram)
+        self.interval_steps = defaultdict(list)
+        self.window = deque()
+        self.errors = defaultdict(int)
+        self.active = {}
+        self.flows = 0
+        self.failed = 0
+
+    def add(self, event: dict) -> None:
+        """
+        Adds a batch of steps and flow results streamed by a worker.
+
+        Args:
+            event (dict): The event of the worker.
+        """
+        self.active[event["worker"]] = event["active"]
+        now = time.time()
+        for step, duration in event["steps"]:
+            self.steps[step].add(duration)
+            self.interval_steps[step].append(duration)
+        for duration, error in event["flows"]:
+            self.steps[FLOW_STEP].add(duration)
+            self.interval_steps[FLOW_STEP].append(duration)
+            self.window.append((now, duration, error))
+            self.flows += 1
+            if error:
+                self.failed += 1
+                self.errors[error] += 1
+
+    def interval_lines(self, elapsed: float, interval: float) -> list[str]:
+        """
+        Returns the report lines of the current interval and starts a new one.
+
+        Args:
+            elapsed (float): Seconds since the start of the run.
+            interval (float): Length of the interval in seconds.
+
+        Returns:
+            list[str]: A header line and one line per step.
+        """
+        flows = self.interval_steps.get(FLOW_STEP, [])
+        lines = [
+            f"[{elapsed:6.0f}s] users {sum(self.active.values()):4d}  "
+            f"flows {self.flows:6d}  failed {self.failed:5d}  "
+            f"{len(flows) / interval:6.2f} flows/s"
+        ]
+        for step, durations in sorted(self.interval_steps.items()):
+            stats = timing.latency_stats(durations)
+            lines.append(
+                f"  {step:45} {len(durations) / interval:7.2f}/s  "
+                f"p50 {stats['p50']:8.0f}  p95 {stats['p95']:8.0f}  p99 {stats['p99']:8.0f} ms"
+            )
+        self.interval_steps.clear()
+        return lines
+
+    def slo_breach(
+        self, max_error_rate: float, max_p95_ms: Optional[float], min_flows: int
+    ) -> Optional[str]:
+        """
+        Checks the error rate and p95 flow latency over the SLO window.
+
+        Args:
+            max_error_rate (float): Highest allowed share of failed flows.
+            max_p95_ms (Optional[float]): Highest allowed p95 flow duration, None for no limit.
+            min_flows (int): Flows needed in the window before the SLOs are checked.
+
+        Returns:
+            Optional[str]: The breached SLO, None if both hold.
+        """
+        horizon = time.time() - self.slo_window
+        while self.window and self.window[0][0] < horizon:
+            self.window.popleft()
+        if len(self.window) < min_flows:
+            return None
+        error_rate = sum(1 for _, _, error in self.window if error) / len(self.window)
+        if error_rate > max_error_rate:
+            return f"error rate {error_rate:.1%} above {max_error_rate:.1%}"
+        if max_p95_ms is not None:
+            p95 = timing.percentile(sorted(duration for _, duration, _ in self.window), 95)
+            if p95 > max_p95_ms:
+                return f"p95 flow latency {p95:.0f} ms above {max_p95_ms:.0f} ms"
+        return None
+
+    def summary(self) -> dict:
+        """
+        Returns the totals of the run.
+
+        Returns:
+            dict: Flow counts, the most frequent errors and the histogram of every step.
+        """
+        return {
+            "flows": self.flows,
+            "failed": self.failed,
+            "errors": dict(sorted(self.errors.items(), key=lambda item: -item[1])[:10]),
+            "steps": {step: histogram.to_dict() for step, histogram in sorted(self.steps.items())},
+        }
+
+
+def start_times(users: int, ramp_up: float, start: float) -> list[float]:
+    """
+    Spreads the start of the virtual users evenly over the ramp-up period.
+
+    Args:
+        users (int): Number of virtual users.
+        ramp_up (float): Ramp-up period in seconds.
+        start (float): Epoch time of the start of the run.
+
+    Returns:
+        list[float]: Epoch start time of each user.
+    """
+    return [start + ramp_up * index / users for index in range(users)]
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    Runs the load generator from the command line.
+
+    Args:
+        argv (Optional[list[str]]): Command line arguments. Defaults to sys.argv.
+
+    Returns:
+        int: 0 if the run ended without an SLO breach or a worker crash, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--target", default=None, help="Base URL to load. Defaults to ApplicationURL."
+    )
+    parser.add_argument("--stub", action="store_true", help="Load a local stub server.")
+    parser.add_argument(
+        "--stub-latency", type=float, default=0, help="Latency of the stub server in ms."
+    )
+    parser.add_argument("--profile", default="ci-fast", help="Execution profile from config.ini.")
+    parser.add_argument("--browser", default="chromium", choices=("chromium", "firefox", "webkit"))
+    parser.add_argument("--users", type=int, default=10, help="Number of virtual users.")
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=min(multiprocessing.cpu_count(), 4),
+        help="Number of worker processes, each running one browser."
+    )
+    parser.add_argument("--duration", type=float, default=60, help="Length of the run in seconds.")
+    parser.add_argument(
+        "--ramp-up", type=float, default=10, help="Seconds over which the users start."
+    )
+    parser.add_argument(
+        "--interval", type=float, default=5, help="Seconds between reports."
+    )
+    parser.add_argument(
+        "--max-error-rate", type=float, default=0.05, help="Stop above this share of failed flows."
+    )
+    parser.add_argument(
+        "--max-p95-ms", type=float, default=None, help="Stop above this p95 flow duration."
+    )
+    parser.add_argument(
+        "--slo-window", type=float, default=30, help="Seconds of flows the SLOs are checked over."
+    )
+    parser.add_argument(
+        "--slo-min-flows", type=int, default=10, help="Flows needed before the SLOs are checked."
+    )
+    parser.add_argument("--output", type=Path, default=None, help="Write the summary as JSON.")
+    args = parser.parse_args(argv)
+
+    config = configparser.ConfigParser()
+    config.read("config.ini")
+    defaults = config["DEFAULT"]
+    profile = ExecutionProfile(args.profile, config)
+    stub_server = StubServer(latency=args.stub_latency).start() if args.stub else None
+    processes = max(min(args.processes, args.users), 1)
+
+    start = time.time() + 1
+    settings = {
+        "application_url": (
+            stub_server.url if stub_server else args.target or defaults["ApplicationURL"]
+        ),
+        "user": defaults["User"],
+        "password": defaults["Password"],
+        "run_id": new_run_id(),
+        "profile": profile,
+        "browser_name": args.browser,
+        "end_at": start + args.duration,
+        "interval": min(args.interval, 1.0),
+    }
+    times = start_times(args.users, args.ramp_up, start)
+    context = multiprocessing.get_context("spawn")
+    events = context.Queue()
+    stop = context.Event()
+    workers = [
+        context.Process(
+            target=worker_main,
+            args=(worker, times[worker::processes], settings, events, stop),
+            name=f"load-worker-{worker}"
+        )
+        for worker in range(processes)
+    ]
+    print(
+        f"Loading {settings['application_url']} with {args.users} users in {processes} "
+        f"processes for {args.duration:.0f}s, run id {settings['run_id']}",
+        flush=True
+    )
+
+    report = LoadReport(args.slo_window)
+    breach = None
+    crashes = []
+    running = processes
+    next_report = start + args.interval
+    try:
+        for worker in workers:
+            worker.start()
+        while running:
+            try:
+                event = events.get(timeout=1)
+            except queue.Empty:
+                event = None
+            if event is not None:
+                if event.get("done"):
+                    running -= 1
+                elif event.get("crashed"):
+                    crashes.append(event["crashed"])
+                    print(f"Worker {event['worker']} crashed: {event['crashed']}", flush=True)
+                    stop.set()
+                else:
+                    report.add(event)
+            if breach is None:
+                breach = report.slo_breach(args.max_error_rate, args.max_p95_ms, args.slo_min_flows)
+                if breach is not None:
+                    print(f"SLO breached: {breach}; stopping", flush=True)
+                    stop.set()
+            if time.time() >= next_report:
+                lines = report.interval_lines(time.time() - start, args.interval)
+                print("\n".join(lines), flush=True)
+                next_report += args.interval
+    except KeyboardInterrupt:
+        stop.set()
+        print("Interrupted; waiting for the running flows", flush=True)
+    finally:
+        for worker in workers:
+            worker.join()
+        if stub_server:
+            stub_server.stop()
+
+    summary = report.summary()
+    summary.update({"breach": breach, "crashes": crashes, "users": args.users})
+    print(f"Flows {summary['flows']}, failed {summary['failed']}")
+    for step, stats in summary["steps"].items():
+        print(
+            f"  {step:45} n {stats['count']:6d}  mean {stats['mean']:8.0f}  "
+            f"p50 <={stats['p50']:6.0f}  p95 <={stats['p95']:6.0f}  p99 <={stats['p99']:6.0f} ms"
+        )
+    for error, count in summary["errors"].items():
+        print(f"  {count:5d} x {error}")
+    if args.output:
+        args.output.write_text(json.dumps(summary, indent=2))
+    return 1 if breach or crashes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+"""
+Audit of the cost of resolving the Locator attributes of the page objects.
+
+Loads every page of the application, collects the Locator attributes its page
+object defines, and times repeated resolutions of each one. Locators matching no
+element or several elements, and locators much slower than a plain CSS lookup on
+the same page, are flagged; when the matched element has a unique id, test id or
+name attribute, the fastest selector built from it is suggested. The locators are
+ranked by resolution time, and each run is appended to a history file so the
+report can be compared with earlier runs.
+
+Usage:
+python -m tools.locator_audit --stub
+python -m tools.locator_audit --target https://staging.example.com --repeat 50 --output audit.json
+"""
+import argparse
+import configparser
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Optional
+from playwright.sync_api import Locator, Page, sync_playwright
+from pages.base_page import BasePage
+from pages.contact_page import ContactPage
+from pages.login_page import LoginPage
+from pages.register_page import RegisterPage
+from pages.secured_area_page import SecuredAreaPage
+from utils import timing
+from utils.asset_cache import AssetCache
+from utils.execution_profile import ExecutionProfile
+from utils.stub_server import StubServer
+from utils.user_factory import UserFactory, new_run_id
+
+# Page object classes with the path they are audited on. The audit logs a user in
+# first, so the pages of the secured area load too.
+AUDITED_PAGES = (
+    (RegisterPage, "/register"),
+    (LoginPage, "/login"),
+    (SecuredAreaPage, "/secure"),
+    (ContactPage, "/contact"),
+)
+BASELINE_SELECTOR = "html"
+DEFAULT_HISTORY = Path(".pytest_cache", "d", "locator_audit", "history.jsonl")
+DEFAULT_REPEAT = 30
+DEFAULT_SLOW_FACTOR = 3.0
+WARMUP = 3
+
+# Builds CSS selectors from the id, test id and name attributes of an element,
+# keeping those that match only that element.
+CANDIDATES_SCRIPT = """
+(element) => {
+    const tag = element.tagName.toLowerCase();
+    const candidates = [];
+    if (element.id) {
+        candidates.push(`#${CSS.escape(element.id)}`);
+    }
+    for (const attribute of ["data-testid", "data-test", "name"]) {
+        const value = element.getAttribute(attribute);
+        if (value) {
+            candidates.push(`${tag}[${attribute}="${value.replace(/["\\\\]/g, "\\\\$&")}"]`);
+        }
+    }
+    return candidates.filter((selector) => {
+        try {
+            const matches = document.querySelectorAll(selector);
+            return matches.length === 1 && matches[0] === element;
+        } catch (e) {
+            return false;
+        }
+    });
+}
+"""
+
+
+def locator_attributes(page_object: BasePage) -> dict[str, Locator]:
+    """
+    Collects the Locator attributes of a page object, the locators its flows fill
+    forms and click with.
+
+    Args:
+        page_object (BasePage): The page object.
+
+    Returns:
+        dict[str, Locator]: The locators by attribute name.
+    """
+    return {
+        name: value for name, value in vars(page_object).items() if isinstance(value, Locator)
+    }
+
+
+def resolution_times(locator: Locator, repeat: int) -> list[float]:
+    """
+    Times repeated resolutions of a locator.
+
+    Each resolution is a count of the elements the locator matches, one round trip
+    to the browser that runs the selector against the whole page.
+
+    Args:
+        locator (Locator): The locator.
+        repeat (int): Number of timed resolutions, after a few untimed ones.
+
+    Returns:
+        list[float]: The sorted resolution times in milliseconds.
+    """
+    for _ in range(WARMUP):
+        locator.count()
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        locator.count()
+        durations.append((time.perf_counter() - start) * 1000)
+    return sorted(durations)
+
+
+def audit_locator(
+    page: Page, name: str, locator: Locator, repeat: int, baseline_ms: float, slow_factor: float
+) -> dict:
+    """
+    Times a locator, flags it and looks for a faster selector of the same element.
+
+    Args:
+        page (Page): The page the locator belongs to.
+        name (str): Name of the locator, as PageClass.attribute.
+        locator (Locator): The locator.
+        repeat (int): Number of timed resolutions.
+        baseline_ms (float): p50 resolution time of the baseline selector on the page.
+        slow_factor (float): Ratio to the baseline above which the locator is slow.
+
+    Returns:
+        dict: The selector, matches, p50 and p95 in milliseconds, ratio to the
+        baseline, flags and suggested selector of the locator.
+    """
+    durations = resolution_times(locator, repeat)
+    p50 = timing.percentile(durations, 50)
+    matches = locator.count()
+    flags = []
+    if matches == 0:
+        flags.append("no match")
+    elif matches > 1:
+        flags.append(f"ambiguous ({matches} matches)")
+    relative = p50 / baseline_ms if baseline_ms else 0
+    if relative > slow_factor:
+        flags.append(f"slow ({relative:.1f}x {BASELINE_SELECTOR})")
+
+    suggestion = None
+    if matches:
+        for selector in locator.first.evaluate(CANDIDATES_SCRIPT):
+            candidate_p50 = timing.percentile(resolution_times(page.locator(selector), repeat), 50)
+            if candidate_p50 < p50 and (suggestion is None or candidate_p50 < suggestion["p50_ms"]):
+                suggestion = {"selector": selector, "p50_ms": round(candidate_p50, 3)}
+
+    return {
+        "locator": name,
+        "selector": timing.describe(locator),
+        "matches": matches,
+        "p50_ms": round(p50, 3),
+        "p95_ms": round(timing.percentile(durations, 95), 3),
+        "relative": round(relative, 2),
+        "flags": flags,
+        "suggestion": suggestion,
+    }
+
+
+def audit_pages(
+    page: Page, application_url: str, repeat: int, slow_factor: float
+) -> list[dict]:
+    """
+    Audits the locators of every page object on its page.
+
+    Args:
+        page (Page): A page of a context that is logged in for the pages needing it.
+        application_url (str): The base URL of the application.
+        repeat (int): Number of timed resolutions per locator.
+        slow_factor (float): Ratio to the baseline above which a locator is slow.
+
+    Returns:
+        list[dict]: The audit of each locator, as returned by audit_locator.
+    """
+    results = []
+    for page_class, path in AUDITED_PAGES:
+        page_object = page_class(page)
+        page_object.goto(f"{application_url}{path}")
+        baseline_ms = timing.percentile(
+            resolution_times(page.locator(BASELINE_SELECTOR), repeat), 50
+        )
+        for attribute, locator in locator_attributes(page_object).items():
+            results.append(audit_locator(
+                page, f"{page_class.__name__}.{attribute}", locator, repeat, baseline_ms,
+                slow_factor
+            ))
+    return results
+
+
+def previous_run(history_path: Path, target: str) -> dict:
+    """
+    Returns the p50 of each locator in the last run of the history against a target.
+
+    Args:
+        history_path (Path): The JSON Lines history file.
+        target (str): The base URL the runs to compare with ran against, or "stub".
+
+    Returns:
+        dict: The p50 in milliseconds by locator name, empty without a run against
+        the target.
+    """
+    try:
+        lines = history_path.read_text().splitlines()
+    except OSError:
+        return {}
+    for line in reversed(lines):
+        try:
+            run = json.loads(line)
+            if run["target"] == target:
+                return run["locators"]
+        except (ValueError, KeyError, TypeError):
+            continue
+    return {}
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    """
+    Runs the locator audit from the command line.
+
+    Args:
+        argv (Optional[list[str]]): Command line arguments. Defaults to sys.argv.
+
+    Returns:
+        int: 1 with --strict when a locator matches no element or several elements,
+        0 otherwise.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--target", default=None, help="Base URL to run against. Defaults to ApplicationURL."
+    )
+    parser.add_argument("--stub", action="store_true", help="Run against a local stub server.")
+    parser.add_argument("--profile", default="ci-fast", help="Execution profile from config.ini.")
+    parser.add_argument("--browser", default="chromium", choices=("chromium", "firefox", "webkit"))
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument(
+        "--slow-factor",
+        type=float,
+        default=DEFAULT_SLOW_FACTOR,
+        help=f"Flag locators slower than this many times '{BASELINE_SELECTOR}' on their page."
+    )
+    parser.add_argument("--history", type=Path, default=DEFAULT_HISTORY)
+    parser.add_argument("--output", type=Path, default=None, help="Write the report as JSON.")
+    parser.add_argument(
+        "--strict", action="store_true", help="Exit with 1 on ambiguous or unmatched locators."
+    )
+    args = parser.parse_args(argv)
+
+    config = configparser.ConfigParser()
+    config.read("config.ini")
+    defaults = config["DEFAULT"]
+    profile = ExecutionProfile(args.profile, config)
+    stub_server = StubServer().start() if args.stub else None
+    application_url = stub_server.url if stub_server else args.target or defaults["ApplicationURL"]
+    asset_cache = AssetCache(
+        Path(".pytest_cache", "d", "assets"), profile.asset_cache, profile.blocked_domains
+    )
+
+    try:
+        with sync_playwright() as playwright:
+            browser = getattr(playwright, args.browser).launch(**profile.launch_args)
+            try:
+                context = browser.new_context(**profile.context_args, base_url=application_url)
+                context.set_default_timeout(profile.timeout)
+                context.set_default_navigation_timeout(profile.navigation_timeout)
+                asset_cache.install(context)
+                page = context.new_page()
+                user = UserFactory(defaults["User"], new_run_id(), "audit").next_user()
+                RegisterPage(page, via_api=True).register(user, defaults["Password"])
+                LoginPage(page, via_api=True).login(user, defaults["Password"])
+                results = audit_pages(page, application_url, args.repeat, args.slow_factor)
+            finally:
+                browser.close()
+    finally:
+        if stub_server:
+            stub_server.stop()
+
+    target = "stub" if args.stub else application_url
+    previous = previous_run(args.history, target)
+    results.sort(key=lambda result: result["p50_ms"], reverse=True)
+    print(f"{'rank':>4}  {'locator':40} {'p50 ms':>8} {'x html':>7} {'prev ms':>8}  flags")
+    for rank, result in enumerate(results, start=1):
+        result["rank"] = rank
+        result["previous_p50_ms"] = previous.get(result["locator"])
+        previous_p50 = result["previous_p50_ms"]
+        print(
+            f"{rank:>4}  {result['locator']:40} {result['p50_ms']:8.3f} "
+            f"{result['relative']:7.2f} {previous_p50 if previous_p50 is not None else '-':>8}  "
+            f"{', '.join(result['flags'])}"
+        )
+        print(f"      {result['selector']}")
+        if result["suggestion"]:
+            suggestion = result["suggestion"]
+            print(f"      suggest {suggestion['selector']} ({suggestion['p50_ms']:.3f} ms)")
+
+    args.history.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.history, "a") as history_file:
+        history_file.write(json.dumps({
+            "time": round(time.time()),
+            "target": target,
+            "locators": {result["locator"]: result["p50_ms"] for result in results},
+        }) + "\n")
+    if args.output:
+        args.output.write_text(json.dumps({"target": target, "locators": results}, indent=2))
+
+    unresolved = [
+        result for result in results
+        if any(flag.startswith(("no match", "ambiguous")) for flag in result["flags"])
+    ]
+    return 1 if args.strict and unresolved else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
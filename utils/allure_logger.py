@@ -1,18 +1,69 @@
 import allure
+import allure_commons
 import logging
-from datetime import datetime
+import re
+import threading
+import time
+from collections import deque
+from allure_commons.model2 import Status, TestStepResult
+from allure_commons.types import AttachmentType
+from allure_commons.utils import uuid4
+
+LOG_MODES = ("step", "attachment", "grouped")
+# Matches the title of the steps written for log records, see AllureLogger._title.
+LOG_STEP_PATTERN = re.compile(r"^\d{2}/\d{2}/\d{4}, \d{2}:\d{2}:\d{2} LOG \(\w+\): ")
 
 class AllureLogger(logging.Handler):
     """
     Custom logging handler that emits log messages to Allure report.
 
+    In "step" mode every record opens its own Allure step as it is logged. The
+    "attachment" and "grouped" modes only buffer the record on the logging thread;
+    flush writes the buffered records of a test at its end, either as one text
+    attachment or as steps nested under the allure.step that was open when each
+    record was logged. flush_test is kept apart from Handler.flush, which logging
+    calls at interpreter exit when no test is open. The buffer holds at most max_records records per test;
+    older records are dropped first and counted.
+
     Usage:
     logger = logging.getLogger(__name__)
-    allure_handler = AllureLogger()
+    allure_handler = AllureLogger(mode="grouped")
     logger.addHandler(allure_handler)
     logger.info("This is an info message")
+    allure_handler.flush_test()
+
+    Attributes:
+        mode (str): One of "step", "attachment" or "grouped".
+        max_records (int): Maximum number of records buffered per test.
+        reporter: The Allure reporter buffered records are written to, None when
+            Allure is off.
+        dropped (int): Number of records dropped from the buffer of the current test.
     """
 
+    def __init__(self, mode: str = "step", level: int = logging.INFO, max_records: int = 1000):
+        """
+        Initializes the AllureLogger.
+
+        Args:
+            mode (str): One of "step", "attachment" or "grouped". Default is "step".
+            level (int): Minimum level of the records written to the report. Default is INFO.
+            max_records (int): Maximum number of records buffered per test. Default is 1000.
+
+        Raises:
+            ValueError: If the mode is unknown.
+        """
+        if mode not in LOG_MODES:
+            raise ValueError(f"LogMode must be one of {', '.join(LOG_MODES)}, got '{mode}'")
+        super().__init__(level)
+        self.mode = mode
+        self.max_records = max_records
+        self.reporter = None
+        self.dropped = 0
+        self._records = deque(maxlen=max_records)
+        self._steps = threading.local()
+        if mode == "grouped":
+            allure_commons.plugin_manager.register(self)
+
     def emit(self, record: logging.LogRecord) -> None:
         """
         Emit a log record to Allure report.
@@ -20,10 +71,88 @@ class AllureLogger(logging.Handler):
         Args:
             record (logging.LogRecord): The log record to emit.
         """
+        if self.mode == "step":
+            with allure.step(self._title(record)):
+                pass
+            return
+
+        if len(self._records) == self.max_records:
+            self.dropped += 1
+        stack = getattr(self._steps, "stack", None)
+        self._records.append((stack[-1] if stack else None, record))
+
+    def flush_test(self) -> None:
+        """
+        Writes the buffered records of the current test to the report and clears the buffer.
+
+        Must be called on the test thread while the test result is still open.
+        """
+        self.acquire()
+        try:
+            records = list(self._records)
+            self._records.clear()
+            dropped, self.dropped = self.dropped, 0
+        finally:
+            self.release()
+        if self.reporter is None or not records:
+            return
+
+        if self.mode == "attachment":
+            lines = [self._title(record) for _, record in records]
+            if dropped:
+                lines.insert(0, f"{dropped} earlier records dropped")
+            self.reporter.attach_data(
+                uuid4(), "\n".join(lines), name="log", attachment_type=AttachmentType.TEXT
+            )
+            return
+
+        test = self.reporter.get_test(None)
+        if test is None:
+            return
+        if dropped:
+            test.steps.append(self._step_result(f"{dropped} earlier records dropped", time.time()))
+        test.steps.extend(
+            self._step_result(self._title(record), record.created) for _, record in records
+        )
+        test.steps.sort(key=lambda step: step.start or 0)
+
+    @allure_commons.hookimpl
+    def start_step(self, uuid, title, params):
+        stack = getattr(self._steps, "stack", None)
+        if stack is None:
+            stack = self._steps.stack = []
+        stack.append(uuid)
+
+    @allure_commons.hookimpl(tryfirst=True)
+    def stop_step(self, uuid, exc_type, exc_val, exc_tb):
+        stack = getattr(self._steps, "stack", None)
+        if stack and stack[-1] == uuid:
+            stack.pop()
+        if self.reporter is None:
+            return
+        step = self.reporter.get_item(uuid)
+        if step is None:
+            return
+        self.acquire()
+        try:
+            records = [record for record_step, record in self._records if record_step == uuid]
+            if records:
+                self._records = deque(
+                    (entry for entry in self._records if entry[0] != uuid), maxlen=self.max_records
+                )
+        finally:
+            self.release()
+        step.steps.extend(
+            self._step_result(self._title(record), record.created) for record in records
+        )
+        step.steps.sort(key=lambda child: child.start or 0)
 
-        now = datetime.now()  # current date and time
-        date_time = now.strftime("%m/%d/%Y, %H:%M:%S")
+    @staticmethod
+    def _title(record: logging.LogRecord) -> str:
+        date_time = time.strftime("%m/%d/%Y, %H:%M:%S", time.localtime(record.created))
+        return f"{date_time} LOG ({record.levelname}): {record.getMessage()}"
 
-        if record.levelno >= logging.INFO:
-            with allure.step(f'{date_time} LOG ({record.levelname}): {record.getMessage()}'):
-                pass
\ No newline at end of file
+    @staticmethod
+    def _step_result(title: str, created: float) -> TestStepResult:
+        timestamp = int(created * 1000)
+        return TestStepResult(name=title, status=Status.PASSED, start=timestamp, stop=timestamp)
@@ -0,0 +1,228 @@
+import contextlib
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import shutil
+from collections import Counter
+from pathlib import Path
+from typing import Iterator, Optional
+from allure_commons.model2 import ATTACHMENT_PATTERN
+from allure_commons.utils import uuid4
+from utils.allure_logger import LOG_STEP_PATTERN
+
+STATE_FILE = ".allure-merge.json"
+LOCK_FILE = ".allure-merge.lock"
+RESULT_SUFFIXES = ("-result.json", "-container.json")
+ATTACHMENT_MARKER = "-attachment"
+
+def content_hash(path: str | Path) -> str:
+    """
+    Hashes the content of a file in chunks.
+
+    Args:
+        path (str | Path): Path of the file.
+
+    Returns:
+        str: The SHA-256 hex digest of the content.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def is_log_step(step: dict) -> bool:
+    """
+    Checks whether a step of an Allure result was written for a log record.
+
+    Args:
+        step (dict): The step of a result or container JSON.
+
+    Returns:
+        bool: True for a step titled like AllureLogger records, without nested steps
+        or attachments.
+    """
+    return (
+        bool(LOG_STEP_PATTERN.match(step.get("name", "")))
+        and not step.get("steps")
+        and not step.get("attachments")
+    )
+
+
+class AllureMerge:
+    """
+    Merges the Allure results directories of shards into one results directory.
+
+    Shards are read one file at a time. Attachments are merged before results, and
+    an attachment whose content was already merged, from any shard, is not stored
+    again: the results referring to it are rewritten to the stored copy. Stored
+    attachments are hard-linked from the shard when the file system allows it.
+    With compact_logs, every run of two or more steps written by the AllureLogger
+    for log records is replaced by one step with the records as a text attachment.
+
+    The merge is incremental. The size and modification time of every merged file
+    and the content hashes of the stored attachments are kept in a state file in
+    the output directory, so merging a shard again only processes its new or
+    changed files, and a shard arriving late is merged without touching the others.
+    A lock file serializes merges into the same output directory.
+
+    Usage:
+    merge = AllureMerge("allure-merged", compact_logs=True)
+    merge.merge("allure-results-shard-1")
+    merge.merge("allure-results-shard-2")
+
+    Attributes:
+        output (Path): The merged results directory.
+        compact_logs (bool): Whether log record steps are compacted.
+    """
+
+    def __init__(self, output: str | Path, compact_logs: bool = False):
+        """
+        Initializes the AllureMerge.
+
+        Args:
+            output (str | Path): The merged results directory, created if missing.
+            compact_logs (bool): Whether log record steps are compacted. Default is False.
+        """
+        self.output = Path(output)
+        self.compact_logs = compact_logs
+        self.logger = logging.getLogger()
+        self.output.mkdir(parents=True, exist_ok=True)
+
+    def merge(self, shard: str | Path, name: Optional[str] = None) -> Counter:
+        """
+        Merges the new and changed files of a shard.
+
+        Args:
+            shard (str | Path): The results directory of the shard.
+            name (Optional[str]): Key of the shard in the merge state. Defaults to
+                the absolute path of the directory.
+
+        Returns:
+            Counter: Numbers of files merged and unchanged, attachments deduplicated,
+            log steps compacted, and bytes not stored thanks to deduplication.
+        """
+        counts = Counter()
+        with self._lock():
+            state = self._load_state()
+            merged_files = state["shards"].setdefault(name or str(Path(shard).resolve()), {})
+            entries = sorted(
+                (entry for entry in os.scandir(shard) if entry.is_file()),
+                key=lambda entry: ATTACHMENT_MARKER not in entry.name
+            )
+            for entry in entries:
+                stat = entry.stat()
+                signature = [stat.st_size, stat.st_mtime_ns]
+                if merged_files.get(entry.name) == signature:
+                    counts["unchanged"] += 1
+                    continue
+                if ATTACHMENT_MARKER in entry.name:
+                    self._merge_attachment(entry.path, entry.name, stat.st_size, state, counts)
+                elif entry.name.endswith(RESULT_SUFFIXES):
+                    self._merge_result(entry.path, entry.name, state, counts)
+                else:
+                    shutil.copyfile(entry.path, self.output / entry.name)
+                merged_files[entry.name] = signature
+                counts["merged"] += 1
+            self._save_state(state)
+        self.logger.info(f"Merged Allure results of {shard} into {self.output}: {dict(counts)}")
+        return counts
+
+    def _merge_attachment(
+        self, path: str, name: str, size: int, state: dict, counts: Counter
+    ) -> None:
+        digest = content_hash(path)
+        stored = state["attachments"].get(digest)
+        if stored is not None and (self.output / stored).exists():
+            if stored != name:
+                state["aliases"][name] = stored
+                counts["deduplicated"] += 1
+                counts["bytes_saved"] += size
+            return
+        destination = self.output / name
+        temporary = self.output / f"{name}.tmp"
+        temporary.unlink(missing_ok=True)
+        try:
+            os.link(path, temporary)
+        except OSError:
+            shutil.copyfile(path, temporary)
+        os.replace(temporary, destination)
+        state["attachments"][digest] = name
+
+    def _merge_result(self, path: str, name: str, state: dict, counts: Counter) -> None:
+        with open(path) as result_file:
+            result = json.load(result_file)
+        self._rewrite(result, state, counts)
+        temporary = self.output / f"{name}.tmp"
+        temporary.write_text(json.dumps(result))
+        os.replace(temporary, self.output / name)
+
+    def _rewrite(self, node: dict, state: dict, counts: Counter) -> None:
+        for attachment in node.get("attachments", []):
+            attachment["source"] = state["aliases"].get(attachment["source"], attachment["source"])
+        for key in ("befores", "afters", "steps"):
+            for child in node.get(key, []):
+                self._rewrite(child, state, counts)
+        if self.compact_logs and node.get("steps"):
+            node["steps"] = self._compact(node["steps"], state, counts)
+
+    def _compact(self, steps: list[dict], state: dict, counts: Counter) -> list[dict]:
+        compacted = []
+        run = []
+        for step in steps + [None]:
+            if step is not None and is_log_step(step):
+                run.append(step)
+                continue
+            if len(run) > 1:
+                compacted.append(self._log_step(run, state))
+                counts["log_steps_compacted"] += len(run)
+            else:
+                compacted.extend(run)
+            run = []
+            if step is not None:
+                compacted.append(step)
+        return compacted
+
+    def _log_step(self, run: list[dict], state: dict) -> dict:
+        content = "\n".join(step["name"] for step in run).encode()
+        digest = hashlib.sha256(content).hexdigest()
+        source = state["attachments"].get(digest)
+        if source is None or not (self.output / source).exists():
+            source = ATTACHMENT_PATTERN.format(prefix=uuid4(), ext="txt")
+            (self.output / source).write_bytes(content)
+            state["attachments"][digest] = source
+        return {
+            "name": f"log ({len(run)} records)",
+            "status": "passed",
+            "start": run[0].get("start"),
+            "stop": run[-1].get("stop"),
+            "attachments": [{"name": "log", "source": source, "type": "text/plain"}],
+            "steps": [],
+            "parameters": [],
+        }
+
+    def _load_state(self) -> dict:
+        try:
+            state = json.loads((self.output / STATE_FILE).read_text())
+        except (OSError, ValueError):
+            state = {}
+        for key in ("shards", "attachments", "aliases"):
+            state.setdefault(key, {})
+        return state
+
+    def _save_state(self, state: dict) -> None:
+        temporary = self.output / f"{STATE_FILE}.tmp"
+        temporary.write_text(json.dumps(state))
+        os.replace(temporary, self.output / STATE_FILE)
+
+    @contextlib.contextmanager
+    def _lock(self) -> Iterator[None]:
+        with open(self.output / LOCK_FILE, "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
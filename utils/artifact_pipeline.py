@@ -0,0 +1,144 @@
+import hashlib
+import logging
+import os
+import queue
+import shutil
+import threading
+from typing import Optional
+from allure_commons.model2 import ATTACHMENT_PATTERN
+from allure_commons.types import AttachmentType
+from allure_commons.utils import uuid4
+
+ARTIFACT_POLICIES = ("off", "on-failure", "always")
+
+def should_keep(policy: str, failed: bool) -> bool:
+    """
+    Decides whether an artifact recorded under the given policy is kept.
+
+    Args:
+        policy (str): One of "off", "on-failure" or "always".
+        failed (bool): Whether the test failed.
+
+    Returns:
+        bool: True if the artifact should be attached to the report.
+    """
+    return policy == "always" or (policy == "on-failure" and failed)
+
+
+class ArtifactPipeline:
+    """
+    Moves kept test artifacts into the Allure results on a background thread.
+
+    Attaching only registers the attachment with the running test and writes an
+    empty placeholder file, which keeps the test thread free. The worker thread
+    then streams the artifact over the placeholder. Files whose content hash was
+    already published in this session are hard-linked instead of copied, so
+    identical screenshots are stored once.
+
+    Usage:
+    pipeline = ArtifactPipeline(report_dir, reporter)
+    pipeline.attach("/tmp/test/video.webm", "test.webm", allure.attachment_type.WEBM)
+    pipeline.close()
+
+    Attributes:
+        report_dir (Optional[str]): The Allure results directory, None when Allure is off.
+        reporter: The Allure reporter of the running session, None when Allure is off.
+    """
+
+    def __init__(self, report_dir: Optional[str], reporter=None):
+        """
+        Initializes the ArtifactPipeline and starts its worker thread.
+
+        Args:
+            report_dir (Optional[str]): The Allure results directory.
+            reporter: The Allure reporter that holds the running test result.
+        """
+        self.report_dir = report_dir
+        self.reporter = reporter
+        self.logger = logging.getLogger()
+        self._published = {}
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(
+            target=self._run, name="artifact-pipeline", daemon=True
+        )
+        self._worker.start()
+
+    def attach(
+        self,
+        path: str,
+        name: str,
+        attachment_type: Optional[AttachmentType | str] = None,
+        extension: Optional[str] = None
+    ) -> None:
+        """
+        Attaches an artifact to the running test by path.
+
+        Must be called on the test thread while the test result is still open.
+
+        Args:
+            path (str): Path of the artifact file.
+            name (str): Name shown in the report.
+            attachment_type (Optional[AttachmentType | str]): Allure type or MIME type.
+            extension (Optional[str]): File extension when attachment_type is a MIME type.
+        """
+        if self.reporter is None or not os.path.exists(path):
+            self.logger.info(f"Artifact kept at {path}")
+            return
+
+        uuid = uuid4()
+        if isinstance(attachment_type, AttachmentType):
+            extension = attachment_type.extension
+        destination = os.path.join(
+            self.report_dir, ATTACHMENT_PATTERN.format(prefix=uuid, ext=extension or "attach")
+        )
+        self.reporter.attach_data(
+            uuid, b"", name=name, attachment_type=attachment_type, extension=extension
+        )
+        self._queue.put((path, destination))
+
+    def discard(self, paths: list[str]) -> None:
+        """
+        Deletes artifacts that are not kept.
+
+        Args:
+            paths (list[str]): Paths of the artifact files.
+        """
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def close(self) -> None:
+        """
+        Waits until every queued artifact is published and stops the worker thread.
+        """
+        self._queue.put(None)
+        self._worker.join()
+
+    def _run(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            try:
+                self._publish(*job)
+            except Exception as e:
+                self.logger.error(f"Error publishing artifact {job[0]}: {e}")
+
+    def _publish(self, source: str, destination: str) -> None:
+        digest = hashlib.sha256()
+        with open(source, "rb") as artifact:
+            for chunk in iter(lambda: artifact.read(1024 * 1024), b""):
+                digest.update(chunk)
+        content_hash = digest.hexdigest()
+
+        temporary = f"{destination}.tmp"
+        published = self._published.get(content_hash)
+        try:
+            os.link(published, temporary)
+        except (TypeError, OSError):
+            shutil.copyfile(source, temporary)
+            self._published[content_hash] = destination
+        os.replace(temporary, destination)
+        os.remove(source)
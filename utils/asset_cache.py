@@ -0,0 +1,180 @@
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse
+from playwright.sync_api import BrowserContext, Request, Route
+
+ASSET_CACHE_MODES = ("off", "record", "replay", "refresh")
+STATIC_RESOURCE_TYPES = ("stylesheet", "script", "font", "image", "media")
+DROPPED_RESPONSE_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+class AssetCache:
+    """
+    Routing layer that blocks third-party domains and serves static assets from disk.
+
+    Responses are stored content-addressed: an index entry per URL and Accept header
+    points to a blob named after the SHA-256 of the body, so an asset served under
+    several URLs is stored once. Only GET requests for stylesheets, scripts, fonts,
+    images and media are cached; documents and form posts always reach the server.
+    Routing disables the browser's own HTTP cache, which this cache replaces and,
+    unlike the browser cache, keeps across contexts and runs.
+
+    Modes:
+    - off: assets are fetched from the network, domains are still blocked.
+    - record: cached assets are served, missing ones are fetched and stored.
+    - replay: cached assets are served, missing ones are fetched but not stored.
+    - refresh: every asset is fetched again and the cache is overwritten.
+
+    Usage:
+    cache = AssetCache(".pytest_cache/d/assets", "record", ["doubleclick.net"])
+    cache.install(context)
+
+    Attributes:
+        directory (Path): Directory of the cache.
+        mode (str): One of "off", "record", "replay" or "refresh".
+        blocked_domains (list[str]): Domains whose requests are aborted, subdomains included.
+        hits (int): Number of assets served from the cache.
+        misses (int): Number of assets fetched from the network.
+        blocked (int): Number of requests aborted.
+        bytes_served (int): Number of bytes served from the cache.
+    """
+
+    def __init__(self, directory: str | Path, mode: str, blocked_domains: list[str]):
+        """
+        Initializes the AssetCache.
+
+        Args:
+            directory (str | Path): Directory of the cache, created if missing.
+            mode (str): One of "off", "record", "replay" or "refresh".
+            blocked_domains (list[str]): Domains whose requests are aborted.
+
+        Raises:
+            ValueError: If the mode is unknown.
+        """
+        if mode not in ASSET_CACHE_MODES:
+            raise ValueError(
+                f"AssetCache must be one of {', '.join(ASSET_CACHE_MODES)}, got '{mode}'"
+            )
+        self.directory = Path(directory)
+        self.mode = mode
+        self.blocked_domains = [domain.lower() for domain in blocked_domains]
+        self.logger = logging.getLogger()
+        self.hits = 0
+        self.misses = 0
+        self.blocked = 0
+        self.bytes_served = 0
+        (self.directory / "index").mkdir(parents=True, exist_ok=True)
+        (self.directory / "blobs").mkdir(parents=True, exist_ok=True)
+
+    def install(self, context: BrowserContext) -> None:
+        """
+        Routes every request of the context through the cache.
+
+        Args:
+            context (BrowserContext): The Playwright BrowserContext object.
+        """
+        context.route("**/*", self._handle)
+
+    def stats(self) -> dict:
+        """
+        Returns the counters of the cache.
+
+        Returns:
+            dict: The hits, misses, blocked requests and bytes served.
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "blocked": self.blocked,
+            "bytes_served": self.bytes_served,
+        }
+
+    def is_blocked(self, url: str) -> bool:
+        """
+        Checks whether a URL belongs to a blocked domain.
+
+        Args:
+            url (str): The request URL.
+
+        Returns:
+            bool: True if the host is a blocked domain or one of its subdomains.
+        """
+        host = (urlparse(url).hostname or "").lower()
+        return any(host == domain or host.endswith(f".{domain}") for domain in self.blocked_domains)
+
+    def _handle(self, route: Route, request: Request) -> None:
+        if self.is_blocked(request.url):
+            self.blocked += 1
+            route.abort("blockedbyclient")
+            return
+        if (
+            self.mode == "off"
+            or request.method != "GET"
+            or request.resource_type not in STATIC_RESOURCE_TYPES
+        ):
+            route.fallback()
+            return
+
+        index_path = self.directory / "index" / f"{self._key(request)}.json"
+        if self.mode != "refresh":
+            entry = self._load(index_path)
+            if entry is not None:
+                body = (self.directory / "blobs" / entry["blob"]).read_bytes()
+                self.hits += 1
+                self.bytes_served += len(body)
+                route.fulfill(status=entry["status"], headers=entry["headers"], body=body)
+                return
+
+        self.misses += 1
+        if self.mode == "replay":
+            route.fallback()
+            return
+        try:
+            response = route.fetch()
+            body = response.body()
+        except Exception as e:
+            self.logger.warning(f"Could not fetch {request.url}: {e}")
+            route.abort("failed")
+            return
+        headers = {
+            name: value
+            for name, value in response.headers.items()
+            if name.lower() not in DROPPED_RESPONSE_HEADERS
+        }
+        if response.status == 200:
+            self._store(index_path, request.url, response.status, headers, body)
+        route.fulfill(status=response.status, headers=headers, body=body)
+
+    @staticmethod
+    def _key(request: Request) -> str:
+        accept = request.headers.get("accept", "")
+        return hashlib.sha256(f"{request.url}\n{accept}".encode()).hexdigest()
+
+    def _load(self, index_path: Path) -> Optional[dict]:
+        try:
+            entry = json.loads(index_path.read_text())
+        except (OSError, ValueError):
+            return None
+        if not (self.directory / "blobs" / entry["blob"]).exists():
+            return None
+        return entry
+
+    def _store(self, index_path: Path, url: str, status: int, headers: dict, body: bytes) -> None:
+        blob = hashlib.sha256(body).hexdigest()
+        blob_path = self.directory / "blobs" / blob
+        try:
+            if not blob_path.exists():
+                self._write(blob_path, body)
+            entry = {"url": url, "status": status, "headers": headers, "blob": blob}
+            self._write(index_path, json.dumps(entry).encode())
+        except OSError as e:
+            self.logger.warning(f"Could not cache {url}: {e}")
+
+    @staticmethod
+    def _write(path: Path, data: bytes) -> None:
+        temporary = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        temporary.write_bytes(data)
+        os.replace(temporary, path)
@@ -0,0 +1,85 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Optional
+from playwright.async_api import Browser, Page, async_playwright
+
+AsyncFlow = Callable[[Page, int], Awaitable[Any]]
+
+logger = logging.getLogger()
+
+async def _run_flow(
+    browser: Browser,
+    flow: AsyncFlow,
+    index: int,
+    context_args: dict,
+    semaphore: asyncio.Semaphore
+) -> Any:
+    async with semaphore:
+        context = await browser.new_context(**context_args)
+        try:
+            page = await context.new_page()
+            return await flow(page, index)
+        finally:
+            await context.close()
+
+
+async def _run_flows(
+    flow: AsyncFlow,
+    count: int,
+    browser_name: str,
+    launch_args: dict,
+    context_args: dict,
+    concurrency: int
+) -> list:
+    async with async_playwright() as playwright:
+        browser = await getattr(playwright, browser_name).launch(**launch_args)
+        semaphore = asyncio.Semaphore(concurrency)
+        try:
+            return await asyncio.gather(
+                *(_run_flow(browser, flow, index, context_args, semaphore) for index in range(count)),
+                return_exceptions=True
+            )
+        finally:
+            await browser.close()
+
+
+def run_concurrent_flows(
+    flow: AsyncFlow,
+    count: int,
+    browser_name: str = "chromium",
+    launch_args: Optional[dict] = None,
+    context_args: Optional[dict] = None,
+    concurrency: Optional[int] = None
+) -> list:
+    """
+    Runs an async flow as concurrent tasks in one browser, each in its own context.
+
+    The event loop runs on a separate thread, because the sync Playwright API used
+    by the rest of the suite may already own a running loop on the test thread.
+
+    Args:
+        flow (AsyncFlow): Coroutine function called with a fresh page and the flow index.
+        count (int): Number of flows to run.
+        browser_name (str): The browser engine to launch. Default is "chromium".
+        launch_args (Optional[dict]): Keyword arguments for BrowserType.launch.
+        context_args (Optional[dict]): Keyword arguments for Browser.new_context.
+        concurrency (Optional[int]): Maximum number of flows running at once.
+            Defaults to running all of them at once.
+
+    Returns:
+        list: The result of every flow in index order, or the exception it raised.
+    """
+    logger.info(f"Running {count} concurrent flows")
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(
+            asyncio.run,
+            _run_flows(
+                flow,
+                count,
+                browser_name,
+                launch_args or {},
+                context_args or {},
+                concurrency or count
+            )
+        ).result()
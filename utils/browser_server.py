@@ -0,0 +1,360 @@
+import argparse
+import base64
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import re
+import secrets
+import signal
+import socket
+import subprocess
+import time
+from pathlib import Path
+from typing import Iterator, Optional
+from urllib.parse import urlparse
+from playwright.sync_api import Browser, BrowserType
+from playwright.sync_api import Error as PlaywrightError
+from playwright._impl._driver import compute_driver_executable
+
+BROWSER_SERVER_ENV_VARIABLE = "PW_BROWSER_SERVER"
+DEFAULT_DIRECTORY = Path(".pytest_cache", "d", "browser_server")
+STARTUP_TIMEOUT = 30
+CONNECT_TIMEOUT_MS = 10000
+CONNECT_ATTEMPTS = 3
+HEALTH_TIMEOUT = 2
+LOCK_STALE_SECONDS = 60
+
+# Runs in the Node.js of the Playwright driver. Launches the browser server and
+# relaunches the browser on the same port and path if it exits, so the endpoint
+# written to the state file stays valid across browser crashes.
+LAUNCH_SERVER_SCRIPT = """
+const [packagePath, browserName, optionsJson] = process.argv.slice(1);
+const playwright = require(packagePath);
+const options = JSON.parse(optionsJson);
+let server;
+let closing = false;
+
+async function launch() {
+  server = await playwright[browserName].launchServer(options);
+  options.port = Number(new URL(server.wsEndpoint()).port);
+  server.process().once("exit", () => {
+    if (!closing) relaunch();
+  });
+  return server;
+}
+
+async function relaunch() {
+  console.error(`${new Date().toISOString()} browser exited, restarting`);
+  try { await server.close(); } catch (e) {}
+  try { await launch(); } catch (e) { console.error(e); process.exit(1); }
+}
+
+async function shutdown() {
+  closing = true;
+  try { await server.close(); } finally { process.exit(0); }
+}
+
+launch().then(started => {
+  const state = { wsEndpoint: started.wsEndpoint(), pid: process.pid };
+  process.stdout.write(JSON.stringify(state) + "\\n");
+  process.on("SIGTERM", shutdown);
+  process.on("SIGINT", shutdown);
+}).catch(e => { console.error(e); process.exit(1); });
+"""
+
+def camel_case(name: str) -> str:
+    """
+    Converts a Python launch argument name to its Node.js option name.
+
+    Args:
+        name (str): The snake case name, such as executable_path.
+
+    Returns:
+        str: The camel case name, such as executablePath.
+    """
+    return re.sub(r"_([a-z])", lambda match: match.group(1).upper(), name)
+
+
+class BrowserServer:
+    """
+    A long-lived browser server per machine, browser and launch arguments, shared by
+    every worker and every pytest invocation that asks for the same browser.
+
+    The server runs detached from pytest in the Node.js of the Playwright driver and
+    outlives the run, so the next run connects to a warm browser instead of launching
+    one. Its endpoint and process id are kept in a state file; a lock file keeps
+    workers starting together from launching several servers. A server that does not
+    complete a WebSocket handshake on its endpoint within HEALTH_TIMEOUT seconds,
+    because it exited or hangs, is stopped and started again; a failed connection to
+    a server that still answers is retried, since other workers may be using that
+    server.
+
+    Usage:
+    server = BrowserServer(".pytest_cache/d/browser_server", "chromium", {"headless": True})
+    browser = server.connect(playwright.chromium)
+
+    Attributes:
+        directory (Path): Directory of the state, lock and log files.
+        browser_name (str): The browser engine of the server.
+        launch_args (dict): Keyword arguments for BrowserType.launch. slow_mo is
+            applied by each connection instead of the server.
+        name (str): Name of the server's files, derived from the browser and launch arguments.
+    """
+
+    def __init__(self, directory: str | Path, browser_name: str, launch_args: dict):
+        """
+        Initializes the BrowserServer.
+
+        Args:
+            directory (str | Path): Directory of the state, lock and log files, created if missing.
+            browser_name (str): The browser engine of the server.
+            launch_args (dict): Keyword arguments for BrowserType.launch.
+        """
+        self.directory = Path(directory)
+        self.browser_name = browser_name
+        self.launch_args = launch_args
+        self.logger = logging.getLogger()
+        server_args = {key: value for key, value in launch_args.items() if key != "slow_mo"}
+        digest = hashlib.sha256(
+            json.dumps([browser_name, server_args], sort_keys=True, default=str).encode()
+        ).hexdigest()[:12]
+        self.name = f"{browser_name}-{digest}"
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def state_path(self) -> Path:
+        """
+        Path of the state file of the server.
+
+        Returns:
+            Path: The JSON file with the endpoint and process id.
+        """
+        return self.directory / f"{self.name}.json"
+
+    def connect(self, browser_type: BrowserType) -> Browser:
+        """
+        Connects to the server, starting or restarting it when needed.
+
+        Args:
+            browser_type (BrowserType): The Playwright BrowserType of the server's browser.
+
+        Returns:
+            Browser: A connection to the shared browser. Closing it closes the contexts
+            of this connection and leaves the server running.
+
+        Raises:
+            RuntimeError: If the server cannot be started or connected to.
+        """
+        error = None
+        for attempt in range(CONNECT_ATTEMPTS):
+            state = self.ensure_running()
+            try:
+                return browser_type.connect(
+                    state["ws_endpoint"],
+                    timeout=CONNECT_TIMEOUT_MS,
+                    slow_mo=self.launch_args.get("slow_mo") or None
+                )
+            except PlaywrightError as e:
+                error = e
+                self.logger.warning(
+                    f"Connection {attempt + 1} to browser server {self.name} failed: {e}"
+                )
+                self.stop_if_unhealthy(state)
+        raise RuntimeError(f"Could not connect to browser server {self.name}: {error}")
+
+    def ensure_running(self) -> dict:
+        """
+        Returns the state of the running server, starting it if it is not healthy.
+
+        Returns:
+            dict: The endpoint, process id and start time of the server.
+        """
+        with self._lock():
+            state = self.read_state()
+            if state is not None and self.is_healthy(state):
+                return state
+            if state is not None:
+                self.logger.warning(f"Browser server {self.name} is not answering; restarting it")
+                self._terminate(state)
+            return self._start()
+
+    def read_state(self) -> Optional[dict]:
+        """
+        Reads the state file of the server.
+
+        Returns:
+            Optional[dict]: The state, None if no server was started.
+        """
+        try:
+            return json.loads(self.state_path.read_text())
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def is_healthy(state: dict, timeout: float = HEALTH_TIMEOUT) -> bool:
+        """
+        Checks whether the server answers a WebSocket handshake on its endpoint.
+
+        A server that still has its port open but whose event loop hangs accepts the
+        TCP connection and never answers, so the handshake is what is checked. The
+        connection is closed as soon as the response status line arrives.
+
+        Args:
+            state (dict): The state of the server.
+            timeout (float): Seconds to wait for each step of the handshake. Default
+                is HEALTH_TIMEOUT.
+
+        Returns:
+            bool: True if the endpoint switched protocols in time.
+        """
+        endpoint = urlparse(state["ws_endpoint"])
+        request = (
+            f"GET {endpoint.path or '/'} HTTP/1.1\r\n"
+            f"Host: {endpoint.netloc}\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Key: {base64.b64encode(secrets.token_bytes(16)).decode()}\r\n"
+            "Sec-WebSocket-Version: 13\r\n\r\n"
+        )
+        response = b""
+        try:
+            with socket.create_connection(
+                (endpoint.hostname, endpoint.port), timeout=timeout
+            ) as connection:
+                connection.sendall(request.encode())
+                while b"\r\n" not in response:
+                    chunk = connection.recv(1024)
+                    if not chunk:
+                        return False
+                    response += chunk
+        except OSError:
+            return False
+        status_line = response.split(b"\r\n", 1)[0].split()
+        return len(status_line) > 1 and status_line[1] == b"101"
+
+    def stop_if_unhealthy(self, state: dict) -> bool:
+        """
+        Stops the server if it is still the one of a state and it is not healthy.
+
+        The check is made under the lock, so a server that another worker has already
+        restarted, or that still serves the other workers, is left running.
+
+        Args:
+            state (dict): The state of the server a connection failed to.
+
+        Returns:
+            bool: True if the server was stopped.
+        """
+        with self._lock():
+            current = self.read_state()
+            if current is None or current["pid"] != state["pid"] or self.is_healthy(current):
+                return False
+            self.logger.warning(f"Browser server {self.name} is not answering; stopping it")
+            self._terminate(current)
+            return True
+
+    def stop(self) -> None:
+        """
+        Stops the server and removes its state file.
+        """
+        with self._lock():
+            state = self.read_state()
+            if state is not None:
+                self._terminate(state)
+
+    def _start(self) -> dict:
+        node, cli = compute_driver_executable()
+        options = {
+            camel_case(key): value for key, value in self.launch_args.items() if key != "slow_mo"
+        }
+        options["wsPath"] = f"/{secrets.token_hex(16)}"
+        log_path = self.directory / f"{self.name}.log"
+        output_path = self.directory / f"{self.name}.out"
+        started = time.time()
+        with open(log_path, "a") as log_file, open(output_path, "w") as output_file:
+            command = [
+                node, "-e", LAUNCH_SERVER_SCRIPT, str(Path(cli).parent), self.browser_name,
+                json.dumps(options, default=str)
+            ]
+            process = subprocess.Popen(
+                command,
+                stdin=subprocess.DEVNULL,
+                stdout=output_file,
+                stderr=log_file,
+                start_new_session=True
+            )
+
+        while time.time() - started < STARTUP_TIMEOUT:
+            # The server writes one JSON line; until its newline arrives the line may
+            # be partly written.
+            output = output_path.read_text()
+            if output.endswith("\n"):
+                server = json.loads(output)
+                state = {
+                    "ws_endpoint": server["wsEndpoint"],
+                    "pid": server["pid"],
+                    "browser": self.browser_name,
+                    "started": round(started),
+                }
+                self.state_path.write_text(json.dumps(state))
+                self.logger.info(
+                    f"Started browser server {self.name} in {time.time() - started:.1f}s"
+                )
+                return state
+            if process.poll() is not None:
+                break
+            time.sleep(0.05)
+        process.kill()
+        raise RuntimeError(f"Browser server {self.name} did not start; see {log_path}")
+
+    def _terminate(self, state: dict) -> None:
+        with contextlib.suppress(OSError):
+            os.kill(state["pid"], signal.SIGTERM)
+        self.state_path.unlink(missing_ok=True)
+
+    @contextlib.contextmanager
+    def _lock(self) -> Iterator[None]:
+        lock_path = self.directory / f"{self.name}.lock"
+        while True:
+            try:
+                descriptor = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                with contextlib.suppress(OSError):
+                    if time.time() - lock_path.stat().st_mtime > LOCK_STALE_SECONDS:
+                        lock_path.unlink()
+                time.sleep(0.05)
+        try:
+            yield
+        finally:
+            os.close(descriptor)
+            lock_path.unlink(missing_ok=True)
+
+
+def main() -> None:
+    """
+    Lists or stops the browser servers kept alive between runs.
+    """
+    parser = argparse.ArgumentParser(description="Manage the shared browser servers.")
+    parser.add_argument("command", choices=("status", "stop"))
+    parser.add_argument("--directory", type=Path, default=DEFAULT_DIRECTORY)
+    args = parser.parse_args()
+
+    for state_path in sorted(args.directory.glob("*.json")):
+        state = json.loads(state_path.read_text())
+        healthy = BrowserServer.is_healthy(state)
+        if args.command == "stop":
+            with contextlib.suppress(OSError):
+                os.kill(state["pid"], signal.SIGTERM)
+            state_path.unlink(missing_ok=True)
+            print(f"{state_path.stem}: stopped")
+        else:
+            uptime = (time.time() - state["started"]) / 60
+            status = "healthy" if healthy else "not answering"
+            print(f"{state_path.stem}: {status}, pid {state['pid']}, up {uptime:.0f} min")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+import logging
+import os
+from typing import Callable, Optional
+from playwright.sync_api import Browser, BrowserContext, CDPSession
+from playwright.sync_api import Error as PlaywrightError
+from utils.context_pool import ContextPool
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def process_rss_mb(pid: int) -> Optional[float]:
+    """
+    Reads the resident set size of a process from /proc.
+
+    Args:
+        pid (int): The process id.
+
+    Returns:
+        Optional[float]: The RSS in MiB, None if the process is gone or /proc is not
+        available.
+    """
+    try:
+        with open(f"/proc/{pid}/statm") as statm:
+            return int(statm.read().split()[1]) * PAGE_SIZE / 2 ** 20
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+class RecyclableBrowser:
+    """
+    Holds the browser of a worker so it can be closed and relaunched between tests.
+
+    Attribute access is forwarded to the current browser, which is launched on
+    first use, so the holder stands in for a Browser wherever one is expected.
+    Holders of contexts of the browser register a callback with on_recycle to close
+    them before the browser is closed; they create new contexts on the relaunched
+    browser afterwards.
+
+    Usage:
+    browser = RecyclableBrowser(launch_browser)
+    context = browser.new_context()
+    browser.on_recycle(pool.close)
+    browser.recycle()
+    browser.close()
+
+    Attributes:
+        launch (Callable[[], Browser]): Launches or connects a new browser.
+        launches (int): Number of browsers launched so far.
+    """
+
+    def __init__(self, launch: Callable[[], Browser]):
+        """
+        Initializes the RecyclableBrowser.
+
+        Args:
+            launch (Callable[[], Browser]): Launches or connects a new browser.
+        """
+        self.launch = launch
+        self.launches = 0
+        self.logger = logging.getLogger()
+        self._browser: Optional[Browser] = None
+        self._recycle_callbacks = []
+
+    @property
+    def current(self) -> Optional[Browser]:
+        """
+        The current browser, without launching one.
+
+        Returns:
+            Optional[Browser]: The browser, None if none is launched.
+        """
+        return self._browser
+
+    @property
+    def browser(self) -> Browser:
+        """
+        The current browser, launched if needed.
+
+        Returns:
+            Browser: The browser.
+        """
+        if self._browser is None:
+            self._browser = self.launch()
+            self.launches += 1
+        return self._browser
+
+    def __getattr__(self, name: str):
+        if name.startswith("_") or name == "browser":
+            raise AttributeError(name)
+        return getattr(self.browser, name)
+
+    def on_recycle(self, callback: Callable[[], None]) -> None:
+        """
+        Registers a callback run before the browser is closed to be relaunched.
+
+        Args:
+            callback (Callable[[], None]): Closes the contexts held by the caller.
+        """
+        self._recycle_callbacks.append(callback)
+
+    def recycle(self) -> None:
+        """
+        Runs the recycle callbacks and closes the browser. The next use launches a
+        new one.
+        """
+        for callback in self._recycle_callbacks:
+            try:
+                callback()
+            except Exception as e:
+                self.logger.error(f"Error before recycling the browser: {e}")
+        self.close()
+
+    def close(self) -> None:
+        """
+        Closes the current browser, if any.
+        """
+        browser, self._browser = self._browser, None
+        if browser is None:
+            return
+        try:
+            browser.close()
+        except Exception as e:
+            self.logger.error(f"Error closing the browser: {e}")
+
+
+class BrowserWatchdog:
+    """
+    Samples the resources of a worker's browser after every test and decides when
+    to recycle it.
+
+    Open contexts, pages and pages recording a video are counted through the
+    Browser object. On Chromium the processes of the browser are listed through the
+    CDP SystemInfo domain and their RSS is read from /proc, split into the browser
+    process, the renderers and the other helper processes; elsewhere memory is not
+    sampled. A context still open after the teardown of a test is a leak suspect
+    unless it is idle in the context pool or held by a session fixture, and so is
+    any page open in it. A suspect is attributed to the test whose teardown left it
+    open, and reported once. The browser is recycled after recycle_after_tests
+    tests, when its processes use more than max_rss_mb, or when max_leaks leak
+    suspects are open; 0 disables a threshold.
+
+    Usage:
+    watchdog.context_pool = pool
+    watchdog.expect(session_context)
+    reason = watchdog.check(browser, item.nodeid)
+    if reason:
+        ...  # close and relaunch the browser
+        watchdog.recycled(item.nodeid, reason)
+
+    Attributes:
+        recycle_after_tests (int): Number of tests after which the browser is recycled.
+        max_rss_mb (float): RSS of all browser processes, in MiB, above which the
+            browser is recycled.
+        max_leaks (int): Number of open leak suspects at which the browser is recycled.
+        context_pool (Optional[ContextPool]): The context pool of the browser, whose
+            idle contexts are expected to stay open.
+        expected_contexts (set[BrowserContext]): Contexts held by session fixtures.
+        tests (int): Number of tests sampled since the browser was launched.
+        peak (dict): Highest value of each sampled resource in the session.
+        recycles (list[dict]): The test after which the browser was recycled, and why.
+        leak_suspects (list[dict]): The kind and URL of each leak suspect, and the
+            test it is attributed to.
+    """
+
+    def __init__(self, recycle_after_tests: int = 0, max_rss_mb: float = 0, max_leaks: int = 0):
+        """
+        Initializes the BrowserWatchdog.
+
+        Args:
+            recycle_after_tests (int): Number of tests after which the browser is
+                recycled, 0 for no limit.
+            max_rss_mb (float): RSS in MiB above which the browser is recycled, 0 for no limit.
+            max_leaks (int): Number of open leak suspects at which the browser is
+                recycled, 0 for no limit.
+        """
+        self.recycle_after_tests = recycle_after_tests
+        self.max_rss_mb = max_rss_mb
+        self.max_leaks = max_leaks
+        self.logger = logging.getLogger()
+        self.context_pool: Optional[ContextPool] = None
+        self.expected_contexts = set()
+        self.tests = 0
+        self.peak = {}
+        self.recycles = []
+        self.leak_suspects = []
+        self._browser: Optional[Browser] = None
+        self._cdp_session: Optional[CDPSession] = None
+        self._suspects = set()
+
+    def expect(self, context: BrowserContext) -> None:
+        """
+        Marks a context held by a session fixture as expected to stay open.
+
+        Args:
+            context (BrowserContext): The context.
+        """
+        self.expected_contexts.add(context)
+
+    def sample(self, browser: Browser) -> dict:
+        """
+        Samples the resources of a browser.
+
+        Args:
+            browser (Browser): The browser.
+
+        Returns:
+            dict: The number of open contexts, pages and pages recording a video, and
+            the RSS in MiB of the browser process, the renderers and the other
+            processes when memory can be sampled.
+        """
+        pages = [page for context in browser.contexts for page in context.pages]
+        sample = {
+            "contexts": len(browser.contexts),
+            "pages": len(pages),
+            "video_pages": sum(1 for page in pages if page.video is not None),
+        }
+        sample.update(self._process_rss(browser))
+        return sample
+
+    def check(self, browser: Browser, nodeid: str) -> Optional[str]:
+        """
+        Samples the browser after the teardown of a test and looks for leaks.
+
+        Args:
+            browser (Browser): The browser.
+            nodeid (str): The node id of the test that just finished.
+
+        Returns:
+            Optional[str]: Why the browser should be recycled, None to keep it.
+        """
+        if browser is not self._browser:
+            self._attach(browser)
+        self.tests += 1
+        sample = self.sample(browser)
+        for key, value in sample.items():
+            self.peak[key] = max(self.peak.get(key, value), value)
+
+        expected = set(self.expected_contexts)
+        if self.context_pool is not None:
+            expected.update(self.context_pool.idle_contexts)
+        open_suspects = 0
+        for context in browser.contexts:
+            if context in expected:
+                continue
+            open_suspects += 1 + len(context.pages)
+            self._report(context, "context", None, nodeid)
+            for page in context.pages:
+                self._report(page, "page", page.url, nodeid)
+        self.logger.debug(f"Browser resources after {nodeid}: {sample}")
+
+        rss_mb = sum(value for key, value in sample.items() if key.endswith("_rss_mb"))
+        if self.recycle_after_tests and self.tests >= self.recycle_after_tests:
+            return f"{self.tests} tests since launch"
+        if self.max_rss_mb and rss_mb > self.max_rss_mb:
+            return f"browser processes use {rss_mb:.0f} MiB, limit is {self.max_rss_mb:g} MiB"
+        if self.max_leaks and open_suspects >= self.max_leaks:
+            return f"{open_suspects} leaked contexts and pages are open"
+        return None
+
+    def recycled(self, nodeid: str, reason: str) -> None:
+        """
+        Records that the browser was closed to be relaunched.
+
+        Args:
+            nodeid (str): The node id of the test after which it was recycled.
+            reason (str): Why it was recycled.
+        """
+        self.recycles.append({"test": nodeid, "reason": reason, "tests": self.tests})
+        self._browser = None
+        self._cdp_session = None
+        self.expected_contexts = set()
+        self._suspects = set()
+        self.tests = 0
+
+    def to_dict(self) -> dict:
+        """
+        Returns the peaks, recycles and leak suspects of the session.
+
+        Returns:
+            dict: The watchdog report.
+        """
+        return {
+            "peak": {key: round(value, 1) for key, value in self.peak.items()},
+            "recycles": self.recycles,
+            "leak_suspects": self.leak_suspects,
+        }
+
+    def _attach(self, browser: Browser) -> None:
+        self._browser = browser
+        self._suspects = set()
+        self.tests = 0
+        try:
+            self._cdp_session = browser.new_browser_cdp_session()
+        except PlaywrightError:
+            self._cdp_session = None
+
+    def _report(self, resource, kind: str, url: Optional[str], nodeid: str) -> None:
+        if resource in self._suspects:
+            return
+        self._suspects.add(resource)
+        self.leak_suspects.append({"test": nodeid, "kind": kind, "url": url})
+        self.logger.warning(
+            f"Leak suspect: {kind}{f' at {url}' if url else ''} still open after {nodeid}"
+        )
+
+    def _process_rss(self, browser: Browser) -> dict:
+        if self._cdp_session is None:
+            return {}
+        try:
+            processes = self._cdp_session.send("SystemInfo.getProcessInfo")["processInfo"]
+        except PlaywrightError as e:
+            self.logger.debug(f"Could not list the browser processes: {e}")
+            return {}
+        rss = {"browser_rss_mb": 0.0, "renderer_rss_mb": 0.0, "other_rss_mb": 0.0}
+        for process in processes:
+            process_rss = process_rss_mb(process["id"])
+            if process_rss is None:
+                continue
+            if process["type"] in ("browser", "renderer"):
+                rss[f"{process['type']}_rss_mb"] += process_rss
+            else:
+                rss["other_rss_mb"] += process_rss
+        if not any(rss.values()):
+            return {}
+        rss["renderers"] = sum(1 for process in processes if process["type"] == "renderer")
+        return rss
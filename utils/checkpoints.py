@@ -0,0 +1,213 @@
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Callable
+import allure
+from playwright.sync_api import Page
+from slugify import slugify
+
+RESTORE_LOCAL_STORAGE_SCRIPT = """items => {
+    localStorage.clear();
+    for (const { name, value } of items) localStorage.setItem(name, value);
+}"""
+RESUMED_TAG = "resumed"
+
+class CheckpointStore:
+    """
+    On-disk store of the checkpoints of each test, one JSON file per test node id.
+
+    Attributes:
+        directory (Path): Directory of the checkpoint files.
+    """
+
+    def __init__(self, directory: str | Path):
+        """
+        Initializes the CheckpointStore.
+
+        Args:
+            directory (str | Path): Directory of the checkpoint files, created if missing.
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def path(self, nodeid: str) -> Path:
+        """
+        Returns the checkpoint file of a test.
+
+        Args:
+            nodeid (str): The test node id.
+
+        Returns:
+            Path: The JSON file of the test's checkpoints.
+        """
+        return self.directory / f"{slugify(nodeid)}.json"
+
+    def load(self, nodeid: str) -> list[dict]:
+        """
+        Loads the checkpoints of a test.
+
+        Args:
+            nodeid (str): The test node id.
+
+        Returns:
+            list[dict]: The checkpoints in the order they were taken, empty if none.
+        """
+        try:
+            return json.loads(self.path(nodeid).read_text())
+        except (OSError, ValueError):
+            return []
+
+    def save(self, nodeid: str, checkpoints: list[dict]) -> None:
+        """
+        Saves the checkpoints of a test.
+
+        Args:
+            nodeid (str): The test node id.
+            checkpoints (list[dict]): The checkpoints in the order they were taken.
+        """
+        self.path(nodeid).write_text(json.dumps(checkpoints))
+
+    def clear(self, nodeid: str) -> None:
+        """
+        Deletes the checkpoints of a test.
+
+        Args:
+            nodeid (str): The test node id.
+        """
+        self.path(nodeid).unlink(missing_ok=True)
+
+
+class FlowCheckpoints:
+    """
+    Runs the steps of a multi-step flow as Allure steps and checkpoints each one.
+
+    After every step that completes, the storage state and URL of the page are saved
+    along with the flow's data, unless the attempt will not be retried. When the
+    test is retried, the steps that completed in the failed attempt are not run
+    again: they appear in the report as resumed, and before the first step that did
+    not complete, the page gets back the cookies, local storage and URL of the last
+    checkpoint. Values kept with remember, such as the
+    username, come back from the checkpoint too, so a retry continues with the user
+    the first attempt registered.
+
+    Usage:
+    user = checkpoints.remember("user", user)
+
+    def register():
+        register_page.register(user, password)
+
+    checkpoints.run("Register a new user", register)
+
+    Attributes:
+        page (Page): The page whose state is checkpointed.
+        attempt (int): Number of the attempt, 0 for the first run of the test.
+        save (bool): Whether the completed steps are checkpointed.
+        data (dict): Values kept with remember.
+        resumed (list[str]): Titles of the steps resumed from a checkpoint in this attempt.
+    """
+
+    def __init__(
+        self,
+        page: Page,
+        store: CheckpointStore,
+        nodeid: str,
+        attempt: int = 0,
+        save: bool = True
+    ):
+        """
+        Initializes the FlowCheckpoints of a test attempt.
+
+        The first attempt discards the checkpoints left by an earlier run.
+
+        Args:
+            page (Page): The page whose state is checkpointed.
+            store (CheckpointStore): Store of the checkpoints.
+            nodeid (str): The test node id.
+            attempt (int): Number of the attempt, 0 for the first run of the test.
+            save (bool): Whether the completed steps are checkpointed. False for the
+                last attempt of a test, which no retry can resume.
+        """
+        self.page = page
+        self.store = store
+        self.nodeid = nodeid
+        self.attempt = attempt
+        self.save = save
+        self.logger = logging.getLogger()
+        if attempt == 0:
+            store.clear(nodeid)
+        self._saved = store.load(nodeid)
+        self._taken = []
+        self.data = dict(self._saved[-1]["data"]) if self._saved else {}
+        self.resumed = []
+
+    def remember(self, key: str, value: Any) -> Any:
+        """
+        Keeps a value with the checkpoints, or returns the one kept by an earlier attempt.
+
+        Args:
+            key (str): Name of the value.
+            value (Any): The value for a flow without checkpoints. Must be JSON-serializable.
+
+        Returns:
+            Any: The value kept by an earlier attempt, else the given value.
+        """
+        return self.data.setdefault(key, value)
+
+    def run(self, title: str, function: Callable[[], None]) -> None:
+        """
+        Runs a step of the flow as a checkpointed Allure step.
+
+        A step that an earlier attempt completed is not run again but recorded as
+        resumed.
+
+        Args:
+            title (str): Title of the step, unique within the flow.
+            function (Callable[[], None]): The step.
+        """
+        index = len(self._taken)
+        if (
+            index == len(self.resumed)
+            and index < len(self._saved)
+            and self._saved[index]["step"] == title
+        ):
+            self._taken.append(self._saved[index])
+            self.resumed.append(title)
+            allure.dynamic.tag(RESUMED_TAG)
+            with allure.step(f"{title} (resumed from checkpoint)"):
+                self.logger.info(f"Resumed step '{title}' from attempt {self.attempt - 1}")
+            return
+
+        if self._taken and index == len(self.resumed):
+            self._restore(self._taken[-1])
+        with allure.step(title):
+            function()
+        self._checkpoint(title)
+
+    def _checkpoint(self, title: str) -> None:
+        if not self.save:
+            self._taken.append({"step": title})
+            return
+        checkpoint = {
+            "step": title,
+            "url": self.page.url,
+            "storage_state": self.page.context.storage_state(),
+            "data": dict(self.data),
+            "taken": round(time.time(), 3),
+        }
+        self._taken.append(checkpoint)
+        self.store.save(self.nodeid, self._taken)
+
+    def _restore(self, checkpoint: dict) -> None:
+        self.logger.info(f"Restoring checkpoint of step '{checkpoint['step']}'")
+        state = checkpoint["storage_state"]
+        context = self.page.context
+        context.clear_cookies()
+        if state.get("cookies"):
+            context.add_cookies(state["cookies"])
+        for origin in state.get("origins", []):
+            self.page.goto(origin["origin"])
+            self.page.evaluate(RESTORE_LOCAL_STORAGE_SCRIPT, origin.get("localStorage", []))
+        if checkpoint["url"] and checkpoint["url"] != "about:blank":
+            self.page.goto(checkpoint["url"])
+
@@ -0,0 +1,239 @@
+import json
+import logging
+from typing import Callable, Optional
+from playwright.sync_api import Browser, BrowserContext
+
+CLEAR_STORAGE_SCRIPT = """
+() => {
+    try {
+        window.localStorage.clear();
+        window.sessionStorage.clear();
+    } catch (e) {}
+}
+"""
+
+
+class PooledContext:
+    """
+    A browser context owned by a ContextPool.
+
+    Attributes:
+        context (BrowserContext): The Playwright BrowserContext object.
+        key (str): Key of the arguments the context was created with.
+        context_args (dict): The arguments the context was created with.
+        uses (int): Number of tests that ran in the context.
+    """
+
+    def __init__(self, context: BrowserContext, key: str, context_args: dict):
+        """
+        Initializes the PooledContext.
+
+        Args:
+            context (BrowserContext): The Playwright BrowserContext object.
+            key (str): Key of the arguments the context was created with.
+            context_args (dict): The arguments the context was created with.
+        """
+        self.context = context
+        self.key = key
+        self.context_args = context_args
+        self.uses = 0
+
+
+class ContextPool:
+    """
+    Keeps warm browser contexts of one browser and hands them out one test at a time.
+
+    A context is only reused by tests asking for the same context arguments. Between
+    tests its pages are closed and its cookies, local and session storage,
+    permissions and routes are reset; the cookies of the storage state it was created
+    with are restored. Local storage from a storage state cannot be restored, so
+    such contexts are never reused. A context is closed instead of reused after
+    max_uses tests, when the reset fails, or when it leaks pages or local storage
+    the reset could not clear.
+
+    Usage:
+    pool = ContextPool(browser, size=2, max_uses=50)
+    context = pool.acquire({"base_url": "https://example.com"})
+    pool.release(context)
+    pool.close()
+
+    Attributes:
+        browser (Browser): The browser the contexts belong to.
+        size (int): Maximum number of contexts kept open.
+        max_uses (int): Number of tests after which a context is recycled.
+        initializer (Optional[Callable[[BrowserContext], None]]): Called on every new
+            context and after every reset, to install routes and other context setup.
+        created (int): Number of contexts created.
+        reused (int): Number of times an idle context was handed out again.
+        recycled (int): Number of contexts closed before the end of the session.
+    """
+
+    def __init__(
+        self,
+        browser: Browser,
+        size: int = 2,
+        max_uses: int = 50,
+        initializer: Optional[Callable[[BrowserContext], None]] = None
+    ):
+        """
+        Initializes the ContextPool.
+
+        Args:
+            browser (Browser): The browser the contexts belong to.
+            size (int): Maximum number of contexts kept open. Default is 2.
+            max_uses (int): Number of tests after which a context is recycled. Default is 50.
+            initializer (Optional[Callable[[BrowserContext], None]]): Context setup
+                applied to new and reset contexts.
+        """
+        self.browser = browser
+        self.size = size
+        self.max_uses = max_uses
+        self.initializer = initializer
+        self.logger = logging.getLogger()
+        self.created = 0
+        self.reused = 0
+        self.recycled = 0
+        self._idle = []
+        self._busy = {}
+
+    def acquire(self, context_args: dict) -> BrowserContext:
+        """
+        Hands out an idle context created with the same arguments, or a new one.
+
+        Args:
+            context_args (dict): Keyword arguments for Browser.new_context.
+
+        Returns:
+            BrowserContext: A context that is not used by any other test.
+        """
+        key = json.dumps(context_args, sort_keys=True, default=str)
+        for entry in self._idle:
+            if entry.key == key:
+                self._idle.remove(entry)
+                self.reused += 1
+                return self._hand_out(entry)
+
+        if self._idle and len(self._idle) + len(self._busy) >= self.size:
+            self._close(self._idle.pop(0))
+        context = self.browser.new_context(**context_args)
+        self.created += 1
+        if self.initializer:
+            self.initializer(context)
+        return self._hand_out(PooledContext(context, key, context_args))
+
+    def release(self, context: BrowserContext) -> None:
+        """
+        Resets a context after a test and keeps it for the next one, or recycles it.
+
+        Args:
+            context (BrowserContext): A context handed out by acquire.
+        """
+        entry = self._busy.pop(context)
+        if entry.uses >= self.max_uses:
+            self.logger.info(f"Recycling browser context after {entry.uses} uses")
+            self._recycle(entry)
+            return
+        if len(self._idle) + len(self._busy) >= self.size:
+            self._recycle(entry)
+            return
+
+        try:
+            clean = self._reset(entry)
+        except Exception as e:
+            self.logger.warning(f"Recycling browser context that failed to reset: {e}")
+            clean = False
+        if not clean:
+            self._recycle(entry)
+            return
+        self._idle.append(entry)
+
+    @property
+    def idle_contexts(self) -> list[BrowserContext]:
+        """
+        The contexts waiting in the pool for the next test.
+
+        Returns:
+            list[BrowserContext]: The idle contexts, oldest first.
+        """
+        return [entry.context for entry in self._idle]
+
+    def shrink(self, count: int) -> int:
+        """
+        Closes idle contexts, oldest first, to make room for other contexts.
+
+        Args:
+            count (int): Number of idle contexts to close.
+
+        Returns:
+            int: Number of contexts closed.
+        """
+        closed = 0
+        while self._idle and closed < count:
+            self._recycle(self._idle.pop(0))
+            closed += 1
+        return closed
+
+    def close(self) -> None:
+        """
+        Closes every context of the pool.
+        """
+        for entry in self._idle + list(self._busy.values()):
+            self._close(entry)
+        self._idle = []
+        self._busy = {}
+        self.logger.info(
+            f"Context pool created {self.created} contexts, reused {self.reused} times, "
+            f"recycled {self.recycled}"
+        )
+
+    def _hand_out(self, entry: PooledContext) -> BrowserContext:
+        entry.uses += 1
+        self._busy[entry.context] = entry
+        return entry.context
+
+    def _reset(self, entry: PooledContext) -> bool:
+        context = entry.context
+        for page in context.pages:
+            try:
+                page.evaluate(CLEAR_STORAGE_SCRIPT)
+            except Exception:
+                pass
+            page.close()
+        if context.pages:
+            self.logger.warning("Recycling browser context that leaked pages")
+            return False
+        if any(origin.get("localStorage") for origin in context.storage_state()["origins"]):
+            self.logger.warning("Recycling browser context that leaked local storage")
+            return False
+
+        storage_state = self._load_storage_state(entry.context_args.get("storage_state"))
+        if storage_state.get("origins"):
+            return False
+
+        context.clear_cookies()
+        context.clear_permissions()
+        context.unroute_all(behavior="ignoreErrors")
+        if storage_state.get("cookies"):
+            context.add_cookies(storage_state["cookies"])
+        if self.initializer:
+            self.initializer(context)
+        return True
+
+    @staticmethod
+    def _load_storage_state(storage_state) -> dict:
+        if not storage_state:
+            return {}
+        if isinstance(storage_state, dict):
+            return storage_state
+        with open(storage_state) as state_file:
+            return json.load(state_file)
+
+    def _recycle(self, entry: PooledContext) -> None:
+        self.recycled += 1
+        self._close(entry)
+
+    def _close(self, entry: PooledContext) -> None:
+        try:
+            entry.context.close()
+        except Exception as e:
+            self.logger.error(f"Error closing browser context: {e}")
@@ -0,0 +1,218 @@
+import csv
+import functools
+import json
+import random
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+FIRST_NAMES = ("Ada", "Alan", "Grace", "Linus", "Margaret", "Dennis", "Barbara", "Ken")
+LAST_NAMES = ("Lovelace", "Turing", "Hopper", "Torvalds", "Hamilton", "Ritchie", "Liskov")
+TOPICS = ("order", "account", "invoice", "delivery", "password", "subscription", "refund")
+REQUESTS = (
+    "Please get back to me about my {topic}.",
+    "I have a question about the {topic} I opened last week.",
+    "Could you check the status of my {topic}? Reference {reference}.",
+    "There seems to be a problem with my {topic}.",
+)
+
+
+def contact_message(rng: random.Random, index: int) -> dict:
+    """
+    Generates a contact message case.
+
+    Args:
+        rng (random.Random): Random generator seeded for this case.
+        index (int): Index of the case in the dataset.
+
+    Returns:
+        dict: The id, name, email and message of the case.
+    """
+    first_name = rng.choice(FIRST_NAMES)
+    last_name = rng.choice(LAST_NAMES)
+    message = rng.choice(REQUESTS).format(
+        topic=rng.choice(TOPICS), reference=rng.randrange(10 ** 5, 10 ** 6)
+    )
+    return {
+        "id": str(index),
+        "name": f"{first_name} {last_name}",
+        "email": f"{first_name}.{last_name}{index}@example.com".lower(),
+        "message": message,
+    }
+
+
+GENERATORS: dict[str, Callable[[random.Random, int], dict]] = {
+    "contact_messages": contact_message,
+}
+
+
+class DataSource(ABC):
+    """
+    A dataset read in shards, so no process ever holds more than one case of it.
+
+    A data-driven test is collected once per shard, not once per case, so collection
+    does not depend on the size of the dataset, and pytest-xdist spreads the shards
+    over the workers like any other tests.
+    """
+
+    @abstractmethod
+    def shard(self, index: int, count: int) -> Iterator[dict]:
+        """
+        Streams the cases of one shard of the dataset.
+
+        Args:
+            index (int): Index of the shard, from 0 to count - 1.
+            count (int): Number of shards the dataset is split into.
+
+        Returns:
+            Iterator[dict]: The cases of the shard.
+        """
+
+
+class GeneratedSource(DataSource):
+    """
+    Cases produced by a generator function, each from its own seeded random generator.
+
+    The case at an index only depends on the seed and the index, so every shard
+    generates its own range of indices without generating the cases before it.
+
+    Attributes:
+        generator (Callable[[random.Random, int], dict]): Function generating a case.
+        count (int): Number of cases in the dataset.
+        seed (int): Seed of the dataset.
+    """
+
+    def __init__(self, generator: Callable[[random.Random, int], dict], count: int, seed: int = 0):
+        """
+        Initializes the GeneratedSource.
+
+        Args:
+            generator (Callable[[random.Random, int], dict]): Function generating a case.
+            count (int): Number of cases in the dataset.
+            seed (int): Seed of the dataset. Default is 0.
+        """
+        self.generator = generator
+        self.count = count
+        self.seed = seed
+
+    def shard(self, index: int, count: int) -> Iterator[dict]:
+        for case in range(self.count * index // count, self.count * (index + 1) // count):
+            yield self.generator(random.Random(f"{self.seed}:{case}"), case)
+
+
+class FileSource(DataSource):
+    """
+    Cases read from a file with one case per line, split into shards by byte range.
+
+    A shard starts at the first line beginning in its byte range and ends with the
+    last line beginning in it, so the shards cover every line exactly once and only
+    the size of the file is needed to split it.
+
+    Attributes:
+        path (Path): Path of the file.
+    """
+
+    def __init__(self, path: str | Path):
+        """
+        Initializes the FileSource.
+
+        Args:
+            path (str | Path): Path of the file.
+        """
+        self.path = Path(path)
+
+    def shard(self, index: int, count: int) -> Iterator[dict]:
+        size = self.path.stat().st_size
+        start, end = size * index // count, size * (index + 1) // count
+        with open(self.path, "rb") as file:
+            header = file.readline()
+            if start > len(header):
+                file.seek(start - 1)
+                file.readline()
+            while file.tell() < end:
+                line = file.readline()
+                if not line:
+                    break
+                if line.strip():
+                    yield self.parse(line.decode("utf-8"), header.decode("utf-8"))
+
+    @abstractmethod
+    def parse(self, line: str, header: str) -> dict:
+        """
+        Parses one line of the file into a case.
+
+        Args:
+            line (str): The line.
+            header (str): The first line of the file.
+
+        Returns:
+            dict: The case.
+        """
+
+
+class CsvSource(FileSource):
+    """
+    Cases read from a CSV file whose first row names the columns.
+
+    Quoted values spanning several lines are not supported, since shards are split
+    by line.
+    """
+
+    def parse(self, line: str, header: str) -> dict:
+        return dict(zip(self._columns(header), next(csv.reader([line]))))
+
+    @staticmethod
+    @functools.lru_cache(maxsize=8)
+    def _columns(header: str) -> tuple[str, ...]:
+        return tuple(next(csv.reader([header])))
+
+
+class JsonlSource(FileSource):
+    """
+    Cases read from a JSON Lines file, one JSON object per line.
+    """
+
+    def shard(self, index: int, count: int) -> Iterator[dict]:
+        if index == 0:
+            with open(self.path, encoding="utf-8") as file:
+                first_line = file.readline()
+            if first_line.strip():
+                yield json.loads(first_line)
+        yield from super().shard(index, count)
+
+    def parse(self, line: str, header: str) -> dict:
+        return json.loads(line)
+
+
+def data_source(spec: str, count: Optional[int] = None, seed: int = 0) -> DataSource:
+    """
+    Creates the data source described by a spec.
+
+    Args:
+        spec (str): "csv:<path>", "jsonl:<path>" or "generated:<generator>".
+        count (Optional[int]): Number of cases of a generated source.
+        seed (int): Seed of a generated source. Default is 0.
+
+    Returns:
+        DataSource: The data source.
+
+    Raises:
+        ValueError: If the spec is malformed, the generator is unknown or a generated
+            source has no count.
+    """
+    scheme, _, location = spec.partition(":")
+    if scheme == "csv":
+        return CsvSource(location)
+    if scheme == "jsonl":
+        return JsonlSource(location)
+    if scheme == "generated":
+        if location not in GENERATORS:
+            raise ValueError(
+                f"Unknown generator '{location}', available generators: {', '.join(GENERATORS)}"
+            )
+        if count is None:
+            raise ValueError(f"Data source '{spec}' needs a count")
+        return GeneratedSource(GENERATORS[location], count, seed)
+    raise ValueError(
+        f"Data source must be csv:<path>, jsonl:<path> or generated:<name>, got '{spec}'"
+    )
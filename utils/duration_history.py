@@ -0,0 +1,146 @@
+import statistics
+import time
+from collections import defaultdict
+from typing import Optional
+import pytest
+
+HISTORY_CACHE_KEY = "scheduling/durations"
+DEFAULT_ESTIMATE = 10.0
+MAX_AGE_DAYS = 30
+
+class DurationHistory:
+    """
+    Durations and outcomes of the tests in past runs, kept in the pytest cache.
+
+    Registered as a plugin, it adds up the setup, call and teardown durations of
+    every test of the current run; update folds them into the history as a moving
+    average, so one slow run does not reorder the suite on its own. Tests not run
+    for MAX_AGE_DAYS days are forgotten.
+
+    Usage:
+    history = DurationHistory.load(config.cache)
+    config.pluginmanager.register(history)
+    ...
+    history.update()
+    history.save(config.cache)
+
+    Attributes:
+        entries (dict[str, dict]): Duration in seconds, outcome of the last run and
+            time last seen per test node id.
+        smoothing (float): Weight of the latest duration in the moving average.
+        durations (dict[str, float]): Durations of the tests of the current run.
+        failed (set[str]): Node ids of the tests failing in the current run.
+    """
+
+    def __init__(self, entries: Optional[dict] = None, smoothing: float = 0.5):
+        """
+        Initializes the DurationHistory.
+
+        Args:
+            entries (Optional[dict]): The history of past runs. Defaults to an empty history.
+            smoothing (float): Weight of the latest duration in the moving average.
+                Default is 0.5.
+        """
+        self.entries = entries or {}
+        self.smoothing = smoothing
+        self.durations = defaultdict(float)
+        self.failed = set()
+
+    @classmethod
+    def load(cls, cache: pytest.Cache) -> "DurationHistory":
+        """
+        Loads the history from the pytest cache.
+
+        Args:
+            cache (pytest.Cache): The pytest cache.
+
+        Returns:
+            DurationHistory: The history, empty if none was saved.
+        """
+        return cls(cache.get(HISTORY_CACHE_KEY, {}))
+
+    def save(self, cache: pytest.Cache) -> None:
+        """
+        Saves the history to the pytest cache.
+
+        Args:
+            cache (pytest.Cache): The pytest cache.
+        """
+        cache.set(HISTORY_CACHE_KEY, self.entries)
+
+    @pytest.hookimpl
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        if report.skipped:
+            return
+        self.durations[report.nodeid] += report.duration
+        if report.failed:
+            self.failed.add(report.nodeid)
+
+    def update(self) -> None:
+        """
+        Folds the durations and outcomes of the current run into the history.
+        """
+        now = time.time()
+        for nodeid, duration in self.durations.items():
+            previous = self.entries.get(nodeid)
+            if previous is not None:
+                duration = self.smoothing * duration + (1 - self.smoothing) * previous["duration"]
+            self.entries[nodeid] = {
+                "duration": round(duration, 3),
+                "failed": nodeid in self.failed,
+                "seen": round(now),
+            }
+        horizon = now - MAX_AGE_DAYS * 24 * 3600
+        self.entries = {
+            nodeid: entry for nodeid, entry in self.entries.items() if entry["seen"] >= horizon
+        }
+
+    @property
+    def default_estimate(self) -> float:
+        """
+        Estimated duration of a test without history: the median of the known
+        durations, or DEFAULT_ESTIMATE seconds while the history is empty.
+
+        Returns:
+            float: The estimate in seconds.
+        """
+        if not self.entries:
+            return DEFAULT_ESTIMATE
+        return statistics.median(entry["duration"] for entry in self.entries.values())
+
+    def estimate(self, nodeid: str, default: Optional[float] = None) -> float:
+        """
+        Returns the expected duration of a test.
+
+        Args:
+            nodeid (str): The test node id.
+            default (Optional[float]): Estimate for a test without history.
+                Defaults to default_estimate.
+
+        Returns:
+            float: The estimate in seconds.
+        """
+        entry = self.entries.get(nodeid)
+        if entry is not None:
+            return entry["duration"]
+        return self.default_estimate if default is None else default
+
+    def order(self, nodeids: list[str], failed_first: bool = False) -> list[int]:
+        """
+        Orders tests longest first, optionally after the tests that failed last run.
+
+        Args:
+            nodeids (list[str]): The collected test node ids.
+            failed_first (bool): Whether tests that failed in their last run go first.
+
+        Returns:
+            list[int]: Indices into nodeids in scheduling order.
+        """
+        default = self.default_estimate
+
+        def key(index: int) -> tuple:
+            nodeid = nodeids[index]
+            failed = failed_first and self.entries.get(nodeid, {}).get("failed", False)
+            return (not failed, -self.estimate(nodeid, default))
+
+        return sorted(range(len(nodeids)), key=key)
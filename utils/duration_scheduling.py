@@ -0,0 +1,94 @@
+from typing import Optional
+import pytest
+from xdist.remote import Producer
+from xdist.scheduler import LoadScheduling
+from xdist.workermanage import WorkerController
+from utils.duration_history import DurationHistory
+
+class DurationScheduling(LoadScheduling):
+    """
+    pytest-xdist scheduler handing out tests longest first, by their past durations.
+
+    The pending tests are sorted by their estimated duration, and every worker holds
+    at most two of them: the one it runs and the next, which xdist needs to tear down
+    fixtures correctly. A worker finishing a test gets the longest test still pending,
+    which is the longest-processing-time rule of list scheduling, so the slow flows
+    start early and the short ones fill the gaps at the end instead of one worker
+    finishing a long flow alone.
+
+    Attributes:
+        history (DurationHistory): Durations and outcomes of past runs.
+        failed_first (bool): Whether tests that failed in their last run go first.
+    """
+
+    def __init__(
+        self,
+        config: pytest.Config,
+        log: Optional[Producer],
+        history: DurationHistory,
+        failed_first: bool = False
+    ):
+        """
+        Initializes the DurationScheduling.
+
+        Args:
+            config (pytest.Config): The pytest configuration object.
+            log (Optional[Producer]): The xdist log producer.
+            history (DurationHistory): Durations and outcomes of past runs.
+            failed_first (bool): Whether tests that failed in their last run go first.
+        """
+        super().__init__(config, log)
+        self.history = history
+        self.failed_first = failed_first
+
+    def schedule(self) -> None:
+        """
+        Orders the collection and sends the first tests, balancing their estimates.
+        """
+        assert self.collection_is_completed
+        if self.collection is not None:
+            for node in self.nodes:
+                self.check_schedule(node)
+            return
+        if not self._check_nodes_have_same_collection():
+            self.log("**Different tests collected, aborting run**")
+            return
+
+        self.collection = next(iter(self.node2collection.values()))
+        self.pending[:] = self.history.order(self.collection, self.failed_first)
+        if not self.collection:
+            return
+
+        default = self.history.default_estimate
+        loads = {node: 0.0 for node in self.nodes}
+        batches = {node: [] for node in self.nodes}
+        for index in self.pending[:2 * len(self.nodes)]:
+            node = min(
+                (node for node in self.nodes if len(batches[node]) < 2), key=loads.__getitem__
+            )
+            batches[node].append(index)
+            loads[node] += self.history.estimate(self.collection[index], default)
+        del self.pending[:2 * len(self.nodes)]
+        for node, batch in batches.items():
+            if batch:
+                self.node2pending[node].extend(batch)
+                node.send_runtest_some(batch)
+
+        if not self.pending:
+            for node in self.nodes:
+                node.shutdown()
+
+    def check_schedule(self, node: WorkerController, duration: float = 0) -> None:
+        """
+        Tops the node up to two pending tests, or shuts it down when none are left.
+
+        Args:
+            node (WorkerController): The worker node.
+            duration (float): Duration of the test the node just finished.
+        """
+        if node.shutting_down:
+            return
+        if self.pending:
+            self._send_tests(node, max(2 - len(self.node2pending[node]), 0))
+        else:
+            node.shutdown()
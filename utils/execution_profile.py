@@ -0,0 +1,163 @@
+import os
+from configparser import ConfigParser
+from typing import Optional
+from utils.artifact_pipeline import ARTIFACT_POLICIES
+from utils.asset_cache import ASSET_CACHE_MODES
+
+PROFILE_ENV_VARIABLE = "PW_PROFILE"
+PROFILE_SECTION_PREFIX = "profile:"
+
+class ExecutionProfile:
+    """
+    Named set of browser settings read from a ``[profile:<name>]`` section of config.ini.
+
+    Values missing from the profile section fall back to the ``[DEFAULT]`` section.
+
+    Attributes:
+        name (str): The profile name.
+        headless (bool): Whether the browser runs headless.
+        slow_mo (int): Delay in milliseconds added to every Playwright action.
+        viewport (Optional[dict]): Viewport size, None to use a maximized window.
+        video (str): Artifact policy for videos: "off", "on-failure" or "always".
+        tracing (str): Artifact policy for Playwright traces.
+        screenshot (str): Artifact policy for screenshots taken at the end of a test.
+        timeout (int): Default timeout in milliseconds for actions and assertions.
+        navigation_timeout (int): Default timeout in milliseconds for navigations.
+        context_pool_size (int): Number of warm browser contexts kept per worker,
+            0 for a fresh context per test.
+        context_max_uses (int): Number of tests after which a pooled context is recycled.
+        max_contexts_per_worker (int): Number of browser contexts a worker may keep open
+            at once, 0 for no limit.
+        browser_recycle_tests (int): Number of tests after which a worker relaunches
+            its browser, 0 for no limit.
+        browser_max_rss_mb (int): RSS in MiB of the browser processes above which the
+            browser is relaunched, 0 for no limit.
+        browser_max_leaks (int): Number of leaked contexts and pages at which the
+            browser is relaunched, 0 for no limit.
+        asset_cache (str): Static asset cache mode: "off", "record", "replay" or "refresh".
+        blocked_domains (list[str]): Third-party domains whose requests are aborted.
+        timing (bool): Whether page object actions are timed.
+        page_metrics (bool): Whether the client-side metrics of page loads are
+            recorded and checked against the page budgets.
+    """
+
+    def __init__(self, name: str, config: ConfigParser):
+        """
+        Initializes the ExecutionProfile from its config.ini section.
+
+        Args:
+            name (str): The profile name.
+            config (ConfigParser): The parsed config.ini.
+
+        Raises:
+            ValueError: If config.ini has no section for the profile, an artifact
+                policy is not one of "off", "on-failure" or "always", or the asset
+                cache mode is unknown.
+        """
+        section_name = f"{PROFILE_SECTION_PREFIX}{name}"
+        if not config.has_section(section_name):
+            raise ValueError(
+                f"Unknown profile '{name}', available profiles: {', '.join(available_profiles(config))}"
+            )
+        section = config[section_name]
+
+        self.name = name
+        self.headless = section.getboolean("Headless")
+        self.slow_mo = section.getint("SlowMo")
+        self.viewport = self._parse_viewport(section["Viewport"])
+        self.video = self._parse_policy(section, "Video")
+        self.tracing = self._parse_policy(section, "Tracing")
+        self.screenshot = self._parse_policy(section, "Screenshot")
+        self.timeout = section.getint("Timeout")
+        self.navigation_timeout = section.getint("NavigationTimeout")
+        self.context_pool_size = section.getint("ContextPoolSize")
+        self.context_max_uses = section.getint("ContextMaxUses")
+        self.max_contexts_per_worker = section.getint("MaxContextsPerWorker")
+        self.browser_recycle_tests = section.getint("BrowserRecycleTests")
+        self.browser_max_rss_mb = section.getint("BrowserMaxRssMb")
+        self.browser_max_leaks = section.getint("BrowserMaxLeaks")
+        self.asset_cache = section["AssetCache"].strip().lower()
+        if self.asset_cache not in ASSET_CACHE_MODES:
+            raise ValueError(
+                f"AssetCache must be one of {', '.join(ASSET_CACHE_MODES)}, got '{self.asset_cache}'"
+            )
+        self.timing = section.getboolean("Timing")
+        self.page_metrics = section.getboolean("PageMetrics")
+        self.blocked_domains = [
+            domain.strip() for domain in section["BlockedDomains"].split(",") if domain.strip()
+        ]
+
+    @staticmethod
+    def _parse_policy(section, key: str) -> str:
+        policy = section[key].strip().lower()
+        if policy not in ARTIFACT_POLICIES:
+            raise ValueError(
+                f"{key} must be one of {', '.join(ARTIFACT_POLICIES)}, got '{policy}'"
+            )
+        return policy
+
+    @staticmethod
+    def _parse_viewport(value: str) -> Optional[dict]:
+        if value.strip().lower() == "maximized":
+            return None
+        width, height = value.lower().split("x")
+        return {"width": int(width), "height": int(height)}
+
+    @property
+    def launch_args(self) -> dict:
+        """
+        Browser launch arguments for the profile.
+
+        Returns:
+            dict: Keyword arguments for BrowserType.launch.
+        """
+        launch_args = {"headless": self.headless, "slow_mo": self.slow_mo}
+        if self.viewport is None:
+            launch_args["args"] = ["--start-maximized"]
+        return launch_args
+
+    @property
+    def context_args(self) -> dict:
+        """
+        Browser context arguments for the profile, without the video directory.
+
+        Returns:
+            dict: Keyword arguments for Browser.new_context.
+        """
+        if self.viewport is None:
+            return {"no_viewport": True}
+        return {"viewport": self.viewport}
+
+
+def available_profiles(config: ConfigParser) -> list[str]:
+    """
+    Lists the profiles defined in config.ini.
+
+    Args:
+        config (ConfigParser): The parsed config.ini.
+
+    Returns:
+        list[str]: The profile names.
+    """
+    return [
+        section[len(PROFILE_SECTION_PREFIX):]
+        for section in config.sections()
+        if section.startswith(PROFILE_SECTION_PREFIX)
+    ]
+
+
+def selected_profile_name(config: ConfigParser, option: Optional[str] = None) -> str:
+    """
+    Resolves the profile to run with.
+
+    The command line option wins over the PW_PROFILE environment variable, which
+    wins over the Profile key of the [DEFAULT] section.
+
+    Args:
+        config (ConfigParser): The parsed config.ini.
+        option (Optional[str]): Value of the --profile command line option.
+
+    Returns:
+        str: The selected profile name.
+    """
+    return option or os.environ.get(PROFILE_ENV_VARIABLE) or config["DEFAULT"]["Profile"]
@@ -0,0 +1,361 @@
+import ast
+import fnmatch
+import re
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+import pytest
+
+IMPACT_CACHE_KEY = "impact/map"
+WATCHED_DIRECTORIES = ("pages",)
+NOTIFICATIONS_PATH = "enums/notifications.py"
+NOTIFICATIONS_CLASS = "Notifications"
+IGNORED_PATTERNS = ("*.md", "tools/*", "requests.jsonl")
+DEFAULT_FULL_RUN_EVERY = 20
+MAX_AGE_DAYS = 30
+HUNK_PATTERN = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+
+class ImpactRecorder:
+    """
+    Records the page object methods and Notifications members each test exercises.
+
+    Registered as a plugin, it installs a profile function from the start of the
+    setup of a test to the end of its teardown, on the test thread and on the
+    threads started meanwhile, such as the event loop of the concurrent flows. A
+    call to a function defined under WATCHED_DIRECTORIES is recorded as
+    "<path>::<qualified name>", for example
+    "pages/contact_page.py::ContactPage.click_send". The Notifications members
+    referenced by the test function and by the recorded functions are recorded as
+    "enums/notifications.py::Notifications.<member>". Every code object is looked at
+    once; later calls only cost a dictionary lookup.
+
+    Usage:
+    recorder = ImpactRecorder(config.rootpath)
+    config.pluginmanager.register(recorder)
+    ...
+    impact_map.update(recorder.covered)
+
+    Attributes:
+        rootpath (Path): The root directory of the project.
+        covered (dict[str, list[str]]): The sorted keys recorded per test node id.
+    """
+
+    def __init__(self, rootpath: Path):
+        """
+        Initializes the ImpactRecorder.
+
+        Args:
+            rootpath (Path): The root directory of the project.
+        """
+        self.rootpath = rootpath
+        self.covered = {}
+        self._keys = {}
+        self._current = set()
+        self._watched = tuple(
+            str(rootpath / directory) + "/" for directory in WATCHED_DIRECTORIES
+        )
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item: pytest.Item, nextitem: Optional[pytest.Item]):
+        self._current = set()
+        function = getattr(item, "function", None)
+        if function is not None:
+            self._current.update(self._notifications(function.__code__))
+        previous = sys.getprofile()
+        previous_threading = threading.getprofile()
+        sys.setprofile(self._profile)
+        threading.setprofile(self._profile)
+        try:
+            yield
+        finally:
+            sys.setprofile(previous)
+            threading.setprofile(previous_threading)
+            self.covered[item.nodeid] = sorted(self._current)
+
+    def _profile(self, frame, event: str, arg) -> None:
+        if event != "call":
+            return
+        code = frame.f_code
+        keys = self._keys.get(code)
+        if keys is None:
+            keys = self._keys[code] = self._code_keys(code)
+        if keys:
+            self._current.update(keys)
+
+    def _code_keys(self, code) -> tuple[str, ...]:
+        if not code.co_filename.startswith(self._watched):
+            return ()
+        path = Path(code.co_filename).relative_to(self.rootpath).as_posix()
+        return (f"{path}::{code.co_qualname}", *self._notifications(code))
+
+    @staticmethod
+    def _notifications(code) -> list[str]:
+        names = set()
+        codes = [code]
+        while codes:
+            current = codes.pop()
+            names.update(current.co_names)
+            codes.extend(const for const in current.co_consts if hasattr(const, "co_names"))
+        if NOTIFICATIONS_CLASS not in names:
+            return []
+        from enums.notifications import Notifications
+        return [
+            f"{NOTIFICATIONS_PATH}::{NOTIFICATIONS_CLASS}.{member}"
+            for member in Notifications.__members__
+            if member in names
+        ]
+
+
+class ImpactMap:
+    """
+    The page object methods and Notifications members each test exercised in past
+    runs, kept in the pytest cache.
+
+    Usage:
+    impact_map = ImpactMap.load(config.cache)
+    selected = impact_map.affected(nodeids, changes)
+    impact_map.update(recorder.covered)
+    impact_map.finish_run(full=False)
+    impact_map.save(config.cache)
+
+    Attributes:
+        entries (dict[str, dict]): The recorded keys and time last run per test node id.
+        runs_since_full (int): Number of change-impact runs since the last full run.
+        last_full_run (Optional[float]): Time of the last full change-impact run.
+    """
+
+    def __init__(self, data: Optional[dict] = None):
+        """
+        Initializes the ImpactMap.
+
+        Args:
+            data (Optional[dict]): The map as saved in the cache. Defaults to an empty map.
+        """
+        data = data or {}
+        self.entries = data.get("entries", {})
+        self.runs_since_full = data.get("runs_since_full", 0)
+        self.last_full_run = data.get("last_full_run")
+
+    @classmethod
+    def load(cls, cache: pytest.Cache) -> "ImpactMap":
+        """
+        Loads the map from the pytest cache.
+
+        Args:
+            cache (pytest.Cache): The pytest cache.
+
+        Returns:
+            ImpactMap: The map, empty if none was saved.
+        """
+        return cls(cache.get(IMPACT_CACHE_KEY, {}))
+
+    def save(self, cache: pytest.Cache) -> None:
+        """
+        Saves the map to the pytest cache.
+
+        Args:
+            cache (pytest.Cache): The pytest cache.
+        """
+        cache.set(IMPACT_CACHE_KEY, {
+            "entries": self.entries,
+            "runs_since_full": self.runs_since_full,
+            "last_full_run": self.last_full_run,
+        })
+
+    def update(self, covered: dict[str, list[str]]) -> None:
+        """
+        Replaces the entries of the tests of this run and forgets the tests not run
+        for MAX_AGE_DAYS days.
+
+        Args:
+            covered (dict[str, list[str]]): The keys recorded per test node id.
+        """
+        now = time.time()
+        for nodeid, keys in covered.items():
+            self.entries[nodeid] = {"keys": keys, "seen": now}
+        self.entries = {
+            nodeid: entry for nodeid, entry in self.entries.items()
+            if now - entry["seen"] < MAX_AGE_DAYS * 86400
+        }
+
+    def affected(self, nodeids: list[str], changes: dict) -> set[str]:
+        """
+        Selects the tests affected by a set of changes.
+
+        A test is affected when it exercised a changed key, when a key prefix of a
+        changed module covers one of its keys, when its test file changed, or when
+        it has no entry yet.
+
+        Args:
+            nodeids (list[str]): Node ids of the collected tests.
+            changes (dict): The changes, as returned by changed_keys.
+
+        Returns:
+            set[str]: Node ids of the affected tests.
+        """
+        keys = set(changes["keys"])
+        prefixes = tuple(changes["prefixes"])
+        test_files = tuple(changes["test_files"])
+        selected = set()
+        for nodeid in nodeids:
+            entry = self.entries.get(nodeid)
+            if (
+                entry is None
+                or nodeid.split("::")[0] in test_files
+                or any(key in keys or key.startswith(prefixes) for key in entry["keys"])
+            ):
+                selected.add(nodeid)
+        return selected
+
+    def full_run_reason(self, changes: dict, full_run_every: int) -> Optional[str]:
+        """
+        Decides whether the next run must run every test to refresh the map.
+
+        Args:
+            changes (dict): The changes, as returned by changed_keys.
+            full_run_every (int): Number of runs after which one is a full run, 0 for never.
+
+        Returns:
+            Optional[str]: Why every test must run, None to run the affected ones only.
+        """
+        if not self.entries:
+            return "no impact map yet"
+        if changes["unknown"]:
+            return f"changes outside the page objects: {', '.join(changes['unknown'][:5])}"
+        if full_run_every and self.runs_since_full + 1 >= full_run_every:
+            return f"refresh of the impact map every {full_run_every} runs"
+        return None
+
+    def finish_run(self, full: bool) -> None:
+        """
+        Counts a run towards the next full run.
+
+        Args:
+            full (bool): Whether every test was run.
+        """
+        if full:
+            self.runs_since_full = 0
+            self.last_full_run = time.time()
+        else:
+            self.runs_since_full += 1
+
+
+def changed_lines(base: str, rootpath: Path) -> dict[str, Optional[set[int]]]:
+    """
+    Lists the lines changed since a git ref, in commits and in the working tree.
+
+    Args:
+        base (str): The git ref to compare with, such as origin/main.
+        rootpath (Path): The root directory of the repository.
+
+    Returns:
+        dict[str, Optional[set[int]]]: The changed line numbers of the current
+        version per path relative to the root, None for deleted and untracked files.
+
+    Raises:
+        RuntimeError: If git fails, for example on an unknown ref.
+    """
+    def git(*args: str) -> str:
+        result = subprocess.run(
+            ["git", *args], cwd=rootpath, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"git {' '.join(args)} failed: {result.stderr.strip()}")
+        return result.stdout
+
+    changes = {}
+    path = None
+    for line in git("diff", "-U0", "--no-color", "--no-renames", base).splitlines():
+        if line.startswith("--- a/"):
+            path = line[len("--- a/"):]
+            changes[path] = None
+        elif line.startswith("+++ b/"):
+            path = line[len("+++ b/"):]
+            changes[path] = set()
+        elif line.startswith("@@") and changes.get(path) is not None:
+            match = HUNK_PATTERN.match(line)
+            start, count = int(match.group(1)), int(match.group(2) or 1)
+            changes[path].update(range(start, start + max(count, 1) + (count == 0)))
+    for path in git("ls-files", "--others", "--exclude-standard").splitlines():
+        changes[path] = None
+    return changes
+
+
+def changed_keys(lines: dict[str, Optional[set[int]]], rootpath: Path) -> dict:
+    """
+    Maps changed lines to the keys recorded by the ImpactRecorder.
+
+    A changed line inside a function of a watched module gives the key of that
+    function; a changed line elsewhere in the module, such as an import or a
+    constant, gives the prefix of the whole module. A changed Notifications member
+    gives its key, any other change of its module the prefix of every member.
+
+    Args:
+        lines (dict[str, Optional[set[int]]]): The changes, as returned by changed_lines.
+        rootpath (Path): The root directory of the project.
+
+    Returns:
+        dict: The sorted lists of changed "keys", key "prefixes" and "test_files",
+        and of the changed paths the impact of which is "unknown".
+    """
+    keys, prefixes, test_files, unknown = set(), set(), set(), []
+    for path, changed in sorted(lines.items()):
+        if any(fnmatch.fnmatchcase(path, pattern) for pattern in IGNORED_PATTERNS):
+            continue
+        if path.startswith("tests/") and Path(path).name.startswith("test_"):
+            test_files.add(path)
+            continue
+        watched = path.endswith(".py") and path.startswith(
+            tuple(f"{directory}/" for directory in WATCHED_DIRECTORIES)
+        )
+        if not watched and path != NOTIFICATIONS_PATH:
+            unknown.append(path)
+            continue
+        source = rootpath / path
+        if changed is None or not source.exists():
+            prefixes.add(f"{path}::")
+            continue
+        definitions = _definitions(ast.parse(source.read_text()), path == NOTIFICATIONS_PATH)
+        for line in changed:
+            names = [name for name, start, end in definitions if start <= line <= end]
+            if names:
+                keys.add(f"{path}::{names[-1]}")
+            else:
+                prefixes.add(f"{path}::")
+    return {
+        "keys": sorted(keys),
+        "prefixes": sorted(prefixes),
+        "test_files": sorted(test_files),
+        "unknown": unknown,
+    }
+
+
+def _definitions(tree: ast.Module, members: bool) -> list[tuple[str, int, int]]:
+    definitions = []
+
+    def visit(node: ast.AST, prefix: str) -> None:
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                start = min(
+                    [child.lineno] + [decorator.lineno for decorator in child.decorator_list]
+                )
+                definitions.append((f"{prefix}{child.name}", start, child.end_lineno))
+                visit(child, f"{prefix}{child.name}.<locals>.")
+            elif isinstance(child, ast.ClassDef):
+                visit(child, f"{prefix}{child.name}.")
+            elif (
+                members and isinstance(child, ast.Assign)
+                and prefix == f"{NOTIFICATIONS_CLASS}."
+            ):
+                for target in child.targets:
+                    if isinstance(target, ast.Name):
+                        definitions.append(
+                            (f"{prefix}{target.id}", child.lineno, child.end_lineno)
+                        )
+
+    visit(tree, "")
+    return definitions
@@ -0,0 +1,86 @@
+from html.parser import HTMLParser
+from typing import Optional
+
+VOID_ELEMENTS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr"
+}
+
+class NotificationParser(HTMLParser):
+    """
+    HTML parser that extracts the text of the first visible element matching a
+    simple ``#id`` or ``.class`` selector.
+
+    Elements hidden with the ``hidden`` attribute, a ``d-none`` class or an inline
+    ``display: none`` style are skipped, the same way the browser-side checks skip
+    invisible notifications.
+
+    Attributes:
+        text (Optional[str]): Text of the matched element, None if nothing matched.
+    """
+
+    def __init__(self, selector: str):
+        """
+        Initializes the NotificationParser with the selector to look for.
+
+        Args:
+            selector (str): A ``#id`` or ``.class`` selector.
+        """
+        super().__init__()
+        self.attribute = "id" if selector.startswith("#") else "class"
+        self.value = selector[1:]
+        self.text = None
+        self._depth = 0
+        self._parts = []
+
+    def _matches(self, attrs: dict) -> bool:
+        if "hidden" in attrs:
+            return False
+        classes = (attrs.get("class") or "").split()
+        style = (attrs.get("style") or "").replace(" ", "")
+        if "d-none" in classes or "display:none" in style:
+            return False
+        if self.attribute == "id":
+            return attrs.get("id") == self.value
+        return self.value in classes
+
+    def handle_starttag(self, tag: str, attrs: list) -> None:
+        if self._depth and tag == "br":
+            self._parts.append("\n")
+        if self.text is not None or tag in VOID_ELEMENTS:
+            return
+        if self._depth:
+            self._depth += 1
+        elif self._matches(dict(attrs)):
+            self._depth = 1
+
+    def handle_endtag(self, tag: str) -> None:
+        if not self._depth or tag in VOID_ELEMENTS:
+            return
+        self._depth -= 1
+        if not self._depth:
+            text = " ".join("".join(self._parts).split())
+            self._parts = []
+            if text:
+                self.text = text
+
+    def handle_data(self, data: str) -> None:
+        if self._depth:
+            self._parts.append(data)
+
+
+def find_notification_text(html: str, selector: str) -> Optional[str]:
+    """
+    Returns the text of the first visible element matching the selector.
+
+    Args:
+        html (str): The HTML document to search.
+        selector (str): A ``#id`` or ``.class`` selector.
+
+    Returns:
+        Optional[str]: The whitespace-normalized text, or None if no element matched.
+    """
+    parser = NotificationParser(selector)
+    parser.feed(html)
+    parser.close()
+    return parser.text
@@ -0,0 +1,337 @@
+import fnmatch
+import json
+import logging
+import time
+from collections import defaultdict
+from configparser import ConfigParser
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse
+from playwright.sync_api import Page, Request
+from playwright.sync_api import Error as PlaywrightError
+from utils.timing import percentile
+
+BUDGET_SECTION_PREFIX = "budget:"
+METRICS = (
+    "ttfb_ms",
+    "dom_content_loaded_ms",
+    "load_ms",
+    "first_paint_ms",
+    "first_contentful_paint_ms",
+    "transfer_bytes",
+    "request_count",
+    "js_heap_used_bytes",
+)
+
+REPORT_FUNCTION = "__reportPageMetrics"
+
+# Added to every document of the page. Once the load event handlers of the top
+# document have finished, so loadEventEnd is set, it reads the Navigation Timing,
+# paint and resource entries and hands them to the exposed report function without
+# waiting for its result, so neither the page nor the test waits on the recording.
+NAVIGATION_METRICS_SCRIPT = """
+(() => {
+    if (window !== window.top) return;
+    const report = () => {
+        const navigation = performance.getEntriesByType("navigation")[0];
+        const paints = {};
+        for (const entry of performance.getEntriesByType("paint")) {
+            paints[entry.name] = entry.startTime;
+        }
+        const resources = performance.getEntriesByType("resource");
+        const round = (value) => value === undefined ? null : Math.round(value * 10) / 10;
+        window.%s({
+            url: location.href,
+            ttfb_ms: navigation ? round(navigation.responseStart) : null,
+            dom_content_loaded_ms: navigation ? round(navigation.domContentLoadedEventEnd) : null,
+            load_ms: navigation ? round(navigation.loadEventEnd) : null,
+            first_paint_ms: round(paints["first-paint"]),
+            first_contentful_paint_ms: round(paints["first-contentful-paint"]),
+            transfer_bytes: resources.reduce(
+                (total, entry) => total + entry.transferSize,
+                navigation ? navigation.transferSize : 0
+            ),
+            request_count: resources.length + (navigation ? 1 : 0),
+            js_heap_used_bytes: performance.memory ? performance.memory.usedJSHeapSize : null,
+        }).catch(() => {});
+    };
+    window.addEventListener("load", () => setTimeout(report, 0), { once: true });
+})();
+""" % REPORT_FUNCTION
+
+
+def load_budgets(config: ConfigParser) -> list[tuple[str, dict]]:
+    """
+    Reads the page budgets from the ``[budget:<path pattern>]`` sections of config.ini.
+
+    Args:
+        config (ConfigParser): The parsed config.ini.
+
+    Returns:
+        list[tuple[str, dict]]: The path pattern and the limit of each metric of every
+        budget section, in the order of config.ini.
+
+    Raises:
+        ValueError: If a budget section sets an unknown metric or a limit is not a number.
+    """
+    budgets = []
+    for section_name in config.sections():
+        if not section_name.startswith(BUDGET_SECTION_PREFIX):
+            continue
+        limits = {}
+        for key, value in config.items(section_name):
+            if key in config.defaults():
+                continue
+            if key not in METRICS:
+                raise ValueError(
+                    f"Unknown metric '{key}' in [{section_name}], available metrics: "
+                    f"{', '.join(METRICS)}"
+                )
+            try:
+                limits[key] = float(value)
+            except ValueError:
+                raise ValueError(
+                    f"Budget {key} in [{section_name}] must be a number, got '{value}'"
+                )
+        budgets.append((section_name[len(BUDGET_SECTION_PREFIX):], limits))
+    return budgets
+
+
+def budget_for(budgets: list[tuple[str, dict]], path: str) -> dict:
+    """
+    Returns the limits that apply to a page.
+
+    Every budget whose pattern matches the path applies; a later section overrides
+    the limits of an earlier one, so ``[budget:*]`` can set defaults for all pages.
+
+    Args:
+        budgets (list[tuple[str, dict]]): The budgets read by load_budgets.
+        path (str): The URL path of the page, such as /secure.
+
+    Returns:
+        dict: The limit of each budgeted metric.
+    """
+    limits = {}
+    for pattern, pattern_limits in budgets:
+        if fnmatch.fnmatchcase(path, pattern):
+            limits.update(pattern_limits)
+    return limits
+
+
+class PageMetrics:
+    """
+    Records the client-side metrics of every page load of a page.
+
+    Once a document of the page has loaded, a script added to it reports the
+    Navigation Timing, paint timings, transferred bytes and request count of the
+    document through an exposed function. The report arrives like any other page
+    event, when the test next calls Playwright, so recording adds no round trip
+    and never holds up the test. On Chromium the used JS heap comes from
+    performance.memory, elsewhere it is left out. A load that follows a POST,
+    directly or through its redirect, is recorded as a form submission, any other
+    as a navigation. Form submissions made over the API do not load a page and are
+    not recorded.
+
+    Transferred bytes only count what came over the network: assets served by the
+    asset cache or the HTTP cache, and cross-origin resources without a
+    Timing-Allow-Origin header, count as 0.
+
+    Attributes:
+        page (Page): The page whose loads are recorded.
+        budgets (list[tuple[str, dict]]): The budgets read by load_budgets.
+        navigations (list[dict]): The metrics of each load, with its URL, path and kind.
+    """
+
+    def __init__(self, page: Page, budgets: list[tuple[str, dict]]):
+        """
+        Initializes the PageMetrics and starts recording the loads of the page.
+
+        Must be created before the page's first navigation, since the script reporting
+        the metrics is only added to the documents loaded after it.
+
+        Args:
+            page (Page): The page whose loads are recorded.
+            budgets (list[tuple[str, dict]]): The budgets read by load_budgets.
+        """
+        self.page = page
+        self.budgets = budgets
+        self.navigations = []
+        self.logger = logging.getLogger()
+        self._kind = "navigation"
+        self._closed = False
+        page.on("request", self._on_request)
+        page.expose_function(REPORT_FUNCTION, self._on_report)
+        page.add_init_script(NAVIGATION_METRICS_SCRIPT)
+
+    def flush(self) -> None:
+        """
+        Takes in the reports the page has sent but the test has not received yet.
+        """
+        try:
+            self.page.evaluate("() => 0")
+        except PlaywrightError as e:
+            self.logger.debug(f"Could not collect the page metrics of {self.page.url}: {e}")
+
+    def close(self) -> None:
+        """
+        Takes in the pending reports and stops recording the loads of the page.
+        """
+        if not self.page.is_closed():
+            self.flush()
+        self._closed = True
+        self.page.remove_listener("request", self._on_request)
+
+    def violations(self) -> list[str]:
+        """
+        Checks the recorded loads against the budgets of their pages.
+
+        Returns:
+            list[str]: A description of every metric over its budget.
+        """
+        violations = []
+        for navigation in self.navigations:
+            for metric, limit in budget_for(self.budgets, navigation["path"]).items():
+                value = navigation.get(metric)
+                if value is not None and value > limit:
+                    violations.append(
+                        f"{navigation['kind']} to {navigation['path']}: "
+                        f"{metric} {value:g} over budget {limit:g}"
+                    )
+        return violations
+
+    def to_dict(self, previous: Optional[dict] = None) -> dict:
+        """
+        Returns the recorded loads with the p50 of the same page in the previous run.
+
+        Args:
+            previous (Optional[dict]): The p50 of each metric per page of the previous
+                run, as returned by PageMetricsHistory.previous.
+
+        Returns:
+            dict: The loads and the budget violations.
+        """
+        previous = previous or {}
+        return {
+            "navigations": [
+                {**navigation, "previous_p50": previous.get(navigation["path"], {})}
+                for navigation in self.navigations
+            ],
+            "violations": self.violations(),
+        }
+
+    def _on_request(self, request: Request) -> None:
+        if not request.is_navigation_request() or request.frame != self.page.main_frame:
+            return
+        redirected_from = request.redirected_from
+        posted = request.method == "POST" or (
+            redirected_from is not None and redirected_from.method == "POST"
+        )
+        self._kind = "submission" if posted else "navigation"
+
+    def _on_report(self, metrics: dict) -> None:
+        if self._closed:
+            return
+        kind, self._kind = self._kind, "navigation"
+        metrics["path"] = urlparse(metrics["url"]).path or "/"
+        metrics["kind"] = kind
+        self.navigations.append(metrics)
+
+
+def summarize(navigations: list[dict]) -> dict:
+    """
+    Aggregates page loads into percentiles of each metric per page.
+
+    Args:
+        navigations (list[dict]): The recorded loads.
+
+    Returns:
+        dict: For each path, the number of loads and the p50, p95 and max of each metric.
+    """
+    values = defaultdict(lambda: defaultdict(list))
+    counts = defaultdict(int)
+    for navigation in navigations:
+        counts[navigation["path"]] += 1
+        for metric in METRICS:
+            if navigation.get(metric) is not None:
+                values[navigation["path"]][metric].append(navigation[metric])
+
+    summary = {}
+    for path in sorted(counts):
+        summary[path] = {"count": counts[path]}
+        for metric, metric_values in values[path].items():
+            metric_values.sort()
+            summary[path][metric] = {
+                "p50": percentile(metric_values, 50),
+                "p95": percentile(metric_values, 95),
+                "max": metric_values[-1],
+            }
+    return summary
+
+
+class PageMetricsHistory:
+    """
+    The per-page summaries of past runs, one JSON line per run, and the report of
+    the last run.
+
+    Attributes:
+        directory (Path): Directory of the history and report files.
+        history_path (Path): The JSON Lines file with the p50 of each metric per page
+            of every run.
+        report_path (Path): The JSON report of the last run.
+    """
+
+    def __init__(self, directory: str | Path):
+        """
+        Initializes the PageMetricsHistory.
+
+        Args:
+            directory (str | Path): Directory of the history and report files.
+        """
+        self.directory = Path(directory)
+        self.history_path = self.directory / "history.jsonl"
+        self.report_path = self.directory / "report.json"
+
+    def previous(self) -> dict:
+        """
+        Returns the p50 of each metric per page of the last recorded run.
+
+        Returns:
+            dict: The metrics per path, empty if no run was recorded.
+        """
+        try:
+            lines = self.history_path.read_text().splitlines()
+        except OSError:
+            return {}
+        for line in reversed(lines):
+            if line.strip():
+                try:
+                    return json.loads(line)["pages"]
+                except (ValueError, KeyError):
+                    return {}
+        return {}
+
+    def record(self, run_id: str, navigations: list[dict]) -> dict:
+        """
+        Writes the report of a run and appends its p50s to the history.
+
+        Args:
+            run_id (str): The run id.
+            navigations (list[dict]): The loads recorded in the run.
+
+        Returns:
+            dict: The summary of the run, as returned by summarize.
+        """
+        summary = summarize(navigations)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.report_path.write_text(json.dumps(summary, indent=2))
+        pages = {
+            path: {
+                metric: stats["p50"] for metric, stats in page.items() if metric != "count"
+            }
+            for path, page in summary.items()
+        }
+        with open(self.history_path, "a") as history_file:
+            history_file.write(
+                json.dumps({"run_id": run_id, "time": round(time.time()), "pages": pages}) + "\n"
+            )
+        return summary
@@ -0,0 +1,86 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from playwright.sync_api import BrowserContext
+
+class StorageStateCache:
+    """
+    On-disk cache of a logged-in Playwright storage state.
+
+    The state file is keyed by user and application URL, so every worker and every
+    later run that logs in with the same user against the same target reuses it.
+
+    Attributes:
+        path (Path): Location of the cached storage state file.
+        user (str): The user the storage state belongs to.
+        application_url (str): The base URL the storage state was captured against.
+    """
+
+    def __init__(self, directory: Path, user: str, application_url: str):
+        """
+        Initializes the StorageStateCache for the given user and application URL.
+
+        Args:
+            directory (Path): Directory that holds the cached state files.
+            user (str): The user the storage state belongs to.
+            application_url (str): The base URL of the application.
+        """
+        key = hashlib.sha256(f"{application_url}|{user}".encode()).hexdigest()[:16]
+        self.path = Path(directory) / f"{user}-{key}.json"
+        self.user = user
+        self.application_url = application_url
+        self.logger = logging.getLogger()
+
+    def is_valid(self) -> bool:
+        """
+        Checks whether the cached storage state can be reused.
+
+        The state is rejected when the file is missing or unreadable, holds no
+        cookies, or any of its persistent cookies has expired. Rejection by the
+        server is only visible in the browser and is handled by the caller.
+
+        Returns:
+            bool: True if the cached state looks usable, False otherwise.
+        """
+        try:
+            state = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return False
+
+        cookies = state.get("cookies", [])
+        if not cookies:
+            return False
+
+        now = time.time()
+        for cookie in cookies:
+            expires = cookie.get("expires", -1)
+            if expires != -1 and expires <= now:
+                self.logger.info(f"Cached storage state for {self.user} has an expired cookie")
+                return False
+        return True
+
+    def save(self, context: BrowserContext) -> None:
+        """
+        Saves the storage state of the given context to the cache.
+
+        The state is written to a temporary file first and moved into place, so
+        parallel workers never read a half-written file.
+
+        Args:
+            context (BrowserContext): A context that is logged in as the cached user.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary_path = self.path.with_suffix(f".{os.getpid()}.tmp")
+        context.storage_state(path=temporary_path)
+        os.replace(temporary_path, self.path)
+        self.logger.info(f"Saved storage state for {self.user} to {self.path}")
+
+    def invalidate(self) -> None:
+        """
+        Removes the cached storage state so the next use logs in again.
+        """
+        self.logger.info(f"Invalidating storage state for {self.user}")
+        self.path.unlink(missing_ok=True)
@@ -0,0 +1,400 @@
+import argparse
+import html
+import json
+import logging
+import random
+import re
+import secrets
+import threading
+import time
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import parse_qs, quote, unquote, urlparse
+from enums.notifications import Notifications
+
+STUB_SERVER_ENV_VARIABLE = "PW_STUB_SERVER"
+USERNAME_PATTERN = re.compile(r"^[a-z0-9-]{3,39}$")
+STYLESHEET = b"""
+body { font-family: sans-serif; margin: 2rem; }
+.alert { padding: 0.75rem; margin-bottom: 1rem; }
+.alert-success { background: #d1e7dd; }
+.alert-danger { background: #f8d7da; }
+label { display: block; margin-top: 0.5rem; }
+"""
+
+LAYOUT = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<link rel="stylesheet" href="/assets/app.css">
+</head>
+<body>
+<nav><a href="/register">Register</a> <a href="/login">Login</a></nav>
+<main>
+{flash}
+<h1>{title}</h1>
+{content}
+</main>
+</body>
+</html>
+"""
+
+REGISTER_FORM = """<form method="post" action="/register">
+<label for="username">Username</label>
+<input type="text" id="username" name="username">
+<label for="password">Password</label>
+<input type="password" id="password" name="password">
+<label for="confirmPassword">Confirm Password</label>
+<input type="password" id="confirmPassword" name="confirmPassword">
+<button type="submit">Register</button>
+</form>
+"""
+
+LOGIN_FORM = """<form method="post" action="/authenticate">
+<label for="username">Username</label>
+<input type="text" id="username" name="username">
+<label for="password">Password</label>
+<input type="password" id="password" name="password">
+<button type="submit">Login</button>
+</form>
+"""
+
+SECURE_AREA = """<p>Welcome, {user}.</p>
+<a href="/contact">Contact</a>
+<a href="/logout">Logout</a>
+"""
+
+CONTACT_FORM = """<form id="contact-form" method="post" action="/contact">
+<label for="name">Name</label>
+<input type="text" id="name" name="name">
+<label for="email">Email</label>
+<input type="email" id="email" name="email">
+<label for="address">Message</label>
+<textarea id="address" name="address"></textarea>
+<a href="#" onclick="document.getElementById('contact-form').submit(); return false;">Send</a>
+</form>
+"""
+
+
+class StubApplication:
+    """
+    In-memory state of the stub application: registered users and login sessions.
+
+    Attributes:
+        users (dict[str, str]): Passwords of the registered users by username.
+        sessions (dict[str, str]): Usernames by session token.
+        messages (list[dict]): Contact messages sent so far.
+        lock (threading.Lock): Lock guarding the state across request threads.
+    """
+
+    def __init__(self):
+        """
+        Initializes an empty StubApplication.
+        """
+        self.users = {}
+        self.sessions = {}
+        self.messages = []
+        self.lock = threading.Lock()
+
+    def register(self, username: str, password: str, confirm_password: str) -> Optional[str]:
+        """
+        Registers a user.
+
+        Args:
+            username (str): The username.
+            password (str): The password.
+            confirm_password (str): The repeated password.
+
+        Returns:
+            Optional[str]: The error message, None if the user was registered.
+        """
+        if not username or not password or not confirm_password:
+            return "All fields are required."
+        if not USERNAME_PATTERN.match(username):
+            return (
+                "Invalid username. Usernames can only contain lowercase letters, numbers "
+                "and hyphens, and must be between 3 and 39 characters."
+            )
+        if len(password) < 4:
+            return "Password must be at least 4 characters long."
+        if password != confirm_password:
+            return "Passwords do not match."
+        with self.lock:
+            if username in self.users:
+                return "An error occurred during registration. Please try again."
+            self.users[username] = password
+        return None
+
+    def login(self, username: str, password: str) -> Optional[str]:
+        """
+        Opens a session for a user.
+
+        Args:
+            username (str): The username.
+            password (str): The password.
+
+        Returns:
+            Optional[str]: The session token, None if the credentials are invalid.
+        """
+        with self.lock:
+            if self.users.get(username) != password:
+                return None
+            token = secrets.token_hex(16)
+            self.sessions[token] = username
+        return token
+
+    def delete_user(self, username: str) -> None:
+        """
+        Deletes a user and all of its sessions.
+
+        Args:
+            username (str): The username.
+        """
+        with self.lock:
+            self.users.pop(username, None)
+            for token in [token for token, user in self.sessions.items() if user == username]:
+                del self.sessions[token]
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    """
+    Serves the register, login, secure and contact pages of the stub application.
+
+    The markup matches the labels, roles and notification selectors the page
+    objects use on the real site.
+    """
+
+    protocol_version = "HTTP/1.1"
+    server: "StubServer"
+
+    def do_GET(self):
+        if self._inject_faults():
+            return
+        path = urlparse(self.path).path
+        if path == "/assets/app.css":
+            self._send(200, STYLESHEET, "text/css", {"Cache-Control": "max-age=3600"})
+        elif path in ("/", "/register"):
+            self._page("Register", REGISTER_FORM)
+        elif path == "/login":
+            self._page("Login", LOGIN_FORM)
+        elif path == "/secure":
+            user = self._current_user()
+            if user is None:
+                self._redirect("/login", "danger", "You must login to view the secure area!")
+            else:
+                self._page("Secure Area", SECURE_AREA.format(user=html.escape(user)))
+        elif path == "/contact":
+            self._page("Contact", CONTACT_FORM)
+        elif path == "/logout":
+            self._redirect("/login", "success", "You logged out of the secure area!", session="")
+        else:
+            self._send(404, b"Not Found", "text/plain")
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        form = {
+            key: values[0]
+            for key, values in parse_qs(self.rfile.read(length).decode()).items()
+        }
+        if self._inject_faults():
+            return
+        path = urlparse(self.path).path
+        application = self.server.application
+
+        if path == "/register":
+            error = application.register(
+                form.get("username", ""), form.get("password", ""), form.get("confirmPassword", "")
+            )
+            if error:
+                self._page("Register", REGISTER_FORM, ("danger", error))
+            else:
+                self._redirect("/login", "success", Notifications.REGISTRATION_SUCCESS.value)
+        elif path == "/authenticate":
+            token = application.login(form.get("username", ""), form.get("password", ""))
+            if token is None:
+                self._page("Login", LOGIN_FORM, ("danger", "Your password is invalid!"))
+            else:
+                self._redirect("/secure", "success", Notifications.LOGIN_SUCCESS.value, session=token)
+        elif path == "/contact":
+            if not all(form.get(field) for field in ("name", "email", "address")):
+                self._page("Contact", CONTACT_FORM, ("danger", "All fields are required."))
+            else:
+                with application.lock:
+                    application.messages.append(form)
+                self._page("Contact", CONTACT_FORM, ("success", Notifications.MESSAGE_SENT_SUCCESS.value))
+        elif path == "/delete-account":
+            user = self._current_user()
+            if user is None:
+                self._send(401, b"Unauthorized", "text/plain")
+            else:
+                application.delete_user(user)
+                self._send(204, b"", "text/plain")
+        else:
+            self._send(404, b"Not Found", "text/plain")
+
+    def log_message(self, format, *args):
+        self.server.logger.debug(f"Stub server: {format % args}")
+
+    def _inject_faults(self) -> bool:
+        if self.server.latency:
+            time.sleep(self.server.latency / 1000)
+        if self.server.error_rate and self.server.random.random() < self.server.error_rate:
+            self._send(500, b"Injected error", "text/plain")
+            return True
+        return False
+
+    def _cookies(self) -> SimpleCookie:
+        return SimpleCookie(self.headers.get("Cookie", ""))
+
+    def _current_user(self) -> Optional[str]:
+        session = self._cookies().get("session")
+        if session is None:
+            return None
+        return self.server.application.sessions.get(session.value)
+
+    def _page(self, title: str, content: str, flash: Optional[tuple[str, str]] = None) -> None:
+        headers = {}
+        flash_cookie = self._cookies().get("flash")
+        if flash is None and flash_cookie is not None and flash_cookie.value:
+            flash = tuple(json.loads(unquote(flash_cookie.value)))
+            headers["Set-Cookie"] = "flash=; Path=/; Max-Age=0"
+        flash_html = ""
+        if flash:
+            kind, text = flash
+            flash_html = (
+                f'<div id="flash" class="alert alert-{kind}" role="alert">{html.escape(text)}</div>'
+            )
+        body = LAYOUT.format(title=title, flash=flash_html, content=content).encode()
+        self._send(200, body, "text/html; charset=utf-8", headers)
+
+    def _redirect(
+        self, location: str, kind: str, text: str, session: Optional[str] = None
+    ) -> None:
+        self.send_response(302)
+        self.send_header("Location", location)
+        self.send_header(
+            "Set-Cookie", f"flash={quote(json.dumps([kind, text]))}; Path=/; HttpOnly"
+        )
+        if session is not None:
+            max_age = "; Max-Age=0" if not session else ""
+            self.send_header("Set-Cookie", f"session={session}; Path=/; HttpOnly{max_age}")
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _send(
+        self, status: int, body: bytes, content_type: str, headers: Optional[dict] = None
+    ) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubServer(ThreadingHTTPServer):
+    """
+    Local stand-in for the application under test, served on a background thread.
+
+    Usage:
+    server = StubServer(latency=50, error_rate=0.01)
+    server.start()
+    page.goto(f"{server.url}/register")
+    server.stop()
+
+    Attributes:
+        application (StubApplication): The users, sessions and messages of the server.
+        latency (float): Delay in milliseconds added to every request.
+        error_rate (float): Share of requests answered with HTTP 500, from 0 to 1.
+        random (random.Random): Random generator deciding which requests fail.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0,
+        error_rate: float = 0,
+        seed: Optional[int] = None
+    ):
+        """
+        Initializes the StubServer and binds its port.
+
+        Args:
+            host (str): Interface to listen on. Default is 127.0.0.1.
+            port (int): Port to listen on, 0 for an ephemeral port. Default is 0.
+            latency (float): Delay in milliseconds added to every request. Default is 0.
+            error_rate (float): Share of requests answered with HTTP 500. Default is 0.
+            seed (Optional[int]): Seed of the random generator for injected errors.
+        """
+        super().__init__((host, port), StubRequestHandler)
+        self.application = StubApplication()
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.logger = logging.getLogger()
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """
+        Base URL of the server.
+
+        Returns:
+            str: The URL, such as http://127.0.0.1:54321.
+        """
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubServer":
+        """
+        Starts serving on a background thread.
+
+        Returns:
+            StubServer: The started server.
+        """
+        self._thread = threading.Thread(target=self.serve_forever, name="stub-server", daemon=True)
+        self._thread.start()
+        self.logger.info(f"Stub server listening on {self.url}")
+        return self
+
+    def stop(self) -> None:
+        """
+        Stops serving and closes the socket.
+        """
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+
+def main() -> None:
+    """
+    Runs the stub server in the foreground, as the target of benchmark and load runs.
+    """
+    parser = argparse.ArgumentParser(description="Local stand-in for the application under test.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0, help="Delay in milliseconds per request.")
+    parser.add_argument("--error-rate", type=float, default=0, help="Share of requests failing with 500.")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    server = StubServer(args.host, args.port, args.latency, args.error_rate, args.seed)
+    print(f"Serving on {server.url}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+import functools
+import inspect
+import json
+import math
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, Optional
+
+class TimingRecorder:
+    """
+    Collects timed spans of page object actions.
+
+    A span is a list of the page object class, the method, a description of its
+    locator or URL, and the duration in milliseconds. Recording only appends to a
+    list, and a disabled recorder does nothing at all, so it can stay on in every run.
+
+    Attributes:
+        enabled (bool): Whether spans are recorded.
+        spans (list[list]): The recorded spans.
+    """
+
+    def __init__(self, enabled: bool = False):
+        """
+        Initializes the TimingRecorder.
+
+        Args:
+            enabled (bool): Whether spans are recorded. Default is False.
+        """
+        self.enabled = enabled
+        self.spans = []
+
+    def record(self, page: str, action: str, locator: Optional[str], duration: float) -> None:
+        """
+        Records a span.
+
+        Args:
+            page (str): The page object class.
+            action (str): The page object method.
+            locator (Optional[str]): The locator, selector or URL the action worked on.
+            duration (float): The duration in milliseconds.
+        """
+        self.spans.append([page, action, locator, duration])
+
+    def summary(self, spans: Optional[list[list]] = None) -> dict:
+        """
+        Aggregates spans into latency percentiles per action, per page and per page action.
+
+        Args:
+            spans (Optional[list[list]]): The spans to aggregate. Defaults to all recorded spans.
+
+        Returns:
+            dict: Count, mean, p50, p95, p99 and max in milliseconds for each group,
+            and the ten slowest spans.
+        """
+        spans = self.spans if spans is None else spans
+        groups = {
+            "actions": defaultdict(list),
+            "pages": defaultdict(list),
+            "page_actions": defaultdict(list),
+        }
+        for page, action, _, duration in spans:
+            groups["actions"][action].append(duration)
+            groups["pages"][page].append(duration)
+            groups["page_actions"][f"{page}.{action}"].append(duration)
+
+        summary = {"spans": len(spans)}
+        for group, durations_by_name in groups.items():
+            summary[group] = {
+                name: latency_stats(durations)
+                for name, durations in sorted(durations_by_name.items())
+            }
+        slowest = sorted(spans, key=lambda span: span[3], reverse=True)[:10]
+        summary["slowest"] = [
+            {"page": page, "action": action, "locator": locator, "duration_ms": round(duration, 3)}
+            for page, action, locator, duration in slowest
+        ]
+        return summary
+
+    def write(self, path: str | Path, spans: Optional[list[list]] = None) -> None:
+        """
+        Writes the summary of the spans as JSON.
+
+        Args:
+            path (str | Path): Path of the report file.
+            spans (Optional[list[list]]): The spans to aggregate. Defaults to all recorded spans.
+        """
+        Path(path).write_text(json.dumps(self.summary(spans), indent=2))
+
+
+def percentile(durations: list[float], rank: float) -> float:
+    """
+    Returns the nearest-rank percentile of durations.
+
+    Args:
+        durations (list[float]): The sorted durations.
+        rank (float): The percentile, from 0 to 100.
+
+    Returns:
+        float: The duration at the percentile.
+    """
+    index = max(math.ceil(rank / 100 * len(durations)) - 1, 0)
+    return durations[index]
+
+
+def latency_stats(durations: list[float]) -> dict:
+    """
+    Computes the latency statistics of a group of spans.
+
+    Args:
+        durations (list[float]): The durations in milliseconds.
+
+    Returns:
+        dict: Count, mean, p50, p95, p99 and max, rounded to microseconds.
+    """
+    durations = sorted(durations)
+    return {
+        "count": len(durations),
+        "mean": round(sum(durations) / len(durations), 3),
+        "p50": round(percentile(durations, 50), 3),
+        "p95": round(percentile(durations, 95), 3),
+        "p99": round(percentile(durations, 99), 3),
+        "max": round(durations[-1], 3),
+    }
+
+
+def describe(target) -> Optional[str]:
+    """
+    Describes the locator, selector or URL a page object action works on.
+
+    Args:
+        target: A Locator, a string, a mapping keyed by either, or None.
+
+    Returns:
+        Optional[str]: The selector of a Locator, the string itself, or the keys of
+        a mapping joined by commas.
+    """
+    if target is None or isinstance(target, str):
+        return target
+    if isinstance(target, dict):
+        return ", ".join(describe(key) for key in target)
+    selector = getattr(getattr(target, "_impl_obj", target), "_selector", None)
+    return selector if selector is not None else str(target)
+
+
+recorder = TimingRecorder()
+
+
+def timed(target_attribute: Optional[str] = None) -> Callable:
+    """
+    Decorator recording a span for every call of a page object method.
+
+    Works on sync and async methods. The span's locator is the first positional
+    argument of the call, or the named attribute of the page object.
+
+    Args:
+        target_attribute (Optional[str]): Page object attribute describing what the
+            method works on, such as the selector of a notification.
+
+    Returns:
+        Callable: The decorator.
+    """
+    def decorator(method: Callable) -> Callable:
+        def target(page_object, args) -> Optional[str]:
+            if target_attribute is not None:
+                return getattr(page_object, target_attribute)
+            return describe(args[0]) if args else None
+
+        if inspect.iscoroutinefunction(method):
+            @functools.wraps(method)
+            async def async_wrapper(page_object, *args, **kwargs):
+                if not recorder.enabled:
+                    return await method(page_object, *args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return await method(page_object, *args, **kwargs)
+                finally:
+                    recorder.record(
+                        type(page_object).__name__,
+                        method.__name__,
+                        target(page_object, args),
+                        (time.perf_counter() - start) * 1000
+                    )
+            return async_wrapper
+
+        @functools.wraps(method)
+        def wrapper(page_object, *args, **kwargs):
+            if not recorder.enabled:
+                return method(page_object, *args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return method(page_object, *args, **kwargs)
+            finally:
+                recorder.record(
+                    type(page_object).__name__,
+                    method.__name__,
+                    target(page_object, args),
+                    (time.perf_counter() - start) * 1000
+                )
+        return wrapper
+
+    return decorator
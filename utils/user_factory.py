@@ -0,0 +1,187 @@
+import hashlib
+import itertools
+import logging
+import os
+import re
+import secrets
+import socket
+import threading
+from typing import Callable, Optional
+
+RUN_ID_ENV_VARIABLE = "PW_RUN_ID"
+NODE_ID_ENV_VARIABLE = "PW_NODE_ID"
+# The application accepts usernames matching ^[a-z0-9-]{3,39}$.
+MAX_USERNAME_LENGTH = 39
+MAX_ID_LENGTH = 8
+COUNTER_DIGITS = 6
+
+def new_run_id() -> str:
+    """
+    Returns the id of this run, taken from PW_RUN_ID or generated.
+
+    Setting PW_RUN_ID to the same value on every machine of a multi-node run groups
+    their users under one id; the node id and the worker id keep them apart.
+
+    Returns:
+        str: A short lowercase run id.
+    """
+    return os.environ.get(RUN_ID_ENV_VARIABLE) or secrets.token_hex(3)
+
+
+def current_node_id() -> str:
+    """
+    Returns the id of the machine this process runs on, taken from PW_NODE_ID or
+    derived from the host name.
+
+    Returns:
+        str: PW_NODE_ID reduced to lowercase letters, digits and hyphens, or the
+        first 6 hex digits of the SHA-1 of the host name.
+    """
+    return (
+        username_part(os.environ.get(NODE_ID_ENV_VARIABLE, ""))
+        or hashlib.sha1(socket.gethostname().encode()).hexdigest()[:6]
+    )
+
+
+def username_part(value: str, max_length: Optional[int] = None) -> str:
+    """
+    Reduces a value to the characters usernames accept, shortening it if needed.
+
+    Args:
+        value (str): The value, such as a CI host name.
+        max_length (Optional[int]): Maximum length of the result. Defaults to no limit.
+
+    Returns:
+        str: The value in lowercase, with every run of characters other than letters,
+        digits and hyphens replaced by a hyphen. A longer value keeps its start and
+        ends with 6 hex digits of the SHA-1 of the value, so distinct values stay
+        distinct.
+    """
+    part = re.sub(r"[^a-z0-9-]+", "-", value.lower()).strip("-")
+    if max_length is None or len(part) <= max_length:
+        return part
+    digest = hashlib.sha1(value.encode()).hexdigest()[:6]
+    return f"{part[:max_length - len(digest) - 1].rstrip('-')}-{digest}".lstrip("-")
+
+
+def current_worker_id() -> str:
+    """
+    Returns the pytest-xdist worker id of this process.
+
+    Returns:
+        str: The worker id, such as "gw0", or "main" without xdist.
+    """
+    return os.environ.get("PYTEST_XDIST_WORKER", "main")
+
+
+class UserFactory:
+    """
+    Hands out usernames that are unique per run, per machine, per worker and per call.
+
+    Usernames have the form ``<prefix>-<run id>-<node id>-<worker id>-<counter>``, so
+    parallel workers, the workers of the machines of a multi-node run, and parallel
+    runs never register the same user. Every part is reduced to lowercase letters,
+    digits and hyphens, and the ids to MAX_ID_LENGTH characters, so usernames stay
+    within the MAX_USERNAME_LENGTH characters the application accepts; if the prefix
+    is too long for that, everything before the counter is shortened with a hash.
+
+    Attributes:
+        prefix (str): Prefix of every username.
+        run_id (str): Id shared by every worker of the run.
+        worker_id (str): Id of the worker this factory belongs to.
+        node_id (str): Id of the machine the worker runs on.
+        issued (list[str]): Every username handed out so far.
+    """
+
+    def __init__(self, prefix: str, run_id: str, worker_id: str, node_id: Optional[str] = None):
+        """
+        Initializes the UserFactory.
+
+        Args:
+            prefix (str): Prefix of every username.
+            run_id (str): Id shared by every worker of the run.
+            worker_id (str): Id of the worker this factory belongs to.
+            node_id (Optional[str]): Id of the machine the worker runs on. Defaults to
+                current_node_id().
+        """
+        self.prefix = prefix
+        self.run_id = run_id
+        self.worker_id = worker_id
+        self.node_id = node_id or current_node_id()
+        self.issued = []
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+        stem = "-".join(part for part in (
+            username_part(prefix),
+            username_part(run_id, MAX_ID_LENGTH),
+            username_part(self.node_id, MAX_ID_LENGTH),
+            username_part(worker_id, MAX_ID_LENGTH),
+        ) if part)
+        self._stem = username_part(stem, MAX_USERNAME_LENGTH - COUNTER_DIGITS - 1)
+
+    def next_user(self) -> str:
+        """
+        Returns a new unique username.
+
+        Returns:
+            str: The username.
+        """
+        with self._lock:
+            user = f"{self._stem}-{next(self._counter)}"
+            self.issued.append(user)
+        return user
+
+
+class UserPool:
+    """
+    Pool of users registered ahead of the tests that need an existing account.
+
+    Attributes:
+        factory (UserFactory): The factory the pooled usernames come from.
+        register (Callable[[str], bool]): Registers a username, returning True on success.
+    """
+
+    def __init__(self, factory: UserFactory, register: Optional[Callable[[str], bool]] = None):
+        """
+        Initializes the UserPool.
+
+        Args:
+            factory (UserFactory): The factory the pooled usernames come from.
+            register (Optional[Callable[[str], bool]]): Registers a username.
+        """
+        self.factory = factory
+        self.register = register
+        self.logger = logging.getLogger()
+        self._available = []
+
+    def provision(self, count: int) -> None:
+        """
+        Registers users in bulk and adds them to the pool.
+
+        Args:
+            count (int): Number of users to register.
+        """
+        for _ in range(count):
+            user = self.factory.next_user()
+            if self.register(user):
+                self._available.append(user)
+            else:
+                self.logger.warning(f"Could not provision user {user}")
+        self.logger.info(f"Provisioned {len(self._available)} users")
+
+    def acquire(self) -> str:
+        """
+        Takes a registered user out of the pool, registering one if the pool is empty.
+
+        Returns:
+            str: The username of a registered user.
+
+        Raises:
+            RuntimeError: If the pool is empty and a new user cannot be registered.
+        """
+        if self._available:
+            return self._available.pop()
+        user = self.factory.next_user()
+        if not self.register(user):
+            raise RuntimeError(f"Could not register user {user}")
+        return user